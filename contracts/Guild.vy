@@ -11,9 +11,11 @@ from vyper.interfaces import ERC20
 interface VRH20:
     def future_epoch_time_write() -> uint256: nonpayable
     def rate() -> uint256: view
+    def start_epoch_time() -> uint256: view
 
 interface GuildController:
     def guild_relative_weight(addr: address, time: uint256) -> uint256: view
+    def guild_relative_weight_range(addr: address, _start: uint256, _n_weeks: uint256) -> uint256[N_WEEKS]: view
     def get_guild_weight(addr: address) -> uint256: view
     def add_member(guild_addr: address, user_addr: address): nonpayable
     def remove_member(user_addr: address): nonpayable
@@ -27,9 +29,10 @@ interface Minter:
     def minted(user: address, guild: address) -> uint256: view
     def controller() -> address: view
     def token() -> address: view
-    def vestingEscrow() -> address: view
+    def rewardVestingEscrow() -> address: view
 
 interface VotingEscrow:
+    def locked__end(addr: address) -> uint256: view
     def user_point_epoch(addr: address) -> uint256: view
     def user_point_history__ts(addr: address, epoch: uint256) -> uint256: view
 
@@ -38,10 +41,25 @@ interface GasEscrow:
     def user_point_history__ts(addr: address, epoch: uint256) -> uint256: view
 
 interface RewardVestingEscrow:
-    def claimable_tokens(addr: address) -> uint256: view
+    def get_claimable_tokens(addr: address) -> uint256: view
+
+struct RateChange:
+    time: uint256
+    rate: uint256
+
+struct WeeklySupply:
+    working_supply: uint256
+    integrate_inv_supply: uint256
 
 
 DECIMALS: constant(uint256) = 10 ** 18
+# VRH emission schedule, to apply a pending rate reduction in views
+INITIAL_RATE: constant(uint256) = 121_587_840 * 10 ** 18 / (365 * 86400)
+RATE_REDUCTION_TIME: constant(uint256) = 365 * 86400
+RATE_REDUCTION_COEFFICIENT: constant(uint256) = 1189207115002721024
+RATE_DENOMINATOR: constant(uint256) = 10 ** 18
+N_BATCH: constant(uint256) = 50  # max members per batched call
+N_WEEKS: constant(uint256) = 53  # max weeks per range call
 
 TOKENLESS_PRODUCTION: constant(uint256) = 40
 BOOST_WARMUP: constant(uint256) = 2 * 7 * 86400
@@ -58,11 +76,16 @@ working_supply: public(uint256)
 period_timestamp: public(uint256[100000000000000000000000000000])
 period: public(int128)
 
-last_change_rate: public(uint256)
+last_change_rate: public(uint256)  # time of the last commission rate change
 
 # 1e18 * ∫(rate(t) / totalSupply(t) dt) from 0 till checkpoint
 integrate_inv_supply: public(uint256[100000000000000000000000000000])  # bump epoch when rate() changes
 
+# Working supply and integral of 1/supply at each week boundary, recorded by
+# the first checkpoint after it
+working_supply_week: public(HashMap[uint256, uint256])  # time -> working supply
+integrate_inv_supply_week: public(HashMap[uint256, uint256])  # time -> integral of 1/supply
+
 # 1e18 * ∫(rate(t) / totalSupply(t) dt) from (last_action) till checkpoint
 integrate_inv_supply_of: public(HashMap[address, uint256])
 integrate_checkpoint_of: public(HashMap[address, uint256])
@@ -79,8 +102,11 @@ DAY: constant(uint256) = 86400
 # guild variables
 owner: public(address) # guild owner address
 
-# Proportion of what the guild owner gets
-commission_rate: public(HashMap[uint256, uint256])  # time -> commission_rate
+# Proportion of what the guild owner gets. It only changes in
+# `set_commission_rate`, so only the changes are stored and the rate of a past
+# week is found by a binary search over them
+commission_rate_epoch: public(uint256)
+commission_rate_history: public(HashMap[uint256, RateChange])  # epoch -> change
 total_owner_bonus: public(HashMap[address, uint256]) # owner address -> owner bonus
 
 event UpdateLiquidityLimit:
@@ -127,7 +153,8 @@ def initialize(_owner: address, _commission_rate: uint256, _token: address, _gas
 
     assert _commission_rate >= 0 and _commission_rate <= 20, 'Rate has to be minimally 0% and maximum 20%'
     next_time: uint256 = (block.timestamp + WEEK) / WEEK * WEEK
-    self.commission_rate[next_time] = _commission_rate
+    self.commission_rate_epoch = 1
+    self.commission_rate_history[1] = RateChange({time: next_time, rate: _commission_rate})
     self.last_change_rate = next_time # Record last updated commission rate
     self.inflation_rate = VRH20(self.vrh_token).rate()
     self.future_epoch_time = VRH20(self.vrh_token).future_epoch_time_write()
@@ -136,45 +163,49 @@ def initialize(_owner: address, _commission_rate: uint256, _token: address, _gas
 
 
 @internal
-def _get_commission_rate():
+@view
+def _commission_rate_at(time: uint256) -> uint256:
     """
-    @notice Fill historic commission rate week-over-week for missed checkins
-            and return the commission rate for the future week
+    @notice Get the commission rate at `time`
+    @param time Timestamp
+    @return Commission rate
     """
-    t: uint256 = self.last_change_rate
-    if t > 0:
-        w: uint256 = self.commission_rate[t]
-        for i in range(500):
-            if t > block.timestamp:
-                break
-            t += WEEK
-            self.commission_rate[t] = w
+    _max: uint256 = self.commission_rate_epoch
+    if self.commission_rate_history[_max].time <= time:
+        return self.commission_rate_history[_max].rate
+
+    # Binary search
+    _min: uint256 = 0
+    for i in range(128):  # Will be always enough for 128-bit numbers
+        if _min >= _max:
+            break
+        _mid: uint256 = (_min + _max + 1) / 2
+        if self.commission_rate_history[_mid].time <= time:
+            _min = _mid
+        else:
+            _max = _mid - 1
+    return self.commission_rate_history[_min].rate
 
 
 @internal
-def _checkpoint(addr: address):
+@view
+def _integrate(_rate: uint256, new_rate: uint256, prev_future_epoch: uint256) -> (uint256, uint256, uint256[500]):
     """
-    @notice Checkpoint for a user
-    @param addr User address
+    @notice Integrate 1/supply and the owner bonus from the last period till now
+    @dev Does not write, so it is shared by `_checkpoint_guild` and the views
+    @param _rate Inflation rate of the last period
+    @param new_rate Inflation rate after `prev_future_epoch`
+    @param prev_future_epoch Start of the next inflation epoch at the last period
+    @return Integral of 1/supply, owner bonus multiplied by 1e18, integral of
+            1/supply at each week boundary passed
     """
-    _token: address = self.vrh_token
     _controller: address = self.controller
-    _period: int128 = self.period
-    _period_time: uint256 = self.period_timestamp[_period]
-    _integrate_inv_supply: uint256 = self.integrate_inv_supply[_period]
+    _period_time: uint256 = self.period_timestamp[self.period]
+    _integrate_inv_supply: uint256 = self.integrate_inv_supply[self.period]
     _owner_bonus: uint256 = 0
+    _week_integrals: uint256[500] = empty(uint256[500])
+    rate: uint256 = _rate
 
-    rate: uint256 = self.inflation_rate
-    new_rate: uint256 = rate
-    prev_future_epoch: uint256 = self.future_epoch_time
-    if prev_future_epoch >= _period_time:
-        self.future_epoch_time = VRH20(_token).future_epoch_time_write()
-        new_rate = VRH20(_token).rate()
-        self.inflation_rate = new_rate
-
-    GuildController(_controller).checkpoint_guild(self)
-
-    _working_balance: uint256 = self.working_balances[addr]
     _working_supply: uint256 = self.working_supply
     
     if self.is_paused:
@@ -185,13 +216,18 @@ def _checkpoint(addr: address):
         prev_week_time: uint256 = _period_time
         week_time: uint256 = min((_period_time + WEEK) / WEEK * WEEK, block.timestamp)
 
-        # Fill missing check-in for commission rate
-        self._get_commission_rate()
-
+        # relative weights are fetched up to `N_WEEKS` weeks per call
+        weights: uint256[N_WEEKS] = empty(uint256[N_WEEKS])
+        j: uint256 = N_WEEKS
         for i in range(500):
+            if j == N_WEEKS:
+                n_weeks: uint256 = min(block.timestamp / WEEK - prev_week_time / WEEK + 1, N_WEEKS)
+                weights = GuildController(_controller).guild_relative_weight_range(self, prev_week_time, n_weeks)
+                j = 0
             dt: uint256 = week_time - prev_week_time
-            w: uint256 = GuildController(_controller).guild_relative_weight(self, prev_week_time / WEEK * WEEK)
-            commission_rate: uint256 = self.commission_rate[prev_week_time / WEEK * WEEK]
+            w: uint256 = weights[j]
+            j += 1
+            commission_rate: uint256 = self._commission_rate_at(prev_week_time / WEEK * WEEK)
 
             if _working_supply > 0:
                 if prev_future_epoch >= prev_week_time and prev_future_epoch < week_time:
@@ -217,11 +253,51 @@ def _checkpoint(addr: address):
                 # The largest loss is at dt = 1
                 # Loss is 1e-9 - acceptable
 
+            if week_time % WEEK == 0:
+                _week_integrals[i] = _integrate_inv_supply
             if week_time == block.timestamp:
                 break
             prev_week_time = week_time
             week_time = min(week_time + WEEK, block.timestamp)
 
+    return _integrate_inv_supply, _owner_bonus, _week_integrals
+
+
+@internal
+def _checkpoint_guild() -> uint256:
+    """
+    @notice Checkpoint the guild integral and the owner bonus
+    @return Integral of 1/supply at the checkpoint
+    """
+    _token: address = self.vrh_token
+    _period: int128 = self.period
+    _period_time: uint256 = self.period_timestamp[_period]
+
+    rate: uint256 = self.inflation_rate
+    new_rate: uint256 = rate
+    prev_future_epoch: uint256 = self.future_epoch_time
+    if prev_future_epoch >= _period_time:
+        self.future_epoch_time = VRH20(_token).future_epoch_time_write()
+        new_rate = VRH20(_token).rate()
+        self.inflation_rate = new_rate
+
+    GuildController(self.controller).checkpoint_guild(self)
+
+    _integrate_inv_supply: uint256 = 0
+    _owner_bonus: uint256 = 0
+    _week_integrals: uint256[500] = empty(uint256[500])
+    _integrate_inv_supply, _owner_bonus, _week_integrals = self._integrate(rate, new_rate, prev_future_epoch)
+
+    # Record the week boundaries passed since the last period
+    _working_supply: uint256 = self.working_supply
+    t: uint256 = _period_time / WEEK * WEEK
+    for i in range(500):
+        t += WEEK
+        if t > block.timestamp:
+            break
+        self.working_supply_week[t] = _working_supply
+        self.integrate_inv_supply_week[t] = _week_integrals[i]
+
     _period += 1
     self.period = _period
     self.period_timestamp[_period] = block.timestamp
@@ -233,19 +309,40 @@ def _checkpoint(addr: address):
         self.integrate_fraction[self.owner] += _owner_bonus / 10 ** 18
         self.total_owner_bonus[self.owner] += _owner_bonus / 10 ** 18
 
+    return _integrate_inv_supply
+
+
+@internal
+def _checkpoint_user(addr: address, _integrate_inv_supply: uint256):
+    """
+    @notice Update the integral of a user up to the guild checkpoint
+    @param addr User address
+    @param _integrate_inv_supply Integral of 1/supply returned by `_checkpoint_guild`
+    """
     # calculate for all members (including owner)
+    _working_balance: uint256 = self.working_balances[addr]
     self.integrate_fraction[addr] += _working_balance * (_integrate_inv_supply - self.integrate_inv_supply_of[addr]) / 10 ** 18
     self.integrate_inv_supply_of[addr] = _integrate_inv_supply
     self.integrate_checkpoint_of[addr] = block.timestamp
 
 
+@internal
+def _checkpoint(addr: address):
+    """
+    @notice Checkpoint for a user
+    @param addr User address
+    """
+    self._checkpoint_user(addr, self._checkpoint_guild())
+
+
 @external
 def set_commission_rate(increase: bool):
     assert self.owner == msg.sender,'Only guild owner can change commission rate'
     assert block.timestamp >= self.last_change_rate, "Can only change commission rate once every week"
     
     next_time: uint256 = (block.timestamp + WEEK) / WEEK * WEEK
-    commission_rate: uint256 = self.commission_rate[self.last_change_rate]
+    epoch: uint256 = self.commission_rate_epoch
+    commission_rate: uint256 = self.commission_rate_history[epoch].rate
 
     # 0 == decrease, 1 equals increase
     if increase == True :
@@ -255,13 +352,26 @@ def set_commission_rate(increase: bool):
         commission_rate -= 1
         assert commission_rate >= 0, 'Minimum is 0'
     
-    self.commission_rate[next_time] = commission_rate
+    epoch += 1
+    self.commission_rate_epoch = epoch
+    self.commission_rate_history[epoch] = RateChange({time: next_time, rate: commission_rate})
     self.last_change_rate = next_time
     log SetCommissionRate(commission_rate, next_time)
 
 
+@external
+@view
+def commission_rate(time: uint256) -> uint256:
+    """
+    @notice Get the commission rate at `time`
+    @param time Timestamp
+    @return Commission rate
+    """
+    return self._commission_rate_at(time)
+
+
 @internal
-def _update_liquidity_limit(addr: address, bu: uint256, S: uint256):
+def _update_liquidity_limit_with(addr: address, bu: uint256, S: uint256, W: uint256):
     """
     @notice Calculate limits which depend on the amount of VRH token per-user.
             Effectively it calculates working balances to apply amplification
@@ -269,11 +379,9 @@ def _update_liquidity_limit(addr: address, bu: uint256, S: uint256):
     @param addr User address
     @param bu User's amount of veVRH
     @param S Total amount of veVRH in a guild
+    @param W Total amount of gas of all users
     """
-    # To be called after totalSupply is updated
-    _gas_escrow: address = self.gas_escrow
-    wi: uint256 = ERC20(_gas_escrow).balanceOf(addr) # gas balance of a user
-    W: uint256 = ERC20(_gas_escrow).totalSupply() # gas total of all users
+    wi: uint256 = ERC20(self.gas_escrow).balanceOf(addr) # gas balance of a user
 
     lim: uint256 = bu * TOKENLESS_PRODUCTION / 100 # 0.4bu
 
@@ -290,6 +398,18 @@ def _update_liquidity_limit(addr: address, bu: uint256, S: uint256):
     log UpdateLiquidityLimit(addr, bu, S, lim, _working_supply)
 
 
+@internal
+def _update_liquidity_limit(addr: address, bu: uint256, S: uint256):
+    """
+    @notice Calculate the working balance of `addr` with the current gas total
+    @param addr User address
+    @param bu User's amount of veVRH
+    @param S Total amount of veVRH in a guild
+    """
+    # To be called after totalSupply is updated
+    self._update_liquidity_limit_with(addr, bu, S, ERC20(self.gas_escrow).totalSupply())
+
+
 @external
 def user_checkpoint(addr: address) -> bool:
     """
@@ -313,6 +433,36 @@ def user_checkpoint(addr: address) -> bool:
     return True
 
 
+@external
+def checkpoint_members(_addrs: address[N_BATCH]):
+    """
+    @notice Refresh the guild votes and working balances of several members
+    @dev The guild integral is checkpointed once for the whole batch. Anyone
+         can call. Addresses which are not members are skipped and the list
+         is terminated by the first `ZERO_ADDRESS`. Votes of members whose
+         lock ends before the next week cannot be refreshed, so only their
+         working balance is updated
+    @param _addrs Member addresses
+    """
+    _controller: address = self.controller
+    _voting_escrow: address = self.voting_escrow
+    _integrate_inv_supply: uint256 = self._checkpoint_guild()
+    next_time: uint256 = (block.timestamp + WEEK) / WEEK * WEEK
+    for i in range(N_BATCH):
+        addr: address = _addrs[i]
+        if addr == ZERO_ADDRESS:
+            break
+        if not GuildController(_controller).belongs_to_guild(addr, self):
+            continue
+
+        _user_voting_power: uint256 = ERC20(_voting_escrow).balanceOf(addr)
+        if _user_voting_power != 0 and VotingEscrow(_voting_escrow).locked__end(addr) > next_time:
+            GuildController(_controller).refresh_guild_votes(addr, self)
+        self._checkpoint_user(addr, _integrate_inv_supply)
+        _guild_voting_power: uint256 = GuildController(_controller).get_guild_weight(self)
+        self._update_liquidity_limit(addr, _user_voting_power, _guild_voting_power)
+
+
 @external
 def update_working_balance(addr: address) -> bool:
     """
@@ -340,11 +490,115 @@ def claimable_tokens(addr: address) -> uint256:
     @return uint256 number of claimable tokens per user
     """
     self._checkpoint(addr)
-    _vestingEscrow: address = Minter(self.minter).vestingEscrow()
-    _vesting_claimable: uint256 = RewardVestingEscrow(_vestingEscrow).claimable_tokens(addr)
+    _vestingEscrow: address = Minter(self.minter).rewardVestingEscrow()
+    _vesting_claimable: uint256 = RewardVestingEscrow(_vestingEscrow).get_claimable_tokens(addr)
     return self.integrate_fraction[addr] - Minter(self.minter).minted(addr, self) + _vesting_claimable
 
 
+@internal
+@view
+def _pending_integral() -> (uint256, uint256):
+    """
+    @notice Integrate 1/supply and the owner bonus till now without writing
+    @return Integral of 1/supply, owner bonus multiplied by 1e18
+    """
+    rate: uint256 = self.inflation_rate
+    new_rate: uint256 = rate
+    prev_future_epoch: uint256 = self.future_epoch_time
+    if prev_future_epoch >= self.period_timestamp[self.period]:
+        # the rate `future_epoch_time_write` would leave in the token
+        _token: address = self.vrh_token
+        new_rate = VRH20(_token).rate()
+        if block.timestamp >= VRH20(_token).start_epoch_time() + RATE_REDUCTION_TIME:
+            if new_rate == 0:
+                new_rate = INITIAL_RATE
+            else:
+                new_rate = new_rate * RATE_DENOMINATOR / RATE_REDUCTION_COEFFICIENT
+    _integrate_inv_supply: uint256 = 0
+    _owner_bonus: uint256 = 0
+    _week_integrals: uint256[500] = empty(uint256[500])
+    _integrate_inv_supply, _owner_bonus, _week_integrals = self._integrate(rate, new_rate, prev_future_epoch)
+    return _integrate_inv_supply, _owner_bonus
+
+
+@internal
+@view
+def _claimable(addr: address, _integrate_inv_supply: uint256, _owner_bonus: uint256, _vesting_escrow: address) -> uint256:
+    """
+    @notice Get the tokens `addr` could claim with `Minter.mint` now
+    @param addr User address
+    @param _integrate_inv_supply Integral of 1/supply returned by `_pending_integral`
+    @param _owner_bonus Owner bonus returned by `_pending_integral`
+    @param _vesting_escrow RewardVestingEscrow address
+    @return Number of claimable tokens
+    """
+    _integrate_fraction: uint256 = self.integrate_fraction[addr] + self.working_balances[addr] * (_integrate_inv_supply - self.integrate_inv_supply_of[addr]) / 10 ** 18
+    if addr == self.owner:
+        _integrate_fraction += _owner_bonus / 10 ** 18
+    _minted: uint256 = Minter(self.minter).minted(addr, self)
+    return _integrate_fraction - _minted + RewardVestingEscrow(_vesting_escrow).get_claimable_tokens(addr)
+
+
+@external
+@view
+def claimable(addr: address) -> uint256:
+    """
+    @notice Get the number of claimable tokens per user
+    @dev Same as `claimable_tokens`, computed without writing a checkpoint
+    @param addr User address
+    @return Number of claimable tokens, including the claimable vested rewards
+    """
+    _integrate_inv_supply: uint256 = 0
+    _owner_bonus: uint256 = 0
+    _integrate_inv_supply, _owner_bonus = self._pending_integral()
+    return self._claimable(addr, _integrate_inv_supply, _owner_bonus, Minter(self.minter).rewardVestingEscrow())
+
+
+@external
+@view
+def claimable_many(_addrs: address[N_BATCH]) -> uint256[N_BATCH]:
+    """
+    @notice Get the number of claimable tokens of several users in a single call
+    @dev The guild integral is computed once. The list is terminated by the
+         first `ZERO_ADDRESS`, remaining entries of the result are left as zero
+    @param _addrs User addresses
+    @return Numbers of claimable tokens, in the same order as `_addrs`
+    """
+    result: uint256[N_BATCH] = empty(uint256[N_BATCH])
+    _integrate_inv_supply: uint256 = 0
+    _owner_bonus: uint256 = 0
+    _integrate_inv_supply, _owner_bonus = self._pending_integral()
+    _vesting_escrow: address = Minter(self.minter).rewardVestingEscrow()
+    for i in range(N_BATCH):
+        addr: address = _addrs[i]
+        if addr == ZERO_ADDRESS:
+            break
+        result[i] = self._claimable(addr, _integrate_inv_supply, _owner_bonus, _vesting_escrow)
+    return result
+
+
+@external
+@view
+def get_working_supply_range(_start: uint256, _n_weeks: uint256) -> WeeklySupply[N_WEEKS]:
+    """
+    @notice Get the working supply and integral of 1/supply for consecutive weeks
+    @dev Weeks after the last checkpoint of the guild are zero. The tokens a
+         unit of working balance earned in a week are the difference of the
+         integrals of the week and the next divided by 1e18
+    @param _start Timestamp in the first week
+    @param _n_weeks Number of weeks, at most `N_WEEKS`
+    @return Working supply and integral of 1/supply at the start of each week
+    """
+    result: WeeklySupply[N_WEEKS] = empty(WeeklySupply[N_WEEKS])
+    t: uint256 = _start / WEEK * WEEK
+    for i in range(N_WEEKS):
+        if i >= _n_weeks:
+            break
+        result[i] = WeeklySupply({working_supply: self.working_supply_week[t], integrate_inv_supply: self.integrate_inv_supply_week[t]})
+        t += WEEK
+    return result
+
+
 @external
 def kick(addr: address):
     """
@@ -370,6 +624,53 @@ def kick(addr: address):
     self._update_liquidity_limit(addr, _user_voting_power, _guild_voting_power)
 
 
+@external
+def kick_many(_addrs: address[N_BATCH]) -> bool[N_BATCH]:
+    """
+    @notice Kick several addresses for abusing their boost
+    @dev Same conditions as `kick`, but addresses which cannot be kicked are
+         skipped instead of reverting. The guild is checkpointed once and
+         the gas total is read once. The list is terminated by the first
+         `ZERO_ADDRESS`
+    @param _addrs Addresses to kick
+    @return Whether each address was kicked, in the same order as `_addrs`
+    """
+    kicked: bool[N_BATCH] = empty(bool[N_BATCH])
+    _voting_escrow: address = self.voting_escrow
+    _gas_escrow: address = self.gas_escrow
+    _integrate_inv_supply: uint256 = 0
+    _guild_voting_power: uint256 = 0
+    W: uint256 = 0
+    checkpointed: bool = False
+
+    for i in range(N_BATCH):
+        addr: address = _addrs[i]
+        if addr == ZERO_ADDRESS:
+            break
+
+        t_last: uint256 = self.integrate_checkpoint_of[addr]
+        t_gas: uint256 = GasEscrow(_gas_escrow).user_point_history__ts(
+            addr, GasEscrow(_gas_escrow).user_point_epoch(addr))
+        _balance: uint256 = ERC20(_voting_escrow).balanceOf(addr)
+        _gas_balance: uint256 = ERC20(_gas_escrow).balanceOf(addr)
+
+        if not ((_balance == 0) or (_gas_balance == 0 or t_gas > t_last)):
+            continue  # kick not allowed
+        if self.working_balances[addr] <= _balance * 2 * TOKENLESS_PRODUCTION / 100:
+            continue  # kick not needed
+
+        if not checkpointed:
+            _integrate_inv_supply = self._checkpoint_guild()
+            _guild_voting_power = GuildController(self.controller).get_guild_weight(self)
+            W = ERC20(_gas_escrow).totalSupply()
+            checkpointed = True
+        self._checkpoint_user(addr, _integrate_inv_supply)
+        self._update_liquidity_limit_with(addr, _balance, _guild_voting_power, W)
+        kicked[i] = True
+
+    return kicked
+
+
 @external
 @nonreentrant('lock')
 def join_guild():
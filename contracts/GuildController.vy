@@ -9,6 +9,12 @@
 # 7 * 86400 seconds - all future times are rounded by week
 WEEK: constant(uint256) = 604800
 
+# Lock ends are at most 4 years (VotingEscrow MAXTIME) ahead, rounded up to weeks
+MAX_LOCK_WEEKS: constant(uint256) = 209
+
+N_BATCH: constant(uint256) = 50  # max guilds per batched call
+N_WEEKS: constant(uint256) = 53  # max weeks per range call
+
 # Cannot change weight votes more often than once in 10 days
 WEIGHT_VOTE_DELAY: constant(uint256) = 10 * 86400
 REQUIRED_CRITERIA: constant(uint256) = 100000
@@ -21,6 +27,19 @@ struct VotedSlope:
     slope: uint256
     end: uint256
 
+struct WeightChange:
+    time: uint256
+    weight: uint256
+
+struct GuildInfo:
+    addr: address
+    guild_type: int128
+    owner: address
+    weight: uint256
+    relative_weight: uint256
+    commission_rate: uint256
+    is_paused: bool
+
 
 interface VotingEscrow:
     def balanceOf(addr: address, _t: uint256 = block.timestamp) -> uint256: view   
@@ -31,6 +50,10 @@ interface Guild:
     def initialize(_admin: address, _commission_rate: uint256, _token: address, _game_token: address, _minter: address) -> bool: nonpayable
     def transfer_ownership(new_owner: address): nonpayable
     def toggle_pause(): nonpayable
+    def owner() -> address: view
+    def last_change_rate() -> uint256: view
+    def commission_rate(arg0: uint256) -> uint256: view
+    def is_paused() -> bool: view
 
 interface GasEscrow:
     def initialize(_admin: address, _token: address, _name: String[64], _symbol: String[32]) -> bool: nonpayable
@@ -141,18 +164,30 @@ vote_user_slopes: public(HashMap[address, HashMap[address, VotedSlope]])  # user
 last_user_join: public(HashMap[address, HashMap[address, uint256]])  # Last user join's timestamp for each guild address
 
 points_weight: public(HashMap[address, HashMap[uint256, Point]])  # guild_addr -> time -> Point
-changes_weight: HashMap[address, HashMap[uint256, uint256]]  # guild_addr -> time -> slope
+changes_weight: public(HashMap[address, HashMap[uint256, uint256]])  # guild_addr -> time -> slope
 time_weight: public(HashMap[address, uint256])  # guild_addr -> last scheduled time (next week)
 
 points_sum: public(HashMap[int128, HashMap[uint256, Point]])  # type_id -> time -> Point
-changes_sum: HashMap[int128, HashMap[uint256, uint256]]  # type_id -> time -> slope
+changes_sum: public(HashMap[int128, HashMap[uint256, uint256]])  # type_id -> time -> slope
 time_sum: public(uint256[1000000000])  # type_id -> last scheduled time (next week)
 
 points_total: public(HashMap[uint256, uint256])  # time -> total weight
+slope_total: public(HashMap[uint256, uint256])  # time -> total type-weighted slope
+changes_total: public(HashMap[uint256, uint256])  # time -> type-weighted slope change
 time_total: public(uint256)  # last scheduled time
 
-points_type_weight: public(HashMap[int128, HashMap[uint256, uint256]])  # type_id -> time -> type weight
-time_type_weight: public(uint256[1000000000])  # type_id -> last scheduled time (next week)
+# `change_guild_weight` can leave a type sum that decays to zero before its
+# slope changes are due. Such types are left out of `slope_total` and
+# `changes_total`, and the total adds their filled sums week by week instead
+type_untracked: public(HashMap[int128, bool])
+untracked_types: public(int128[100])
+n_untracked_types: public(int128)
+
+# Type weights only change in `change_type_weight`, so only the changes are
+# stored and the weight of a past week is found by a binary search over them
+type_weight_epoch: public(HashMap[int128, uint256])  # type_id -> number of type weight changes
+type_weight_history: public(HashMap[int128, HashMap[uint256, WeightChange]])  # type_id -> epoch -> change
+time_type_weight: public(uint256[1000000000])  # type_id -> time of the last change
 
 
 @external
@@ -247,26 +282,40 @@ def guild_types(_addr: address) -> int128:
 
 
 @internal
+@view
 def _get_type_weight(guild_type: int128) -> uint256:
     """
-    @notice Fill historic type weights week-over-week for missed checkins
-            and return the type weight for the future week
+    @notice Get the type weight for the future week
     @param guild_type Guild type id
     @return Type weight
     """
-    t: uint256 = self.time_type_weight[guild_type]
-    if t > 0:
-        w: uint256 = self.points_type_weight[guild_type][t]
-        for i in range(500):
-            if t > block.timestamp:
-                break
-            t += WEEK
-            self.points_type_weight[guild_type][t] = w
-            if t > block.timestamp:
-                self.time_type_weight[guild_type] = t
-        return w
-    else:
-        return 0
+    return self.type_weight_history[guild_type][self.type_weight_epoch[guild_type]].weight
+
+
+@internal
+@view
+def _type_weight_at(guild_type: int128, time: uint256) -> uint256:
+    """
+    @notice Get the type weight at `time`
+    @param guild_type Guild type id
+    @param time Timestamp
+    @return Type weight
+    """
+    _max: uint256 = self.type_weight_epoch[guild_type]
+    if self.type_weight_history[guild_type][_max].time <= time:
+        return self.type_weight_history[guild_type][_max].weight
+
+    # Binary search
+    _min: uint256 = 0
+    for i in range(128):  # Will be always enough for 128-bit numbers
+        if _min >= _max:
+            break
+        _mid: uint256 = (_min + _max + 1) / 2
+        if self.type_weight_history[guild_type][_mid].time <= time:
+            _min = _mid
+        else:
+            _max = _mid - 1
+    return self.type_weight_history[guild_type][_min].weight
 
 
 @internal
@@ -300,43 +349,83 @@ def _get_sum(guild_type: int128) -> uint256:
         return 0
 
 
+@internal
+@view
+def _project_sum(guild_type: int128, _pt: Point, _t: uint256, time: uint256) -> Point:
+    """
+    @notice Project the sum of guild weights for type `guild_type` from the
+            point `_pt` at `_t` to `time` as `_get_sum` would fill it
+    @param guild_type Guild type id
+    @param _pt Sum of weights at `_t`
+    @param _t Start of a week
+    @param time Start of a later week
+    @return Sum of weights at `time`
+    """
+    pt: Point = _pt
+    t: uint256 = _t
+    for i in range(500):
+        if t >= time:
+            break
+        t += WEEK
+        d_bias: uint256 = pt.slope * WEEK
+        if pt.bias > d_bias:
+            pt.bias -= d_bias
+            pt.slope -= self.changes_sum[guild_type][t]
+        else:
+            pt.bias = 0
+            pt.slope = 0
+    return pt
+
+
 @internal
 def _get_total() -> uint256:
     """
     @notice Fill historic total weights week-over-week for missed checkins
             and return the total for the future week
+    @dev The total is kept as a type-weighted bias and slope with scheduled
+         slope changes, updated whenever a type sum or type weight changes,
+         so filling it only loops over the untracked guild types
     @return Total weight
     """
     t: uint256 = self.time_total
-    _n_guild_types: int128 = self.n_guild_types
-    if t > block.timestamp:
-        # If we have already checkpointed - still need to change the value
-        t -= WEEK
     pt: uint256 = self.points_total[t]
+    if t > block.timestamp:
+        return pt
+    slope: uint256 = self.slope_total[t]
 
-    for guild_type in range(100):
-        if guild_type == _n_guild_types:
+    # Untracked types are taken out of the bias and added back from their sums
+    _n_untracked: int128 = self.n_untracked_types
+    for j in range(100):
+        if j == _n_untracked:
             break
-        self._get_sum(guild_type)
-        self._get_type_weight(guild_type)
+        _untracked_type: int128 = self.untracked_types[j]
+        self._get_sum(_untracked_type)
+        pt -= self._type_weight_at(_untracked_type, t) * self.points_sum[_untracked_type][t].bias
 
+    total: uint256 = 0
     for i in range(500):
         if t > block.timestamp:
             break
         t += WEEK
-        pt = 0
-        # Scales as n_types * n_unchecked_weeks (hopefully 1 at most)
-        for guild_type in range(100):
-            if guild_type == _n_guild_types:
+        d_bias: uint256 = slope * WEEK
+        if pt > d_bias:
+            pt -= d_bias
+            d_slope: uint256 = self.changes_total[t]
+            slope = max(slope, d_slope) - d_slope
+        else:
+            pt = 0
+            slope = 0
+        total = pt
+        for j in range(100):
+            if j == _n_untracked:
                 break
-            type_sum: uint256 = self.points_sum[guild_type][t].bias
-            type_weight: uint256 = self.points_type_weight[guild_type][t]
-            pt += type_sum * type_weight
-        self.points_total[t] = pt
-
+            guild_type: int128 = self.untracked_types[j]
+            total += self._type_weight_at(guild_type, t) * self.points_sum[guild_type][t].bias
+        self.points_total[t] = total
+        self.slope_total[t] = slope
         if t > block.timestamp:
             self.time_total = t
-    return pt
+    return total
 
 
 @internal
@@ -416,11 +505,24 @@ def create_guild(owner: address, guild_type: int128, commission_rate: uint256) -
     return ZERO_ADDRESS
 
 
+@internal
+def _checkpoint_types():
+    """
+    @notice Fill the weight sums of all guild types
+    """
+    _n_guild_types: int128 = self.n_guild_types
+    for guild_type in range(100):
+        if guild_type == _n_guild_types:
+            break
+        self._get_sum(guild_type)
+
+
 @external
 def checkpoint():
     """
     @notice Checkpoint to fill data common for all guilds
     """
+    self._checkpoint_types()
     self._get_total()
 
 
@@ -434,6 +536,23 @@ def checkpoint_guild(addr: address):
     self._get_total()
 
 
+@external
+def checkpoint_guilds(_addrs: address[N_BATCH]):
+    """
+    @notice Checkpoint to fill data common for all guilds once and then the
+            data of several guilds
+    @dev The list is terminated by the first `ZERO_ADDRESS`
+    @param _addrs Guild addresses
+    """
+    self._checkpoint_types()
+    self._get_total()
+    for i in range(N_BATCH):
+        addr: address = _addrs[i]
+        if addr == ZERO_ADDRESS:
+            break
+        self._get_weight(addr)
+
+
 @internal
 @view
 def _guild_relative_weight(addr: address, time: uint256) -> uint256:
@@ -450,7 +569,7 @@ def _guild_relative_weight(addr: address, time: uint256) -> uint256:
 
     if _total_weight > 0:
         guild_type: int128 = self.guild_types_[addr] - 1
-        _type_weight: uint256 = self.points_type_weight[guild_type][t]
+        _type_weight: uint256 = self._type_weight_at(guild_type, t)
         _guild_weight: uint256 = self.points_weight[addr][t].bias
         return MULTIPLIER * _type_weight * _guild_weight / _total_weight
 
@@ -472,6 +591,90 @@ def guild_relative_weight(addr: address, time: uint256 = block.timestamp) -> uin
     return self._guild_relative_weight(addr, time)
 
 
+@external
+@view
+def guild_relative_weight_range(addr: address, _start: uint256, _n_weeks: uint256) -> uint256[N_WEEKS]:
+    """
+    @notice Get Guild relative weights normalized to 1e18 for consecutive weeks
+    @dev Lets `Guild._checkpoint` fetch many weeks in one call. Weeks which are
+         not filled yet are projected from the last checkpoint, so the result
+         is what `checkpoint_guild` would fill
+    @param addr Guild address
+    @param _start Timestamp in the first week
+    @param _n_weeks Number of weeks, at most `N_WEEKS`
+    @return Relative weight at the start of each week
+    """
+    result: uint256[N_WEEKS] = empty(uint256[N_WEEKS])
+    guild_type: int128 = self.guild_types_[addr] - 1
+    t: uint256 = _start / WEEK * WEEK
+
+    t_total: uint256 = self.time_total
+    total: uint256 = self.points_total[t_total]
+    total_slope: uint256 = self.slope_total[t_total]
+    t_weight: uint256 = self.time_weight[addr]
+
+    # Untracked types are projected from their own sums, see `_get_total`
+    _n_untracked: int128 = self.n_untracked_types
+    untracked_pt: Point[100] = empty(Point[100])
+    for j in range(100):
+        if j == _n_untracked:
+            break
+        _untracked_type: int128 = self.untracked_types[j]
+        t_sum: uint256 = self.time_sum[_untracked_type]
+        untracked_pt[j] = self._project_sum(_untracked_type, self.points_sum[_untracked_type][t_sum], t_sum, t_total)
+        total -= self._type_weight_at(_untracked_type, t_total) * untracked_pt[j].bias
+    t_untracked: uint256 = t_total
+    pt: Point = self.points_weight[addr][t_weight]
+
+    for i in range(N_WEEKS):
+        if i >= _n_weeks:
+            break
+        _total_weight: uint256 = 0
+        _guild_weight: uint256 = 0
+        if t > t_total:
+            for j in range(500):
+                if t_total >= t:
+                    break
+                t_total += WEEK
+                d_bias: uint256 = total_slope * WEEK
+                if total > d_bias:
+                    total -= d_bias
+                    d_slope: uint256 = self.changes_total[t_total]
+                    total_slope = max(total_slope, d_slope) - d_slope
+                else:
+                    total = 0
+                    total_slope = 0
+            _total_weight = total
+            for j in range(100):
+                if j == _n_untracked:
+                    break
+                _untracked_type: int128 = self.untracked_types[j]
+                untracked_pt[j] = self._project_sum(_untracked_type, untracked_pt[j], t_untracked, t)
+                _total_weight += self._type_weight_at(_untracked_type, t) * untracked_pt[j].bias
+            t_untracked = t
+        else:
+            _total_weight = self.points_total[t]
+        if t > t_weight and t_weight > 0:
+            for j in range(500):
+                if t_weight >= t:
+                    break
+                t_weight += WEEK
+                d_bias: uint256 = pt.slope * WEEK
+                if pt.bias > d_bias:
+                    pt.bias -= d_bias
+                    pt.slope -= self.changes_weight[addr][t_weight]
+                else:
+                    pt.bias = 0
+                    pt.slope = 0
+            _guild_weight = pt.bias
+        else:
+            _guild_weight = self.points_weight[addr][t].bias
+        if _total_weight > 0:
+            result[i] = MULTIPLIER * self._type_weight_at(guild_type, t) * _guild_weight / _total_weight
+        t += WEEK
+    return result
+
+
 @external
 @view
 def guild_effective_weight(addr: address, time: uint256 = block.timestamp) -> uint256:
@@ -498,7 +701,7 @@ def guild_relative_weight_write(addr: address, time: uint256 = block.timestamp)
     @return Value of relative weight normalized to 1e18
     """
     self._get_weight(addr)
-    self._get_total()  # Also calculates get_sum
+    self._get_total()
     return self._guild_relative_weight(addr, time)
 
 
@@ -518,7 +721,22 @@ def _change_type_weight(type_id: int128, weight: uint256):
 
     _total_weight = _total_weight + old_sum * weight - old_sum * old_weight
     self.points_total[next_time] = _total_weight
-    self.points_type_weight[type_id][next_time] = weight
+    if self.time_sum[type_id] > 0 and weight != old_weight and not self.type_untracked[type_id]:
+        # Re-weight the type slope and all of its scheduled slope changes
+        old_slope: uint256 = self.points_sum[type_id][next_time].slope
+        self.slope_total[next_time] = self.slope_total[next_time] + old_slope * weight - old_slope * old_weight
+        t: uint256 = next_time
+        for i in range(MAX_LOCK_WEEKS):
+            t += WEEK
+            d_slope: uint256 = self.changes_sum[type_id][t]
+            if d_slope > 0:
+                self.changes_total[t] = self.changes_total[t] + d_slope * weight - d_slope * old_weight
+    # Several changes in one week replace each other
+    epoch: uint256 = self.type_weight_epoch[type_id]
+    if self.time_type_weight[type_id] != next_time:
+        epoch += 1
+        self.type_weight_epoch[type_id] = epoch
+    self.type_weight_history[type_id][epoch] = WeightChange({time: next_time, weight: weight})
     self.time_total = next_time
     self.time_type_weight[type_id] = next_time
 
@@ -561,6 +779,31 @@ def change_type_weight(type_id: int128, weight: uint256):
     self._change_type_weight(type_id, weight)
 
 
+@internal
+def _untrack_type(guild_type: int128, next_time: uint256, type_weight: uint256):
+    """
+    @notice Leave the slope of type `guild_type` out of the total weight
+    @dev The type sum must be filled up to `next_time`. From then on
+         `_get_total` adds the filled type sum week by week
+    @param guild_type Guild type id
+    @param next_time Start of the next week
+    @param type_weight Type weight for the next week
+    """
+    d_slope: uint256 = self.points_sum[guild_type][next_time].slope * type_weight
+    self.slope_total[next_time] = max(self.slope_total[next_time], d_slope) - d_slope
+    t: uint256 = next_time
+    for i in range(MAX_LOCK_WEEKS):
+        t += WEEK
+        d_slope = self.changes_sum[guild_type][t] * type_weight
+        if d_slope > 0:
+            self.changes_total[t] = max(self.changes_total[t], d_slope) - d_slope
+
+    n: int128 = self.n_untracked_types
+    self.untracked_types[n] = guild_type
+    self.n_untracked_types = n + 1
+    self.type_untracked[guild_type] = True
+
+
 @internal
 def _change_guild_weight(addr: address, weight: uint256):
     # Change guild weight
@@ -572,6 +815,11 @@ def _change_guild_weight(addr: address, weight: uint256):
     _total_weight: uint256 = self._get_total()
     next_time: uint256 = (block.timestamp + WEEK) / WEEK * WEEK
 
+    # A lowered bias no longer follows the slopes of the votes, so the type
+    # sum can decay to zero with slope changes still scheduled
+    if weight < old_guild_weight and not self.type_untracked[guild_type]:
+        self._untrack_type(guild_type, next_time, type_weight)
+
     self.points_weight[addr][next_time].bias = weight
     self.time_weight[addr] = next_time
 
@@ -635,24 +883,38 @@ def _vote_for_guild(user_addr: address, guild_addr: address, vote: bool):
     old_weight_slope: uint256 = self.points_weight[guild_addr][next_time].slope
     old_sum_bias: uint256 = self._get_sum(guild_type)
     old_sum_slope: uint256 = self.points_sum[guild_type][next_time].slope
+    type_weight: uint256 = self._get_type_weight(guild_type)
+    old_total_bias: uint256 = self._get_total()
+    old_total_slope: uint256 = self.slope_total[next_time]
 
+    new_sum_bias: uint256 = max(old_sum_bias + new_bias, old_bias) - old_bias
+    new_sum_slope: uint256 = 0
     self.points_weight[guild_addr][next_time].bias = max(old_weight_bias + new_bias, old_bias) - old_bias
-    self.points_sum[guild_type][next_time].bias = max(old_sum_bias + new_bias, old_bias) - old_bias
     if old_slope.end > next_time:
         self.points_weight[guild_addr][next_time].slope = max(old_weight_slope + new_slope.slope, old_slope.slope) - old_slope.slope
-        self.points_sum[guild_type][next_time].slope = max(old_sum_slope + new_slope.slope, old_slope.slope) - old_slope.slope
+        new_sum_slope = max(old_sum_slope + new_slope.slope, old_slope.slope) - old_slope.slope
     else:
         self.points_weight[guild_addr][next_time].slope += new_slope.slope
-        self.points_sum[guild_type][next_time].slope += new_slope.slope
+        new_sum_slope = old_sum_slope + new_slope.slope
+    self.points_sum[guild_type][next_time] = Point({bias: new_sum_bias, slope: new_sum_slope})
+
+    # Apply the change of the type sum to the type-weighted total
+    self.points_total[next_time] = max(old_total_bias + new_sum_bias * type_weight, old_sum_bias * type_weight) - old_sum_bias * type_weight
+    tracked: bool = not self.type_untracked[guild_type]
+    if tracked:
+        self.slope_total[next_time] = max(old_total_slope + new_sum_slope * type_weight, old_sum_slope * type_weight) - old_sum_slope * type_weight
+
     if old_slope.end > block.timestamp:
         # Cancel old slope changes if they still didn't happen
         self.changes_weight[guild_addr][old_slope.end] -= old_slope.slope
         self.changes_sum[guild_type][old_slope.end] -= old_slope.slope
+        if tracked:
+            self.changes_total[old_slope.end] -= old_slope.slope * type_weight
     # Add slope changes
     self.changes_weight[guild_addr][new_slope.end] += new_slope.slope
     self.changes_sum[guild_type][new_slope.end] += new_slope.slope
-
-    self._get_total()
+    if tracked:
+        self.changes_total[new_slope.end] += new_slope.slope * type_weight
 
     self.vote_user_slopes[user_addr][guild_addr] = new_slope
 
@@ -670,6 +932,35 @@ def get_guild_weight(addr: address) -> uint256:
     return self.points_weight[addr][self.time_weight[addr]].bias
 
 
+@external
+@view
+def get_guilds(_offset: uint256, _limit: uint256) -> GuildInfo[N_BATCH]:
+    """
+    @notice Get a page of the guild directory
+    @dev Entries after the last guild of the page have a zero address
+    @param _offset Index of the first guild in `guilds`
+    @param _limit Number of guilds to return, at most `N_BATCH`
+    @return Address, type, owner, current weight, relative weight, latest
+            commission rate and paused flag of each guild
+    """
+    result: GuildInfo[N_BATCH] = empty(GuildInfo[N_BATCH])
+    _n_guilds: uint256 = convert(self.n_guilds, uint256)
+    for i in range(N_BATCH):
+        if i >= _limit or _offset + i >= _n_guilds:
+            break
+        addr: address = self.guilds[_offset + i]
+        result[i] = GuildInfo({
+            addr: addr,
+            guild_type: self.guild_types_[addr] - 1,
+            owner: Guild(addr).owner(),
+            weight: self.points_weight[addr][self.time_weight[addr]].bias,
+            relative_weight: self._guild_relative_weight(addr, block.timestamp),
+            commission_rate: Guild(addr).commission_rate(Guild(addr).last_change_rate()),
+            is_paused: Guild(addr).is_paused()
+        })
+    return result
+
+
 @external
 @view
 def get_type_weight(type_id: int128) -> uint256:
@@ -678,7 +969,19 @@ def get_type_weight(type_id: int128) -> uint256:
     @param type_id Type id
     @return Type weight
     """
-    return self.points_type_weight[type_id][self.time_type_weight[type_id]]
+    return self._get_type_weight(type_id)
+
+
+@external
+@view
+def points_type_weight(type_id: int128, time: uint256) -> uint256:
+    """
+    @notice Get the type weight at `time`
+    @param type_id Type id
+    @param time Timestamp
+    @return Type weight
+    """
+    return self._type_weight_at(type_id, time)
 
 
 @external
@@ -700,7 +1003,90 @@ def get_weights_sum_per_type(type_id: int128) -> uint256:
     @return Sum of guild weights
     """
     return self.points_sum[type_id][self.time_sum[type_id]].bias
-    
+
+
+@external
+@view
+def get_guild_weight_range(addr: address, _start: uint256, _n_weeks: uint256) -> uint256[N_WEEKS]:
+    """
+    @notice Get guild weights for consecutive weeks
+    @dev Weeks after the last checkpoint of the guild are zero
+    @param addr Guild address
+    @param _start Timestamp in the first week
+    @param _n_weeks Number of weeks, at most `N_WEEKS`
+    @return Guild weight at the start of each week
+    """
+    result: uint256[N_WEEKS] = empty(uint256[N_WEEKS])
+    t: uint256 = _start / WEEK * WEEK
+    for i in range(N_WEEKS):
+        if i >= _n_weeks:
+            break
+        result[i] = self.points_weight[addr][t].bias
+        t += WEEK
+    return result
+
+
+@external
+@view
+def get_weights_sum_per_type_range(type_id: int128, _start: uint256, _n_weeks: uint256) -> uint256[N_WEEKS]:
+    """
+    @notice Get sums of guild weights per type for consecutive weeks
+    @dev Weeks after the last checkpoint of the type are zero
+    @param type_id Type id
+    @param _start Timestamp in the first week
+    @param _n_weeks Number of weeks, at most `N_WEEKS`
+    @return Sum of guild weights at the start of each week
+    """
+    result: uint256[N_WEEKS] = empty(uint256[N_WEEKS])
+    t: uint256 = _start / WEEK * WEEK
+    for i in range(N_WEEKS):
+        if i >= _n_weeks:
+            break
+        result[i] = self.points_sum[type_id][t].bias
+        t += WEEK
+    return result
+
+
+@external
+@view
+def get_type_weight_range(type_id: int128, _start: uint256, _n_weeks: uint256) -> uint256[N_WEEKS]:
+    """
+    @notice Get type weights for consecutive weeks
+    @param type_id Type id
+    @param _start Timestamp in the first week
+    @param _n_weeks Number of weeks, at most `N_WEEKS`
+    @return Type weight at the start of each week
+    """
+    result: uint256[N_WEEKS] = empty(uint256[N_WEEKS])
+    t: uint256 = _start / WEEK * WEEK
+    for i in range(N_WEEKS):
+        if i >= _n_weeks:
+            break
+        result[i] = self._type_weight_at(type_id, t)
+        t += WEEK
+    return result
+
+
+@external
+@view
+def get_total_weight_range(_start: uint256, _n_weeks: uint256) -> uint256[N_WEEKS]:
+    """
+    @notice Get total (type-weighted) weights for consecutive weeks
+    @dev Weeks after the last checkpoint are zero
+    @param _start Timestamp in the first week
+    @param _n_weeks Number of weeks, at most `N_WEEKS`
+    @return Total weight at the start of each week
+    """
+    result: uint256[N_WEEKS] = empty(uint256[N_WEEKS])
+    t: uint256 = _start / WEEK * WEEK
+    for i in range(N_WEEKS):
+        if i >= _n_weeks:
+            break
+        result[i] = self.points_total[t]
+        t += WEEK
+    return result
+
+
 
 @external 
 def refresh_guild_votes(user_addr: address, guild_addr: address):
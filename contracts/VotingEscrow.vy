@@ -73,6 +73,7 @@ WEEK: constant(uint256) = 7 * 86400  # all future times are rounded by week
 MAXTIME: constant(uint256) = 4 * 365 * 86400  # 4 years
 MINTIME: constant(uint256) = 365 * 86400  # 1 year
 MULTIPLIER: constant(uint256) = 10 ** 18
+N_BATCH: constant(uint256) = 100  # max addresses per batched call
 
 token: public(address)
 supply: public(uint256)
@@ -84,6 +85,7 @@ point_history: public(Point[100000000000000000000000000000])  # epoch -> unsigne
 user_point_history: public(HashMap[address, Point[1000000000]])  # user -> Point[user_epoch]
 user_point_epoch: public(HashMap[address, uint256])
 slope_changes: public(HashMap[uint256, int128])  # time -> signed slope change
+week_epoch: public(HashMap[uint256, uint256])  # week -> epoch of the point recorded at that week
 
 # Aragon's view methods for compatibility
 controller: public(address)
@@ -220,39 +222,13 @@ def locked__end(_addr: address) -> uint256:
 
 
 @internal
-def _checkpoint(addr: address, old_locked: LockedBalance, new_locked: LockedBalance):
+def _checkpoint_global():
     """
-    @notice Record global and per-user data to checkpoint
-    @param addr User's wallet address. No user checkpoint if 0x0
-    @param old_locked Pevious locked amount / end lock time for the user
-    @param new_locked New locked amount / end lock time for the user
+    @notice Fill the global point history week-over-week until now
+    @dev The point for the current time is recorded at `self.epoch`
     """
-    u_old: Point = empty(Point)
-    u_new: Point = empty(Point)
-    old_dslope: int128 = 0
-    new_dslope: int128 = 0
     _epoch: uint256 = self.epoch
 
-    if addr != ZERO_ADDRESS:
-        # Calculate slopes and biases
-        # Kept at zero when they have to
-        if old_locked.end > block.timestamp and old_locked.amount > 0:
-            u_old.slope = old_locked.amount / MAXTIME
-            u_old.bias = u_old.slope * convert(old_locked.end - block.timestamp, int128)
-        if new_locked.end > block.timestamp and new_locked.amount > 0:
-            u_new.slope = new_locked.amount / MAXTIME
-            u_new.bias = u_new.slope * convert(new_locked.end - block.timestamp, int128)
-
-        # Read values of scheduled changes in the slope
-        # old_locked.end can be in the past and in the future
-        # new_locked.end can ONLY by in the FUTURE unless everything expired: than zeros
-        old_dslope = self.slope_changes[old_locked.end]
-        if new_locked.end != 0:
-            if new_locked.end == old_locked.end:
-                new_dslope = old_dslope
-            else:
-                new_dslope = self.slope_changes[new_locked.end]
-
     last_point: Point = Point({bias: 0, slope: 0, ts: block.timestamp, blk: block.number})
     if _epoch > 0:
         last_point = self.point_history[_epoch]
@@ -293,47 +269,101 @@ def _checkpoint(addr: address, old_locked: LockedBalance, new_locked: LockedBala
             break
         else:
             self.point_history[_epoch] = last_point
+            self.week_epoch[t_i] = _epoch
 
     self.epoch = _epoch
     # Now point_history is filled until t=now
 
-    if addr != ZERO_ADDRESS:
-        # If last point was in this block, the slope change has been applied already
-        # But in such case we have 0 slope(s)
-        last_point.slope += (u_new.slope - u_old.slope)
-        last_point.bias += (u_new.bias - u_old.bias)
-        if last_point.slope < 0:
-            last_point.slope = 0
-        if last_point.bias < 0:
-            last_point.bias = 0
+    # Record the current point into history
+    self.point_history[_epoch] = last_point
+    if last_point.ts % WEEK == 0:
+        self.week_epoch[last_point.ts] = _epoch
+
+
+@internal
+def _checkpoint_user(addr: address, old_locked: LockedBalance, new_locked: LockedBalance):
+    """
+    @notice Record per-user data to checkpoint and apply the change of the
+            user's lock to the current global point
+    @dev `_checkpoint_global` must have been called in this block
+    @param addr User's wallet address
+    @param old_locked Pevious locked amount / end lock time for the user
+    @param new_locked New locked amount / end lock time for the user
+    """
+    u_old: Point = empty(Point)
+    u_new: Point = empty(Point)
+    old_dslope: int128 = 0
+    new_dslope: int128 = 0
+
+    # Calculate slopes and biases
+    # Kept at zero when they have to
+    if old_locked.end > block.timestamp and old_locked.amount > 0:
+        u_old.slope = old_locked.amount / MAXTIME
+        u_old.bias = u_old.slope * convert(old_locked.end - block.timestamp, int128)
+    if new_locked.end > block.timestamp and new_locked.amount > 0:
+        u_new.slope = new_locked.amount / MAXTIME
+        u_new.bias = u_new.slope * convert(new_locked.end - block.timestamp, int128)
+
+    # Read values of scheduled changes in the slope
+    # old_locked.end can be in the past and in the future
+    # new_locked.end can ONLY by in the FUTURE unless everything expired: than zeros
+    old_dslope = self.slope_changes[old_locked.end]
+    if new_locked.end != 0:
+        if new_locked.end == old_locked.end:
+            new_dslope = old_dslope
+        else:
+            new_dslope = self.slope_changes[new_locked.end]
+
+    # If last point was in this block, the slope change has been applied already
+    # But in such case we have 0 slope(s)
+    _epoch: uint256 = self.epoch
+    last_point: Point = self.point_history[_epoch]
+    last_point.slope += (u_new.slope - u_old.slope)
+    last_point.bias += (u_new.bias - u_old.bias)
+    if last_point.slope < 0:
+        last_point.slope = 0
+    if last_point.bias < 0:
+        last_point.bias = 0
 
     # Record the changed point into history
     self.point_history[_epoch] = last_point
 
+    # Schedule the slope changes (slope is going down)
+    # We subtract new_user_slope from [new_locked.end]
+    # and add old_user_slope to [old_locked.end]
+    if old_locked.end > block.timestamp:
+        # old_dslope was <something> - u_old.slope, so we cancel that
+        old_dslope += u_old.slope
+        if new_locked.end == old_locked.end:
+            old_dslope -= u_new.slope  # It was a new deposit, not extension
+        self.slope_changes[old_locked.end] = old_dslope
+
+    if new_locked.end > block.timestamp:
+        if new_locked.end > old_locked.end:
+            new_dslope -= u_new.slope  # old slope disappeared at this point
+            self.slope_changes[new_locked.end] = new_dslope
+        # else: we recorded it already in old_dslope
+
+    # Now handle user history
+    user_epoch: uint256 = self.user_point_epoch[addr] + 1
+
+    self.user_point_epoch[addr] = user_epoch
+    u_new.ts = block.timestamp
+    u_new.blk = block.number
+    self.user_point_history[addr][user_epoch] = u_new
+
+
+@internal
+def _checkpoint(addr: address, old_locked: LockedBalance, new_locked: LockedBalance):
+    """
+    @notice Record global and per-user data to checkpoint
+    @param addr User's wallet address. No user checkpoint if 0x0
+    @param old_locked Pevious locked amount / end lock time for the user
+    @param new_locked New locked amount / end lock time for the user
+    """
+    self._checkpoint_global()
     if addr != ZERO_ADDRESS:
-        # Schedule the slope changes (slope is going down)
-        # We subtract new_user_slope from [new_locked.end]
-        # and add old_user_slope to [old_locked.end]
-        if old_locked.end > block.timestamp:
-            # old_dslope was <something> - u_old.slope, so we cancel that
-            old_dslope += u_old.slope
-            if new_locked.end == old_locked.end:
-                old_dslope -= u_new.slope  # It was a new deposit, not extension
-            self.slope_changes[old_locked.end] = old_dslope
-
-        if new_locked.end > block.timestamp:
-            if new_locked.end > old_locked.end:
-                new_dslope -= u_new.slope  # old slope disappeared at this point
-                self.slope_changes[new_locked.end] = new_dslope
-            # else: we recorded it already in old_dslope
-
-        # Now handle user history
-        user_epoch: uint256 = self.user_point_epoch[addr] + 1
-
-        self.user_point_epoch[addr] = user_epoch
-        u_new.ts = block.timestamp
-        u_new.blk = block.number
-        self.user_point_history[addr][user_epoch] = u_new
+        self._checkpoint_user(addr, old_locked, new_locked)
 
 
 @internal
@@ -369,6 +399,33 @@ def _deposit_for(_addr: address, _from: address, _value: uint256, unlock_time: u
     log Supply(supply_before, supply_before + _value)
 
 
+@internal
+def _batch_deposit_for(_addr: address, _from: address, _value: uint256, unlock_time: uint256, locked_balance: LockedBalance, type: int128):
+    """
+    @notice Deposit and lock tokens for a user as part of a batch
+    @dev Same as `_deposit_for`, except that the global checkpoint must already
+         be done and the tokens are transferred once by the caller
+    @param _addr User's wallet address
+    @param _value Amount to deposit
+    @param unlock_time New time when to unlock the tokens, or 0 if unchanged
+    @param locked_balance Previous locked amount / timestamp
+    """
+    _locked: LockedBalance = locked_balance
+    supply_before: uint256 = self.supply
+
+    self.supply = supply_before + _value
+    old_locked: LockedBalance = _locked
+    _locked.amount += convert(_value, int128)
+    if unlock_time != 0:
+        _locked.end = unlock_time
+    self.locked[_addr] = _locked
+
+    self._checkpoint_user(_addr, old_locked, _locked)
+
+    log Deposit(_from, _addr, _value, _locked.end, type, block.timestamp)
+    log Supply(supply_before, supply_before + _value)
+
+
 @external
 def checkpoint():
     """
@@ -440,6 +497,75 @@ def create_lock_for(_for: address, _value: uint256, _unlock_time: uint256):
     self._deposit_for(_for, msg.sender, _value, unlock_time, _locked, CREATE_LOCK_FOR_TYPE)
 
 
+@external
+@nonreentrant('lock')
+def create_lock_for_many(_for: address[N_BATCH], _values: uint256[N_BATCH], _unlock_times: uint256[N_BATCH]):
+    """
+    @notice Deposit `_values[i]` tokens for `_for[i]` and lock until `_unlock_times[i]`
+    @dev The list is terminated by the first `ZERO_ADDRESS`. The global
+         checkpoint runs once and all tokens are transferred in one call
+    @param _for Addresses to create locks for
+    @param _values Amounts to deposit
+    @param _unlock_times Epoch times when tokens unlock, rounded down to whole weeks
+    """
+    self.assert_not_contract(msg.sender)
+    self._checkpoint_global()
+
+    total: uint256 = 0
+    for i in range(N_BATCH):
+        addr: address = _for[i]
+        if addr == ZERO_ADDRESS:
+            break
+        assert addr.is_contract == False, "Can not create lock for contract"
+        assert addr != msg.sender # dev: use create lock
+        _value: uint256 = _values[i]
+        unlock_time: uint256 = (_unlock_times[i] / WEEK) * WEEK  # Locktime is rounded down to weeks
+        _locked: LockedBalance = self.locked[addr]
+
+        assert _value > 0  # dev: need non-zero value
+        assert _locked.amount == 0, "Withdraw old tokens first"
+        assert unlock_time > block.timestamp, "Can only lock until time in the future"
+        assert unlock_time + WEEK >= block.timestamp + MINTIME, "Voting lock must be 1 year min"
+        assert unlock_time <= block.timestamp + MAXTIME, "Voting lock can be 4 years max"
+
+        self._batch_deposit_for(addr, msg.sender, _value, unlock_time, _locked, CREATE_LOCK_FOR_TYPE)
+        total += _value
+
+    if total != 0:
+        assert ERC20(self.token).transferFrom(msg.sender, self, total)
+
+
+@external
+@nonreentrant('lock')
+def deposit_for_many(_addrs: address[N_BATCH], _values: uint256[N_BATCH]):
+    """
+    @notice Deposit `_values[i]` tokens for `_addrs[i]` and add to their locks
+    @dev The list is terminated by the first `ZERO_ADDRESS`. The global
+         checkpoint runs once and all tokens are transferred in one call
+    @param _addrs User wallet addresses
+    @param _values Amounts to add to the users' locks
+    """
+    self._checkpoint_global()
+
+    total: uint256 = 0
+    for i in range(N_BATCH):
+        addr: address = _addrs[i]
+        if addr == ZERO_ADDRESS:
+            break
+        _value: uint256 = _values[i]
+        _locked: LockedBalance = self.locked[addr]
+
+        assert _value > 0  # dev: need non-zero value
+        assert _locked.amount > 0, "No existing lock found"
+        assert _locked.end > block.timestamp, "Cannot add to expired lock. Withdraw"
+
+        self._batch_deposit_for(addr, msg.sender, _value, 0, _locked, DEPOSIT_FOR_TYPE)
+        total += _value
+
+    if total != 0:
+        assert ERC20(self.token).transferFrom(msg.sender, self, total)
+
+
 @external
 @nonreentrant('lock')
 def increase_amount(_value: uint256):
@@ -533,12 +659,11 @@ def find_block_epoch(_block: uint256, max_epoch: uint256) -> uint256:
     return _min
 
 
-@external
+@internal
 @view
-def balanceOf(addr: address, _t: uint256 = block.timestamp) -> uint256:
+def _balance_of(addr: address, _t: uint256) -> uint256:
     """
-    @notice Get the current voting power for `msg.sender`
-    @dev Adheres to the ERC20 `balanceOf` interface for Aragon compatibility
+    @notice Get the voting power of `addr` at time `_t`
     @param addr User wallet address
     @param _t Epoch time to return voting power at
     @return User voting power
@@ -556,21 +681,50 @@ def balanceOf(addr: address, _t: uint256 = block.timestamp) -> uint256:
 
 @external
 @view
-def balanceOfAt(addr: address, _block: uint256) -> uint256:
+def balanceOf(addr: address, _t: uint256 = block.timestamp) -> uint256:
     """
-    @notice Measure voting power of `addr` at block height `_block`
-    @dev Adheres to MiniMe `balanceOfAt` interface: https://github.com/Giveth/minime
-    @param addr User's wallet address
-    @param _block Block to calculate the voting power at
-    @return Voting power
+    @notice Get the current voting power for `msg.sender`
+    @dev Adheres to the ERC20 `balanceOf` interface for Aragon compatibility
+    @param addr User wallet address
+    @param _t Epoch time to return voting power at
+    @return User voting power
     """
-    # Copying and pasting totalSupply code because Vyper cannot pass by
-    # reference yet
-    assert _block <= block.number
+    return self._balance_of(addr, _t)
+
 
+@external
+@view
+def balanceOfMany(_addrs: address[N_BATCH], _t: uint256 = block.timestamp) -> uint256[N_BATCH]:
+    """
+    @notice Get the voting power of several addresses in a single call
+    @dev The list is terminated by the first `ZERO_ADDRESS`, remaining
+         entries of the result are left as zero
+    @param _addrs List of user wallet addresses
+    @param _t Epoch time to return voting power at
+    @return List of user voting powers, in the same order as `_addrs`
+    """
+    balances: uint256[N_BATCH] = empty(uint256[N_BATCH])
+    for i in range(N_BATCH):
+        addr: address = _addrs[i]
+        if addr == ZERO_ADDRESS:
+            break
+        balances[i] = self._balance_of(addr, _t)
+    return balances
+
+
+@internal
+@view
+def find_user_block_epoch(addr: address, _block: uint256, max_epoch: uint256) -> uint256:
+    """
+    @notice Binary search for the last user checkpoint at or before block number
+    @param addr User's wallet address
+    @param _block Block to find
+    @param max_epoch Don't go beyond this user epoch
+    @return User epoch number
+    """
     # Binary search
     _min: uint256 = 0
-    _max: uint256 = self.user_point_epoch[addr]
+    _max: uint256 = max_epoch
     for i in range(128):  # Will be always enough for 128-bit numbers
         if _min >= _max:
             break
@@ -579,11 +733,62 @@ def balanceOfAt(addr: address, _block: uint256) -> uint256:
             _min = _mid
         else:
             _max = _mid - 1
+    return _min
 
-    upoint: Point = self.user_point_history[addr][_min]
 
-    max_epoch: uint256 = self.epoch
-    _epoch: uint256 = self.find_block_epoch(_block, max_epoch)
+@internal
+@view
+def is_block_epoch(_block: uint256, _epoch: uint256, max_epoch: uint256) -> bool:
+    """
+    @notice Check that `_epoch` is what `find_block_epoch` returns for `_block`
+    @param _block Block number
+    @param _epoch Epoch to check
+    @param max_epoch Latest epoch
+    @return True if `_epoch` is the last epoch at or before `_block`
+    """
+    if _epoch > max_epoch:
+        return False
+    if _epoch > 0 and self.point_history[_epoch].blk > _block:
+        return False
+    if _epoch < max_epoch and self.point_history[_epoch + 1].blk <= _block:
+        return False
+    return True
+
+
+@internal
+@view
+def is_user_block_epoch(addr: address, _block: uint256, _user_epoch: uint256, max_epoch: uint256) -> bool:
+    """
+    @notice Check that `_user_epoch` is what `find_user_block_epoch` returns for `_block`
+    @param addr User's wallet address
+    @param _block Block number
+    @param _user_epoch User epoch to check
+    @param max_epoch Latest user epoch
+    @return True if `_user_epoch` is the last user epoch at or before `_block`
+    """
+    if _user_epoch > max_epoch:
+        return False
+    if _user_epoch > 0 and self.user_point_history[addr][_user_epoch].blk > _block:
+        return False
+    if _user_epoch < max_epoch and self.user_point_history[addr][_user_epoch + 1].blk <= _block:
+        return False
+    return True
+
+
+@internal
+@view
+def _balance_of_at(addr: address, _block: uint256, _user_epoch: uint256, _epoch: uint256, max_epoch: uint256) -> uint256:
+    """
+    @notice Measure voting power of `addr` at block height `_block`
+    @param addr User's wallet address
+    @param _block Block to calculate the voting power at
+    @param _user_epoch Last user epoch at or before `_block`
+    @param _epoch Last global epoch at or before `_block`
+    @param max_epoch Latest global epoch
+    @return Voting power
+    """
+    upoint: Point = self.user_point_history[addr][_user_epoch]
+
     point_0: Point = self.point_history[_epoch]
     d_block: uint256 = 0
     d_t: uint256 = 0
@@ -605,6 +810,53 @@ def balanceOfAt(addr: address, _block: uint256) -> uint256:
         return 0
 
 
+@external
+@view
+def balanceOfAt(addr: address, _block: uint256) -> uint256:
+    """
+    @notice Measure voting power of `addr` at block height `_block`
+    @dev Adheres to MiniMe `balanceOfAt` interface: https://github.com/Giveth/minime
+    @param addr User's wallet address
+    @param _block Block to calculate the voting power at
+    @return Voting power
+    """
+    assert _block <= block.number
+
+    _user_epoch: uint256 = self.find_user_block_epoch(addr, _block, self.user_point_epoch[addr])
+    max_epoch: uint256 = self.epoch
+    _epoch: uint256 = self.find_block_epoch(_block, max_epoch)
+    return self._balance_of_at(addr, _block, _user_epoch, _epoch, max_epoch)
+
+
+@external
+@view
+def balanceOfAtHint(addr: address, _block: uint256, _user_epoch: uint256, _epoch: uint256) -> uint256:
+    """
+    @notice Measure voting power of `addr` at block height `_block`, using
+            known epochs instead of searching for them
+    @dev Hints are checked in constant time; a wrong hint falls back to the
+         binary search, so the result always equals `balanceOfAt`
+    @param addr User's wallet address
+    @param _block Block to calculate the voting power at
+    @param _user_epoch Last user epoch at or before `_block`
+    @param _epoch Last global epoch at or before `_block`
+    @return Voting power
+    """
+    assert _block <= block.number
+
+    max_user_epoch: uint256 = self.user_point_epoch[addr]
+    user_epoch: uint256 = _user_epoch
+    if not self.is_user_block_epoch(addr, _block, user_epoch, max_user_epoch):
+        user_epoch = self.find_user_block_epoch(addr, _block, max_user_epoch)
+
+    max_epoch: uint256 = self.epoch
+    epoch: uint256 = _epoch
+    if not self.is_block_epoch(_block, epoch, max_epoch):
+        epoch = self.find_block_epoch(_block, max_epoch)
+
+    return self._balance_of_at(addr, _block, user_epoch, epoch, max_epoch)
+
+
 @internal
 @view
 def supply_at(point: Point, t: uint256) -> uint256:
@@ -634,31 +886,93 @@ def supply_at(point: Point, t: uint256) -> uint256:
     return convert(last_point.bias, uint256)
 
 
+@internal
+@view
+def find_timestamp_epoch(t: uint256, max_epoch: uint256) -> uint256:
+    """
+    @notice Find the last epoch recorded at or before time `t`
+    @dev The search is narrowed to the week containing `t` using `week_epoch`
+    @param t Timestamp to find
+    @param max_epoch Don't go beyond this epoch
+    @return Epoch number
+    """
+    week: uint256 = t / WEEK * WEEK
+    _min: uint256 = self.week_epoch[week]
+    _max: uint256 = self.week_epoch[week + WEEK]
+    if _max == 0:
+        _max = max_epoch
+    else:
+        _max -= 1
+
+    # Binary search
+    for i in range(128):  # Will be always enough for 128-bit numbers
+        if _min >= _max:
+            break
+        _mid: uint256 = (_min + _max + 1) / 2
+        if self.point_history[_mid].ts <= t:
+            _min = _mid
+        else:
+            _max = _mid - 1
+    return _min
+
+
+@internal
+@view
+def _total_supply(t: uint256) -> uint256:
+    """
+    @notice Calculate total voting power at time `t`
+    @param t Time to calculate the total voting power at
+    @return Total voting power
+    """
+    _epoch: uint256 = self.epoch
+    last_point: Point = self.point_history[_epoch]
+    if t < last_point.ts:
+        # Past time: extrapolate from the last point before `t`, which is
+        # at most one week away thanks to the weekly history
+        last_point = self.point_history[self.find_timestamp_epoch(t, _epoch)]
+        if t < last_point.ts:
+            return 0  # Before the contract was deployed
+    return self.supply_at(last_point, t)
+
+
 @external
 @view
 def totalSupply(t: uint256 = block.timestamp) -> uint256:
     """
     @notice Calculate total voting power
     @dev Adheres to the ERC20 `totalSupply` interface for Aragon compatibility
+    @param t Epoch time to return total voting power at
     @return Total voting power
     """
-    _epoch: uint256 = self.epoch
-    last_point: Point = self.point_history[_epoch]
-    return self.supply_at(last_point, t)
+    return self._total_supply(t)
 
 
 @external
 @view
-def totalSupplyAt(_block: uint256) -> uint256:
+def weekly_supply(_week: uint256) -> uint256:
     """
-    @notice Calculate total voting power at some point in the past
+    @notice Get total voting power at the start of the week containing `_week`
+    @dev Weeks already filled in by a checkpoint are read directly
+    @param _week Epoch time within the week
+    @return Total voting power at the start of the week
+    """
+    week: uint256 = _week / WEEK * WEEK
+    _epoch: uint256 = self.week_epoch[week]
+    if _epoch != 0:
+        return convert(self.point_history[_epoch].bias, uint256)
+    return self._total_supply(week)
+
+
+@internal
+@view
+def _total_supply_at(_block: uint256, target_epoch: uint256, _epoch: uint256) -> uint256:
+    """
+    @notice Calculate total voting power at block `_block`
     @param _block Block to calculate the total voting power at
+    @param target_epoch Last epoch at or before `_block`
+    @param _epoch Latest epoch
     @return Total voting power at `_block`
     """
-    assert _block <= block.number
-    _epoch: uint256 = self.epoch
-    target_epoch: uint256 = self.find_block_epoch(_block, _epoch)
-
     point: Point = self.point_history[target_epoch]
     dt: uint256 = 0
     if target_epoch < _epoch:
@@ -673,6 +987,40 @@ def totalSupplyAt(_block: uint256) -> uint256:
     return self.supply_at(point, point.ts + dt)
 
 
+@external
+@view
+def totalSupplyAt(_block: uint256) -> uint256:
+    """
+    @notice Calculate total voting power at some point in the past
+    @param _block Block to calculate the total voting power at
+    @return Total voting power at `_block`
+    """
+    assert _block <= block.number
+    _epoch: uint256 = self.epoch
+    target_epoch: uint256 = self.find_block_epoch(_block, _epoch)
+    return self._total_supply_at(_block, target_epoch, _epoch)
+
+
+@external
+@view
+def totalSupplyAtHint(_block: uint256, _epoch: uint256) -> uint256:
+    """
+    @notice Calculate total voting power at some point in the past, using a
+            known epoch instead of searching for it
+    @dev The hint is checked in constant time; a wrong hint falls back to the
+         binary search, so the result always equals `totalSupplyAt`
+    @param _block Block to calculate the total voting power at
+    @param _epoch Last epoch at or before `_block`
+    @return Total voting power at `_block`
+    """
+    assert _block <= block.number
+    max_epoch: uint256 = self.epoch
+    target_epoch: uint256 = _epoch
+    if not self.is_block_epoch(_block, target_epoch, max_epoch):
+        target_epoch = self.find_block_epoch(_block, max_epoch)
+    return self._total_supply_at(_block, target_epoch, max_epoch)
+
+
 # Dummy methods for compatibility with Aragon
 
 @external
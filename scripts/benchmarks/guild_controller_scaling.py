@@ -0,0 +1,179 @@
+"""
+GuildController scaling benchmark
+=================================
+Measures how the gas of the `GuildController` hot paths grows with the number
+of guild types, the number of guilds and the number of weeks since the last
+checkpoint.
+
+For every cell of `N_TYPES` x `N_GUILDS` x `WEEKS_WITHOUT_CHECKPOINT`, a fresh
+system is deployed with that many types and guilds (spread over the types),
+fully checkpointed, left alone for that many weeks and then each action in
+`ACTIONS` is sent from the same snapshot:
+
+* `add_member`: a new member calls `Guild.join_guild`
+* `remove_member`: a member calls `Guild.leave_guild`
+* `checkpoint_guild`, `guild_relative_weight_write`: for the first guild
+* `change_type_weight`: for type 0
+
+Results are written as flat JSON records to `REPORT_JSON`, one per
+(types, guilds, weeks, action), so reports from two contract versions can be
+diffed or plotted as curves.
+
+Usage:
+    brownie run benchmarks/guild_controller_scaling --network development
+"""
+
+import json
+import os
+
+from brownie import (
+    ERC20VRH,
+    ERC20Gas,
+    GasEscrow,
+    Guild,
+    GuildController,
+    Minter,
+    RewardVestingEscrow,
+    VotingEscrow,
+    accounts,
+    chain,
+    web3,
+)
+from brownie.exceptions import VirtualMachineError
+
+REPORT_JSON = "reports/guild_controller_scaling.json"
+
+N_TYPES = [1, 10, 50, 100]  # 100 is the type cap of the `checkpoint` loop
+N_GUILDS = [1, 10, 50]
+WEEKS_WITHOUT_CHECKPOINT = [0, 1, 4, 16, 64, 128, 256, 500]
+ACTIONS = ["add_member", "remove_member", "checkpoint_guild", "change_type_weight", "guild_relative_weight_write"]
+
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+MAXTIME = 4 * YEAR
+# `create_guild` requires 100000 VRH of voting power
+OWNER_AMOUNT = 200000 * 10 ** 18
+MEMBER_AMOUNT = 10 ** 21
+N_BATCH = 50
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def setup(admin, n_types, n_guilds):
+    """
+    Deploy a fresh system with `n_types` guild types and `n_guilds` guilds,
+    each owned by a fresh address, and a member of the first guild who can
+    leave it.
+    """
+    token = ERC20VRH.deploy("Vote Escrowed Token", "VRH", 18, {"from": admin})
+    voting_escrow = VotingEscrow.deploy(token, "Voting-escrowed VRH", "veVRH", "veVRH_0.99", {"from": admin})
+    guild_controller = GuildController.deploy(
+        token, voting_escrow, Guild.deploy({"from": admin}), GasEscrow.deploy({"from": admin}), {"from": admin}
+    )
+    reward_vesting = RewardVestingEscrow.deploy({"from": admin})
+    minter = Minter.deploy(token, guild_controller, reward_vesting, {"from": admin})
+    chain.sleep(DAY + 1)
+    token.update_mining_parameters({"from": admin})
+    token.set_minter(minter, {"from": admin})
+    guild_controller.set_minter(minter, {"from": admin})
+    reward_vesting.set_minter(minter, {"from": admin})
+
+    for i in range(n_types):
+        gas_token = ERC20Gas.deploy(f"Gas Token {i}", f"GAS{i}", 18, {"from": admin})
+        guild_controller.add_type(f"Type {i}", f"TYPE{i}", gas_token, 10 ** 18, {"from": admin})
+
+    token.approve(voting_escrow, 2 ** 256 - 1, {"from": admin})
+    for i in range(n_guilds):
+        owner = accounts.add().address
+        voting_escrow.create_lock_for(owner, OWNER_AMOUNT, chain.time() + MAXTIME, {"from": admin})
+        guild_controller.create_guild(owner, i % n_types, 10, {"from": admin})
+
+    guild = Guild.at(guild_controller.guilds(0))
+    for acct in accounts[1:3]:
+        token.transfer(acct, MEMBER_AMOUNT * 10, {"from": admin})
+        token.approve(voting_escrow, MEMBER_AMOUNT * 10, {"from": acct})
+    voting_escrow.create_lock(MEMBER_AMOUNT, chain.time() + MAXTIME, {"from": accounts[2]})
+    guild.join_guild({"from": accounts[2]})
+    return voting_escrow, guild_controller, guild
+
+
+def checkpoint_all(guild_controller, admin):
+    """
+    Checkpoint every guild, in batches where the controller being measured
+    has `checkpoint_guilds` and one guild at a time otherwise.
+    """
+    guilds = [guild_controller.guilds(i) for i in range(guild_controller.n_guilds())]
+    if not hasattr(guild_controller, "checkpoint_guilds"):
+        guild_controller.checkpoint({"from": admin})
+        for guild in guilds:
+            guild_controller.checkpoint_guild(guild, {"from": admin})
+        return
+    for i in range(0, len(guilds), N_BATCH):
+        batch = guilds[i : i + N_BATCH]
+        guild_controller.checkpoint_guilds(batch + [ZERO_ADDRESS] * (N_BATCH - len(batch)), {"from": admin})
+
+
+def run_action(guild_controller, guild, action, admin):
+    if action == "add_member":
+        return guild.join_guild({"from": accounts[1]})
+    if action == "remove_member":
+        return guild.leave_guild({"from": accounts[2]})
+    if action == "checkpoint_guild":
+        return guild_controller.checkpoint_guild(guild, {"from": admin})
+    if action == "change_type_weight":
+        return guild_controller.change_type_weight(0, 2 * 10 ** 18, {"from": admin})
+    if action == "guild_relative_weight_write":
+        return guild_controller.guild_relative_weight_write(guild, {"from": admin})
+    raise ValueError(action)
+
+
+def measure(voting_escrow, guild_controller, guild, weeks, admin):
+    """
+    Measure every action after `weeks` weeks without a checkpoint.
+
+    The joining member locks right before the actions so that they can join
+    for any gap; the leaving member has been in the guild for longer than the
+    vote delay.
+    """
+    results = {}
+    chain.sleep(2 * WEEK)
+    checkpoint_all(guild_controller, admin)
+    chain.sleep(weeks * WEEK)
+    voting_escrow.create_lock(MEMBER_AMOUNT, chain.time() + YEAR + WEEK, {"from": accounts[1]})
+    chain.mine()
+    chain.snapshot()
+    for action in ACTIONS:
+        try:
+            tx = run_action(guild_controller, guild, action, admin)
+            results[action] = {"gas_used": tx.gas_used, "status": "ok"}
+        except VirtualMachineError as exc:
+            results[action] = {"gas_used": None, "status": f"reverted: {exc.revert_msg}"}
+        chain.revert()
+    return results
+
+
+def main(report_json=REPORT_JSON):
+    admin = accounts[0]
+    records = []
+    for n_types in N_TYPES:
+        for n_guilds in N_GUILDS:
+            for weeks in WEEKS_WITHOUT_CHECKPOINT:
+                # brownie keeps a single snapshot, so every cell starts from a
+                # fresh deployment and the snapshot is used to isolate actions
+                voting_escrow, guild_controller, guild = setup(admin, n_types, n_guilds)
+                for action, result in measure(voting_escrow, guild_controller, guild, weeks, admin).items():
+                    records.append({"types": n_types, "guilds": n_guilds, "weeks": weeks, "action": action, **result})
+                    print(
+                        f"types={n_types:<4} guilds={n_guilds:<4} weeks={weeks:<4} "
+                        f"{action:<28} {result['gas_used']}"
+                    )
+
+    report = {
+        "contract": "GuildController",
+        "block_gas_limit": web3.eth.get_block("latest").gasLimit,
+        "results": records,
+    }
+    os.makedirs(os.path.dirname(report_json) or ".", exist_ok=True)
+    with open(report_json, "w") as fp:
+        json.dump(report, fp, indent=2)
+    print(f"Report saved to {report_json}")
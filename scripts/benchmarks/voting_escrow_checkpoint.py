@@ -0,0 +1,136 @@
+"""
+VotingEscrow checkpoint benchmark
+=================================
+Measures how the gas of `VotingEscrow` actions grows with the number of weeks
+`_checkpoint` has to catch up on.
+
+For every number of scheduled `slope_changes` in `SLOPE_CHANGES` and every gap
+in `WEEKS_WITHOUT_CHECKPOINT`, a fresh contract is left without a checkpoint
+for that many weeks and then each action in `ACTIONS` is sent from the same
+snapshot.
+Results are written as flat JSON records to `REPORT_JSON`, one per
+(slope_changes, weeks, action), so reports from two contract versions can be
+diffed or plotted as curves.
+
+Usage:
+    brownie run benchmarks/voting_escrow_checkpoint --network development
+"""
+
+import json
+import os
+
+from brownie import ERC20VRH, VotingEscrow, accounts, chain, web3
+from brownie.exceptions import VirtualMachineError
+
+REPORT_JSON = "reports/voting_escrow_checkpoint.json"
+
+WEEKS_WITHOUT_CHECKPOINT = [0, 1, 2, 4, 8, 16, 32, 64, 128, 192, 255]
+SLOPE_CHANGES = [0, 16, 64, 156]  # at most one per week between MINTIME and MAXTIME
+ACTIONS = ["checkpoint", "create_lock", "increase_amount", "withdraw"]
+
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+MAXTIME = 4 * YEAR
+AMOUNT = 10 ** 21
+
+
+def setup(admin, slope_changes):
+    """
+    Deploy a fresh `VotingEscrow` with the locks used by the actions and
+    `slope_changes` additional scheduled slope changes.
+    """
+    token = ERC20VRH.deploy("Vote Escrowed Token", "VRH", 18, {"from": admin})
+    voting_escrow = VotingEscrow.deploy(token, "Voting-escrowed VRH", "veVRH", "veVRH_0.99", {"from": admin})
+    for acct in accounts[1:4]:
+        token.transfer(acct, AMOUNT * 10, {"from": admin})
+        token.approve(voting_escrow, AMOUNT * 10, {"from": acct})
+    token.approve(voting_escrow, 2 ** 256 - 1, {"from": admin})
+
+    voting_escrow.create_lock(AMOUNT, chain.time() + MAXTIME, {"from": accounts[2]})
+    voting_escrow.create_lock(AMOUNT, chain.time() + YEAR + WEEK, {"from": accounts[3]})
+    schedule_slope_changes(voting_escrow, admin, slope_changes)
+    return voting_escrow
+
+
+def schedule_slope_changes(voting_escrow, admin, count):
+    """
+    Create `count` locks for fresh addresses, each ending in a different week
+    so that every lock adds one non-zero `slope_changes` entry.
+    """
+    now = chain.time()
+    for i in range(count):
+        unlock_time = now + YEAR + WEEK + (i % (3 * 52)) * WEEK
+        voting_escrow.create_lock_for(accounts.add().address, AMOUNT, unlock_time, {"from": admin})
+
+
+def run_action(voting_escrow, action):
+    if action == "checkpoint":
+        return voting_escrow.checkpoint({"from": accounts[0]})
+    if action == "create_lock":
+        return voting_escrow.create_lock(AMOUNT, chain.time() + YEAR + WEEK, {"from": accounts[1]})
+    if action == "increase_amount":
+        return voting_escrow.increase_amount(AMOUNT, {"from": accounts[2]})
+    if action == "withdraw":
+        return voting_escrow.withdraw({"from": accounts[3]})
+    raise ValueError(action)
+
+
+def is_applicable(voting_escrow, action):
+    now = chain.time()
+    if action == "increase_amount":
+        return voting_escrow.locked__end(accounts[2]) > now
+    if action == "withdraw":
+        return voting_escrow.locked__end(accounts[3]) <= now
+    return True
+
+
+def measure(voting_escrow, weeks):
+    """
+    Measure every action after `weeks` weeks without a checkpoint.
+
+    The last checkpoint is placed so that the withdraw lock has expired by
+    the time the actions run, keeping all gaps comparable.
+    """
+    results = {}
+    withdraw_end = voting_escrow.locked__end(accounts[3])
+    last_checkpoint = max(chain.time(), withdraw_end - weeks * WEEK + DAY)
+    chain.sleep(last_checkpoint - chain.time())
+    voting_escrow.checkpoint({"from": accounts[0]})
+    chain.sleep(weeks * WEEK)
+    chain.mine()
+    chain.snapshot()
+    for action in ACTIONS:
+        if not is_applicable(voting_escrow, action):
+            results[action] = {"gas_used": None, "status": "not applicable"}
+            continue
+        try:
+            tx = run_action(voting_escrow, action)
+            results[action] = {"gas_used": tx.gas_used, "status": "ok"}
+        except VirtualMachineError as exc:
+            results[action] = {"gas_used": None, "status": f"reverted: {exc.revert_msg}"}
+        chain.revert()
+    return results
+
+
+def main(report_json=REPORT_JSON):
+    admin = accounts[0]
+    records = []
+    for count in SLOPE_CHANGES:
+        for weeks in WEEKS_WITHOUT_CHECKPOINT:
+            # brownie keeps a single snapshot, so every cell starts from a
+            # fresh deployment and the snapshot is used to isolate actions
+            voting_escrow = setup(admin, count)
+            for action, result in measure(voting_escrow, weeks).items():
+                records.append({"slope_changes": count, "weeks": weeks, "action": action, **result})
+                print(f"slope_changes={count:<4} weeks={weeks:<4} {action:<16} {result['gas_used']}")
+
+    report = {
+        "contract": "VotingEscrow",
+        "block_gas_limit": web3.eth.get_block("latest").gasLimit,
+        "results": records,
+    }
+    os.makedirs(os.path.dirname(report_json) or ".", exist_ok=True)
+    with open(report_json, "w") as fp:
+        json.dump(report, fp, indent=2)
+    print(f"Report saved to {report_json}")
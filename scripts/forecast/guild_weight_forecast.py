@@ -0,0 +1,137 @@
+"""
+Guild weight forecast
+=====================
+Forecasts `guild_relative_weight` of every guild for the coming weeks,
+assuming no further votes or weight changes.
+
+The guild, type and total weight schedules are read from `GuildController`
+and projected with `scripts/model/guild_controller.py`. The weekly slope
+changes make up almost all of the reads, so they are sent as JSON-RPC batches
+of `BATCH_SIZE` calls with at most `CONCURRENCY` batches in flight.
+
+Forecasts only change when the week does or when someone votes, so they are
+cached per week: in memory for `forecast` and as JSON in `CACHE_DIR` between
+runs. A cached forecast is reused for any horizon up to the one it was made
+for; pass `refresh=True` to recompute after a vote.
+
+Usage:
+    brownie run forecast/guild_weight_forecast --network mainnet
+    brownie run forecast/guild_weight_forecast main 26 --network mainnet
+    brownie run forecast/guild_weight_forecast main 26 0x1234... --network mainnet
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from brownie import GuildController, chain
+
+from scripts.model.guild_controller import WEEK, GuildControllerModel
+from scripts.snapshot.voting_power_snapshot import BatchCaller
+
+DEPLOYMENTS_JSON = "deployments.json"
+CACHE_DIR = "reports/guild_forecast"
+
+WEEKS = 13
+BATCH_SIZE = 100
+CONCURRENCY = 8
+
+_cache = {}
+
+
+def batched_call_many(guild_controller):
+    """Return a `call_many` for `GuildControllerModel.from_contract` using batch requests"""
+    caller = BatchCaller(guild_controller.address)
+
+    def call_many(fn, args_list):
+        calldata = [fn.encode_input(*args) for args in args_list]
+        batches = [calldata[i : i + BATCH_SIZE] for i in range(0, len(calldata), BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+            return [value for result in executor.map(caller.call, batches) for value in result]
+
+    return call_many
+
+
+def _cache_path(cache_dir, address, week):
+    return os.path.join(cache_dir, f"{address}_{week}.json")
+
+
+def _load(cache_dir, address, week, weeks):
+    if (address, week) in _cache:
+        cached = _cache[(address, week)]
+    elif cache_dir and os.path.exists(_cache_path(cache_dir, address, week)):
+        with open(_cache_path(cache_dir, address, week)) as fp:
+            cached = json.load(fp)
+        _cache[(address, week)] = cached
+    else:
+        return None
+    if len(cached["times"]) < weeks:
+        return None
+    return cached
+
+
+def forecast(guild_controller, weeks=WEEKS, cache_dir=CACHE_DIR, refresh=False, call_many=None):
+    """
+    Return the forecast for the `weeks` weeks from the next week start.
+
+    The result is a dict with the week start `times`, the `total` weight and
+    for every guild its `weight` and `relative_weight` per week (integers are
+    stored as decimal strings).
+    """
+    week = chain.time() // WEEK * WEEK
+    address = guild_controller.address
+    cached = None if refresh else _load(cache_dir, address, week, weeks)
+    if cached is None:
+        t_from = week + WEEK
+        if call_many is None:
+            call_many = batched_call_many(guild_controller)
+        model = GuildControllerModel.from_contract(guild_controller, t_from + (weeks - 1) * WEEK, call_many)
+        result = model.project(t_from, weeks)
+        cached = {
+            "week": week,
+            "times": [int(t) for t in result.times],
+            "total": [str(i) for i in result.total],
+            "guilds": {
+                addr: {
+                    "guild_type": model.guild_type[addr],
+                    "weight": [str(i) for i in result.guild_weight[n]],
+                    "relative_weight": [str(i) for i in result.relative_weight[n]],
+                }
+                for n, addr in enumerate(result.guilds)
+            },
+        }
+        _cache[(address, week)] = cached
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(_cache_path(cache_dir, address, week), "w") as fp:
+                json.dump(cached, fp, indent=2)
+
+    return {
+        "week": cached["week"],
+        "times": cached["times"][:weeks],
+        "total": cached["total"][:weeks],
+        "guilds": {
+            addr: {
+                "guild_type": info["guild_type"],
+                "weight": info["weight"][:weeks],
+                "relative_weight": info["relative_weight"][:weeks],
+            }
+            for addr, info in cached["guilds"].items()
+        },
+    }
+
+
+def main(weeks=WEEKS, guild=None, refresh=False):
+    with open(DEPLOYMENTS_JSON) as fp:
+        deployments = json.load(fp)
+    guild_controller = GuildController.at(deployments["GuildController"])
+
+    result = forecast(guild_controller, int(weeks), refresh=refresh)
+    guilds = result["guilds"]
+    if guild is not None:
+        guilds = {addr: info for addr, info in guilds.items() if addr.lower() == guild.lower()}
+    for addr, info in guilds.items():
+        print(f"{addr} (type {info['guild_type']})")
+        for t, weight in zip(result["times"], info["relative_weight"]):
+            print(f"  week of {datetime.utcfromtimestamp(t).date()}: {int(weight) / 1e16:.4f}%")
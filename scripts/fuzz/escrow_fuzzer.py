@@ -0,0 +1,403 @@
+"""
+Escrow differential fuzzer
+==========================
+Runs random action sequences against the pure-Python models of
+`VotingEscrow`, `GasEscrow` and `RewardVestingEscrow` in `scripts/model` and
+checks accounting invariants after every step. Without a chain in the loop a
+sequence takes milliseconds, so millions of steps can be explored offline.
+
+A sampled subset of the sequences is replayed against freshly deployed
+contracts. During a replay the model is driven with the timestamp and block
+number of each mined transaction, and the contract state is compared with
+the model after every step.
+
+Every sequence is generated from its own seed, so a failure is reproduced with
+`replay <kind> <seed>`.
+
+Usage:
+    brownie run fuzz/escrow_fuzzer --network development
+    brownie run fuzz/escrow_fuzzer main voting_escrow 100000 20 --network development
+    brownie run fuzz/escrow_fuzzer replay gas_escrow 1234 --network development
+"""
+
+import multiprocessing
+import random
+from collections import namedtuple
+
+from scripts.model.gas_escrow import GasEscrowModel
+from scripts.model.reward_vesting import RewardVestingEscrowModel
+from scripts.model.voting_escrow import EMPTY_LOCK, Revert, VotingEscrowModel
+
+KINDS = ["voting_escrow", "gas_escrow", "reward_vesting"]
+SEQUENCE_LENGTH = 40
+N_USERS = 4
+
+HOUR = 3600
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+MAXTIME = 4 * YEAR
+MINTIME = YEAR
+
+# offline sequences start on an arbitrary week boundary
+START_TS = 2600 * WEEK
+START_BLOCK = 1
+BLOCK_TIME = 13
+
+# (action, relative weight) per contract
+ACTIONS = {
+    "voting_escrow": [
+        ("create_lock", 4),
+        ("increase_amount", 3),
+        ("increase_unlock_time", 2),
+        ("deposit_for", 2),
+        ("withdraw", 3),
+        ("checkpoint", 1),
+    ],
+    "gas_escrow": [
+        ("create_gas", 4),
+        ("increase_amount", 3),
+        ("clear_gas", 3),
+        ("checkpoint", 1),
+    ],
+    "reward_vesting": [
+        ("vesting", 3),
+        ("claim", 2),
+    ],
+}
+
+# (low, high, weight) buckets of the time between two actions
+TIME_STEPS = [(1, HOUR, 2), (HOUR, DAY, 3), (DAY, WEEK, 3), (WEEK, 8 * WEEK, 3), (8 * WEEK, 60 * WEEK, 1)]
+
+# lock times are week-rounded and compared with `block.timestamp` plus these,
+# replayed actions are kept this far from where a second changes the outcome
+BOUNDARY_MARGIN = 60
+BOUNDARY_OFFSETS = [0, -MINTIME % WEEK, -MAXTIME % WEEK]
+
+Action = namedtuple("Action", ["dt", "name", "user", "value", "duration"])
+Failure = namedtuple("Failure", ["kind", "seed", "step", "action", "message"])
+
+
+def _weighted(rng, choices):
+    return rng.choices([i[:-1] for i in choices], weights=[i[-1] for i in choices])[0]
+
+
+def random_action(rng, kind):
+    low, high = _weighted(rng, TIME_STEPS)
+    (name,) = _weighted(rng, ACTIONS[kind])
+    # log-uniform amounts, including ones too small for a non-zero slope
+    value = rng.randrange(1, 10 ** rng.randrange(1, 25))
+    if rng.random() < 0.8:
+        duration = rng.randrange(MINTIME - WEEK, MAXTIME + WEEK)
+    else:
+        duration = rng.randrange(0, MAXTIME + 4 * WEEK)
+    return Action(rng.randrange(low, high), name, rng.randrange(N_USERS), value, duration)
+
+
+def random_sequence(kind, seed, length=SEQUENCE_LENGTH):
+    rng = random.Random(f"{kind}-{seed}")
+    return [random_action(rng, kind) for _ in range(length)]
+
+
+def new_model(kind):
+    if kind == "voting_escrow":
+        return VotingEscrowModel()
+    if kind == "gas_escrow":
+        return GasEscrowModel()
+    if kind == "reward_vesting":
+        return RewardVestingEscrowModel()
+    raise ValueError(kind)
+
+
+def call_args(action, users, now):
+    """
+    Arguments of the contract call for `action` sent at time `now`, without
+    the sender. The model receives the same arguments.
+    """
+    if action.name == "create_lock":
+        return (action.value, now + action.duration)
+    if action.name == "increase_unlock_time":
+        return (now + action.duration,)
+    if action.name in ("increase_amount", "create_gas"):
+        return (action.value,)
+    if action.name in ("deposit_for", "vesting"):
+        return (users[action.user], action.value)
+    if action.name == "claim":
+        return (users[action.user],)
+    return ()
+
+
+def apply_model(model, action, users, args, timestamp, block_number):
+    """Apply `action` to `model`, returning the value returned by the contract call"""
+    addr = users[action.user]
+    if action.name == "checkpoint":
+        return model.checkpoint(None, EMPTY_LOCK, EMPTY_LOCK, timestamp, block_number)
+    if action.name == "vesting":
+        return model.vesting(*args, timestamp)
+    if action.name == "claim":
+        return model.claim(*args, timestamp)
+    if action.name == "deposit_for":
+        return model.deposit_for(*args, timestamp, block_number)
+    return getattr(model, action.name)(addr, *args, timestamp, block_number)
+
+
+def check_invariants(kind, model, users, timestamp, vested):
+    """Return a description of the first broken invariant, or None"""
+    if kind == "reward_vesting":
+        for addr in users:
+            remaining = sum(i.amount for i in model.user_vesting_history.get(addr, [])[1:])
+            balance = model.balance_of.get(addr, 0)
+            if remaining != balance:
+                return f"{addr}: vesting amounts {remaining} != balanceOf {balance}"
+            claimed = model.total_claimed.get(addr, 0)
+            if balance + claimed != vested.get(addr, 0):
+                return f"{addr}: balanceOf + claimed {balance + claimed} != vested {vested.get(addr, 0)}"
+        return None
+
+    locked = sum(model.locked.get(addr, EMPTY_LOCK).amount for addr in users)
+    if locked != model.supply:
+        return f"locked amounts {locked} != supply {model.supply}"
+    times = [timestamp, timestamp + WEEK, timestamp + YEAR, timestamp + MAXTIME]
+    balances = model.balance_of(users, times).sum(axis=0)
+    total = model.total_supply(times)
+    for t, balance, supply in zip(times, balances, total):
+        if balance != supply:
+            return f"sum of balances {balance} != totalSupply {supply} at {t}"
+    return None
+
+
+def run_sequence(kind, seed, length=SEQUENCE_LENGTH):
+    """
+    Run one sequence on the model only.
+
+    Returns (failure or None, number of reverted actions).
+    """
+    users = [f"user{i}" for i in range(N_USERS)]
+    model = new_model(kind)
+    vested = {}
+    timestamp, block_number = START_TS, START_BLOCK
+    reverts = 0
+    for step, action in enumerate(random_sequence(kind, seed, length)):
+        timestamp += action.dt
+        block_number += 1 + action.dt // BLOCK_TIME
+        args = call_args(action, users, timestamp)
+        try:
+            result = apply_model(model, action, users, args, timestamp, block_number)
+        except Revert:
+            reverts += 1
+            continue
+        except OverflowError as exc:
+            return Failure(kind, seed, step, action, f"arithmetic overflow: {exc}"), reverts
+        if action.name == "vesting":
+            vested[args[0]] = vested.get(args[0], 0) + result
+        message = check_invariants(kind, model, users, timestamp, vested)
+        if message:
+            return Failure(kind, seed, step, action, message), reverts
+    return None, reverts
+
+
+def _run_chunk(params):
+    kind, seeds, length = params
+    failures = []
+    reverts = 0
+    for seed in seeds:
+        failure, n = run_sequence(kind, seed, length)
+        reverts += n
+        if failure:
+            failures.append(failure)
+    return failures, reverts
+
+
+def run_offline(kind, seeds, length=SEQUENCE_LENGTH, processes=None, chunk_size=500):
+    """
+    Run the sequences for `seeds` on the model, spread over `processes`
+    worker processes (default: one per CPU).
+
+    Returns (failures, total number of reverted actions).
+    """
+    seeds = list(seeds)
+    chunks = [(kind, seeds[i : i + chunk_size], length) for i in range(0, len(seeds), chunk_size)]
+    if processes == 1:
+        results = map(_run_chunk, chunks)
+    else:
+        pool = multiprocessing.Pool(processes)
+        results = pool.imap_unordered(_run_chunk, chunks)
+    failures = []
+    reverts = 0
+    for chunk_failures, chunk_reverts in results:
+        failures += chunk_failures
+        reverts += chunk_reverts
+    if processes != 1:
+        pool.close()
+        pool.join()
+    return sorted(failures, key=lambda i: i.seed), reverts
+
+
+def deploy(kind, admin, users):
+    """Deploy a fresh contract for `kind`, funded and approved for `users`"""
+    from brownie import (
+        ERC20VRH,
+        ERC20Gas,
+        GasEscrow,
+        Guild,
+        GuildController,
+        RewardVestingEscrow,
+        VotingEscrow,
+    )
+
+    if kind == "reward_vesting":
+        reward_vesting = RewardVestingEscrow.deploy({"from": admin})
+        reward_vesting.set_minter(admin, {"from": admin})
+        return reward_vesting
+
+    token = ERC20VRH.deploy("Vote Escrowed Token", "VRH", 18, {"from": admin})
+    voting_escrow = VotingEscrow.deploy(token, "Voting-escrowed VRH", "veVRH", "veVRH_0.99", {"from": admin})
+    if kind == "voting_escrow":
+        escrow, escrow_token = voting_escrow, token
+    else:
+        gas_token = ERC20Gas.deploy("Gas Escrowed Token", "MOH", 18, {"from": admin})
+        guild_controller = GuildController.deploy(
+            token, voting_escrow, Guild.deploy({"from": admin}), GasEscrow.deploy({"from": admin}), {"from": admin}
+        )
+        guild_controller.add_type("Gas MOH", "GASMOH", gas_token, 10 ** 18, {"from": admin})
+        escrow, escrow_token = GasEscrow.at(guild_controller.gas_type_escrow(0)), gas_token
+
+    for acct in users:
+        escrow_token.transfer(acct, 10 ** 26, {"from": admin})
+        escrow_token.approve(escrow, 2 ** 256 - 1, {"from": acct})
+    escrow_token.approve(escrow, 2 ** 256 - 1, {"from": admin})
+    return escrow
+
+
+def _near_boundary(now):
+    for offset in BOUNDARY_OFFSETS:
+        distance = (now - offset) % WEEK
+        if distance < BOUNDARY_MARGIN or distance > WEEK - BOUNDARY_MARGIN:
+            return True
+    return False
+
+
+def _compare(kind, escrow, model, users, addr, timestamp, prev_epoch):
+    """Return a description of the first difference between contract and model, or None"""
+    if kind == "reward_vesting":
+        user_epoch = model.user_vesting_epoch.get(addr, 0)
+        expected = [
+            ("balanceOf", escrow.balanceOf(addr), model.balance_of.get(addr, 0)),
+            ("total_claimed", escrow.total_claimed(addr), model.total_claimed.get(addr, 0)),
+            ("user_vesting_epoch", escrow.user_vesting_epoch(addr), user_epoch),
+        ]
+        for i in range(1, user_epoch + 1):
+            expected.append(
+                (f"user_vesting_history[{i}]", tuple(escrow.user_vesting_history(addr, i)), model._vesting_info(addr, i))
+            )
+    else:
+        balances = escrow.burned(addr) if kind == "gas_escrow" else escrow.locked(addr)
+        user_epoch = model.user_point_epoch.get(addr, 0)
+        expected = [
+            ("epoch", escrow.epoch(), model.epoch),
+            ("supply", escrow.supply(), model.supply),
+            ("locked", tuple(balances), tuple(model.locked.get(addr, EMPTY_LOCK))),
+            ("user_point_epoch", escrow.user_point_epoch(addr), user_epoch),
+            (
+                "user_point_history",
+                tuple(escrow.user_point_history(addr, user_epoch)),
+                tuple(model._user_point(addr, user_epoch)),
+            ),
+        ]
+        for i in range(prev_epoch + 1, model.epoch + 1):
+            expected.append((f"point_history[{i}]", tuple(escrow.point_history(i)), model.point_history[i]))
+        times = [timestamp, timestamp + WEEK, timestamp + YEAR]
+        for t, supply in zip(times, model.total_supply(times)):
+            expected.append((f"totalSupply({t})", escrow.totalSupply(t), supply))
+        for user, balance in zip(users, model.balance_of(users, [timestamp])[:, 0]):
+            expected.append((f"balanceOf({user}, {timestamp})", escrow.balanceOf(user, timestamp), balance))
+
+    for name, actual, wanted in expected:
+        if actual != wanted:
+            return f"{name}: contract {actual} != model {wanted}"
+    return None
+
+
+def replay_on_chain(kind, escrow, seed, users, admin, length=SEQUENCE_LENGTH):
+    """
+    Replay the sequence for `seed` on the deployed `escrow` and compare it
+    with the model after every step. Returns a Failure or None.
+    """
+    from brownie import chain
+    from brownie.exceptions import VirtualMachineError
+
+    model = new_model(kind)
+    if kind != "reward_vesting":
+        model = type(model).from_contract(escrow, users)
+    for step, action in enumerate(random_sequence(kind, seed, length)):
+        chain.sleep(action.dt)
+        while _near_boundary(chain.time()):
+            chain.sleep(BOUNDARY_MARGIN)
+        now = chain.time()
+        args = call_args(action, users, now)
+        sender = admin if action.name in ("deposit_for", "vesting", "claim", "checkpoint") else users[action.user]
+        prev_epoch = getattr(model, "epoch", 0)
+
+        try:
+            tx = getattr(escrow, action.name)(*args, {"from": sender})
+        except VirtualMachineError as exc:
+            try:
+                apply_model(model, action, users, args, now, chain.height + 1)
+            except Revert:
+                continue
+            return Failure(kind, seed, step, action, f"contract reverted ({exc.revert_msg}), model did not")
+
+        try:
+            result = apply_model(model, action, users, args, tx.timestamp, tx.block_number)
+        except (Revert, OverflowError) as exc:
+            return Failure(kind, seed, step, action, f"model reverted ({exc}), contract did not")
+        if action.name == "claim" and tx.return_value != result:
+            return Failure(kind, seed, step, action, f"claimed: contract {tx.return_value} != model {result}")
+
+        message = _compare(kind, escrow, model, users, users[action.user], tx.timestamp, prev_epoch)
+        if message:
+            return Failure(kind, seed, step, action, message)
+    return None
+
+
+def _print_failure(failure):
+    print(f"FAIL {failure.kind} seed={failure.seed} step={failure.step} {failure.action}: {failure.message}")
+
+
+def replay(kind, seed, length=SEQUENCE_LENGTH):
+    """Deploy a fresh contract and replay a single sequence on chain"""
+    from brownie import accounts
+
+    escrow = deploy(kind, accounts[0], accounts[1 : N_USERS + 1])
+    failure = replay_on_chain(kind, escrow, int(seed), list(accounts[1 : N_USERS + 1]), accounts[0], int(length))
+    if failure:
+        _print_failure(failure)
+    else:
+        print(f"{kind} seed={seed}: contract matches the model")
+    return failure
+
+
+def main(kind="voting_escrow", sequences=10000, sample=10, length=SEQUENCE_LENGTH, processes=None):
+    from brownie import accounts, chain
+
+    sequences, sample, length = int(sequences), int(sample), int(length)
+    processes = int(processes) if processes else None
+    failures, reverts = run_offline(kind, range(sequences), length, processes)
+    print(f"{kind}: {sequences} sequences, {sequences * length} actions ({reverts} reverted) on the model")
+    for failure in failures:
+        _print_failure(failure)
+
+    users = list(accounts[1 : N_USERS + 1])
+    rng = random.Random()
+    # failing sequences are replayed first to tell model bugs from contract bugs
+    seeds = [i.seed for i in failures[:sample]]
+    seeds += rng.sample(range(sequences), min(sample - len(seeds), sequences))
+    chain.snapshot()
+    for seed in seeds:
+        escrow = deploy(kind, accounts[0], users)
+        failure = replay_on_chain(kind, escrow, seed, users, accounts[0], length)
+        if failure:
+            _print_failure(failure)
+        else:
+            print(f"{kind} seed={seed}: contract matches the model")
+        chain.revert()
@@ -0,0 +1,193 @@
+"""
+Guild roster indexer
+====================
+Incrementally builds per-guild member rosters of `GuildController` from its
+`NewGuild`, `AddMember`, `RemoveMember` and `TransferGuildOwnership` logs into
+a local SQLite database.
+
+The contract only maps members to guilds (`global_member_list`), so listing
+the members of a guild otherwise needs a scan over every known address. Here
+each guild row keeps its owner, current member count and total joins and
+leaves, and weekly joins and leaves are kept per guild, so counts and churn
+are single row lookups and a roster is one indexed query.
+
+`NewGuild` does not name the owner, who joins the guild on creation; it is
+read from `Guild.owner()` at the block of the log, so syncing old blocks
+needs an archive node.
+
+Logs are read in chunks of `CHUNK_SIZE` blocks. Each chunk is applied in a
+single database transaction together with the last processed block, so an
+interrupted run resumes from the last complete chunk.
+
+Usage:
+    brownie run indexer/guild_roster_indexer --network mainnet
+"""
+
+import json
+import sqlite3
+
+from brownie import Guild, GuildController, web3
+
+DEPLOYMENTS_JSON = "deployments.json"
+DATABASE = "guild_roster.sqlite"
+CHUNK_SIZE = 5000
+# blocks behind the chain head to stay clear of reorgs
+CONFIRMATIONS = 5
+
+WEEK = 7 * 86400
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS guilds (
+    addr TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    created INTEGER NOT NULL,
+    members INTEGER NOT NULL,
+    joins INTEGER NOT NULL,
+    leaves INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS members (
+    addr TEXT PRIMARY KEY,
+    guild TEXT NOT NULL,
+    joined INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS members_guild ON members (guild, joined);
+CREATE TABLE IF NOT EXISTS weekly_churn (
+    guild TEXT NOT NULL,
+    week INTEGER NOT NULL,
+    joins INTEGER NOT NULL,
+    leaves INTEGER NOT NULL,
+    PRIMARY KEY (guild, week)
+);
+"""
+
+
+class GuildRosterIndexer:
+    def __init__(self, db_path, guild_controller, start_block=0):
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(SCHEMA)
+        self.contract = web3.eth.contract(address=guild_controller.address, abi=guild_controller.abi)
+        self.start_block = start_block
+        self._timestamps = {}
+
+    @property
+    def last_block(self):
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'last_block'").fetchone()
+        return row[0] if row else self.start_block - 1
+
+    def sync(self, to_block=None):
+        """
+        Process all logs from the last processed block until `to_block`
+        (default: `CONFIRMATIONS` blocks behind the head).
+        """
+        if to_block is None:
+            to_block = web3.eth.block_number - CONFIRMATIONS
+        from_block = self.last_block + 1
+        while from_block <= to_block:
+            chunk_end = min(from_block + CHUNK_SIZE - 1, to_block)
+            logs = self._fetch_logs(from_block, chunk_end)
+            with self.db:
+                for log in logs:
+                    self.apply(log)
+                self.db.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_block', ?)", (chunk_end,)
+                )
+            print(f"Indexed blocks {from_block}-{chunk_end}: {len(logs)} events")
+            self._timestamps.clear()
+            from_block = chunk_end + 1
+
+    def _fetch_logs(self, from_block, to_block):
+        logs = []
+        events = self.contract.events
+        for event in (events.NewGuild, events.AddMember, events.RemoveMember, events.TransferGuildOwnership):
+            logs += event.getLogs(fromBlock=from_block, toBlock=to_block)
+        return sorted(logs, key=lambda log: (log.blockNumber, log.logIndex))
+
+    def _timestamp(self, block_number):
+        if block_number not in self._timestamps:
+            self._timestamps[block_number] = web3.eth.get_block(block_number).timestamp
+        return self._timestamps[block_number]
+
+    def apply(self, log):
+        """Apply a single decoded log to the store. Must be called in log order."""
+        args = log.args
+        ts = self._timestamp(log.blockNumber)
+        if log.event == "NewGuild":
+            owner = Guild.at(args.addr).owner(block_identifier=log.blockNumber)
+            self.db.execute("INSERT INTO guilds VALUES (?, ?, ?, 0, 0, 0)", (args.addr, owner, ts))
+            self._join(args.addr, owner, ts)
+        elif log.event == "AddMember":
+            self._join(args.guild_addr, args.member_addr, ts)
+        elif log.event == "RemoveMember":
+            self._leave(args.guild_addr, args.member_addr, ts)
+        elif log.event == "TransferGuildOwnership":
+            self.db.execute("UPDATE guilds SET owner = ? WHERE addr = ?", (args.to_addr, args.guild))
+
+    def _join(self, guild, member, ts):
+        self.db.execute("INSERT OR REPLACE INTO members VALUES (?, ?, ?)", (member, guild, ts))
+        self.db.execute("UPDATE guilds SET members = members + 1, joins = joins + 1 WHERE addr = ?", (guild,))
+        self._add_churn(guild, ts, 1, 0)
+
+    def _leave(self, guild, member, ts):
+        self.db.execute("DELETE FROM members WHERE addr = ?", (member,))
+        self.db.execute("UPDATE guilds SET members = members - 1, leaves = leaves + 1 WHERE addr = ?", (guild,))
+        self._add_churn(guild, ts, 0, 1)
+
+    def _add_churn(self, guild, ts, joins, leaves):
+        week = ts // WEEK * WEEK
+        self.db.execute(
+            """
+            INSERT INTO weekly_churn VALUES (?, ?, ?, ?)
+            ON CONFLICT (guild, week) DO UPDATE SET joins = joins + excluded.joins, leaves = leaves + excluded.leaves
+            """,
+            (guild, week, joins, leaves),
+        )
+
+    def guilds(self):
+        """Addresses of all indexed guilds, in creation order"""
+        return [row[0] for row in self.db.execute("SELECT addr FROM guilds ORDER BY created, rowid")]
+
+    def owner(self, guild):
+        """Current owner of `guild`, `ZERO_ADDRESS` if ownership was given up"""
+        row = self.db.execute("SELECT owner FROM guilds WHERE addr = ?", (guild,)).fetchone()
+        return row[0] if row else ZERO_ADDRESS
+
+    def guild_of(self, member):
+        """Guild `member` belongs to, as `GuildController.global_member_list`"""
+        row = self.db.execute("SELECT guild FROM members WHERE addr = ?", (member,)).fetchone()
+        return row[0] if row else ZERO_ADDRESS
+
+    def roster(self, guild):
+        """Return (member, join timestamp) of every current member of `guild`, oldest first"""
+        return self.db.execute(
+            "SELECT addr, joined FROM members WHERE guild = ? ORDER BY joined, rowid", (guild,)
+        ).fetchall()
+
+    def member_count(self, guild):
+        row = self.db.execute("SELECT members FROM guilds WHERE addr = ?", (guild,)).fetchone()
+        return row[0] if row else 0
+
+    def churn(self, guild, week=None):
+        """
+        Return (joins, leaves) of `guild` since it was created, or during the
+        week starting at `week`
+        """
+        if week is None:
+            row = self.db.execute("SELECT joins, leaves FROM guilds WHERE addr = ?", (guild,)).fetchone()
+        else:
+            row = self.db.execute(
+                "SELECT joins, leaves FROM weekly_churn WHERE guild = ? AND week = ?", (guild, week // WEEK * WEEK)
+            ).fetchone()
+        return tuple(row) if row else (0, 0)
+
+
+def main(database=DATABASE, start_block=0):
+    with open(DEPLOYMENTS_JSON) as fp:
+        deployments = json.load(fp)
+    guild_controller = GuildController.at(deployments["GuildController"])
+    indexer = GuildRosterIndexer(database, guild_controller, start_block)
+    indexer.sync()
+    for guild in indexer.guilds():
+        joins, leaves = indexer.churn(guild)
+        print(f"{guild}: {indexer.member_count(guild)} members, {joins} joins, {leaves} leaves")
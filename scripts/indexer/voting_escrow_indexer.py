@@ -0,0 +1,177 @@
+"""
+VotingEscrow lock indexer
+=========================
+Incrementally rebuilds per-user lock state of `VotingEscrow` from its
+`Deposit`, `Withdraw` and `Supply` logs into a local SQLite database.
+
+Logs are read in chunks of `CHUNK_SIZE` blocks. Each chunk is applied in a
+single database transaction together with the last processed block, so an
+interrupted run resumes from the last complete chunk and a periodic refresh
+only reads new blocks.
+
+Usage:
+    brownie run indexer/voting_escrow_indexer --network mainnet
+"""
+
+import json
+import sqlite3
+
+from brownie import VotingEscrow, web3
+
+DEPLOYMENTS_JSON = "deployments.json"
+DATABASE = "voting_escrow.sqlite"
+CHUNK_SIZE = 5000
+# blocks behind the chain head to stay clear of reorgs
+CONFIRMATIONS = 5
+
+MAXTIME = 4 * 365 * 86400
+
+# amounts are stored as decimal strings, sqlite integers are only 64 bit
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS locks (
+    addr TEXT PRIMARY KEY,
+    amount TEXT NOT NULL,
+    end INTEGER NOT NULL,
+    user_epoch INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_points (
+    addr TEXT NOT NULL,
+    epoch INTEGER NOT NULL,
+    bias TEXT NOT NULL,
+    slope TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    blk INTEGER NOT NULL,
+    PRIMARY KEY (addr, epoch)
+);
+CREATE TABLE IF NOT EXISTS slope_changes (ts INTEGER PRIMARY KEY, slope TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS supply (
+    blk INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    prev_supply TEXT NOT NULL,
+    supply TEXT NOT NULL,
+    PRIMARY KEY (blk, log_index)
+);
+"""
+
+
+class VotingEscrowIndexer:
+    def __init__(self, db_path, voting_escrow, start_block=0):
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(SCHEMA)
+        self.contract = web3.eth.contract(address=voting_escrow.address, abi=voting_escrow.abi)
+        self.start_block = start_block
+
+    @property
+    def last_block(self):
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'last_block'").fetchone()
+        return row[0] if row else self.start_block - 1
+
+    def sync(self, to_block=None):
+        """
+        Process all logs from the last processed block until `to_block`
+        (default: `CONFIRMATIONS` blocks behind the head).
+        """
+        if to_block is None:
+            to_block = web3.eth.block_number - CONFIRMATIONS
+        from_block = self.last_block + 1
+        while from_block <= to_block:
+            chunk_end = min(from_block + CHUNK_SIZE - 1, to_block)
+            logs = self._fetch_logs(from_block, chunk_end)
+            with self.db:
+                for log in logs:
+                    self.apply(log)
+                self.db.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_block', ?)", (chunk_end,)
+                )
+            print(f"Indexed blocks {from_block}-{chunk_end}: {len(logs)} events")
+            from_block = chunk_end + 1
+
+    def _fetch_logs(self, from_block, to_block):
+        logs = []
+        for event in (self.contract.events.Deposit, self.contract.events.Withdraw, self.contract.events.Supply):
+            logs += event.getLogs(fromBlock=from_block, toBlock=to_block)
+        return sorted(logs, key=lambda log: (log.blockNumber, log.logIndex))
+
+    def apply(self, log):
+        """Apply a single decoded log to the store. Must be called in log order."""
+        args = log.args
+        if log.event == "Deposit":
+            old_amount, old_end, _ = self.locked(args.provider)
+            self._update_lock(
+                args.provider, old_amount, old_end, old_amount + args.value, args.locktime, args.ts, log.blockNumber
+            )
+        elif log.event == "Withdraw":
+            old_amount, old_end, _ = self.locked(args.provider)
+            self._update_lock(args.provider, old_amount, old_end, 0, 0, args.ts, log.blockNumber)
+        elif log.event == "Supply":
+            self.db.execute(
+                "INSERT OR REPLACE INTO supply VALUES (?, ?, ?, ?)",
+                (log.blockNumber, log.logIndex, str(args.prevSupply), str(args.supply)),
+            )
+
+    def _update_lock(self, addr, old_amount, old_end, amount, end, ts, blk):
+        # Same bookkeeping as `VotingEscrow._checkpoint` for a single user
+        old_slope = old_amount // MAXTIME if old_end > ts and old_amount > 0 else 0
+        new_slope = amount // MAXTIME if end > ts and amount > 0 else 0
+        new_bias = new_slope * (end - ts) if new_slope else 0
+
+        if old_end > ts:
+            d_slope = self._slope_change(old_end) + old_slope
+            if end == old_end:
+                d_slope -= new_slope
+            self._set_slope_change(old_end, d_slope)
+        if end > ts and end > old_end:
+            self._set_slope_change(end, self._slope_change(end) - new_slope)
+
+        user_epoch = self.locked(addr)[2] + 1
+        self.db.execute(
+            "INSERT OR REPLACE INTO locks VALUES (?, ?, ?, ?)", (addr, str(amount), end, user_epoch)
+        )
+        self.db.execute(
+            "INSERT OR REPLACE INTO user_points VALUES (?, ?, ?, ?, ?, ?)",
+            (addr, user_epoch, str(new_bias), str(new_slope), ts, blk),
+        )
+
+    def _slope_change(self, ts):
+        row = self.db.execute("SELECT slope FROM slope_changes WHERE ts = ?", (ts,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def _set_slope_change(self, ts, slope):
+        self.db.execute("INSERT OR REPLACE INTO slope_changes VALUES (?, ?)", (ts, str(slope)))
+
+    def locked(self, addr):
+        """Return (amount, end, user_epoch) of the lock for `addr`"""
+        row = self.db.execute("SELECT amount, end, user_epoch FROM locks WHERE addr = ?", (addr,)).fetchone()
+        if row is None:
+            return 0, 0, 0
+        return int(row[0]), row[1], row[2]
+
+    def user_point(self, addr, epoch=None):
+        """Return (bias, slope, ts, blk) of user checkpoint `epoch`, the latest by default"""
+        if epoch is None:
+            epoch = self.locked(addr)[2]
+        row = self.db.execute(
+            "SELECT bias, slope, ts, blk FROM user_points WHERE addr = ? AND epoch = ?", (addr, epoch)
+        ).fetchone()
+        if row is None:
+            return 0, 0, 0, 0
+        return int(row[0]), int(row[1]), row[2], row[3]
+
+    def balance_of(self, addr, t):
+        """Voting power of `addr` at time `t`, as `VotingEscrow.balanceOf`"""
+        bias, slope, ts, _ = self.user_point(addr)
+        return max(bias - slope * (t - ts), 0)
+
+    def holders(self):
+        """Addresses with a non-zero lock"""
+        return [row[0] for row in self.db.execute("SELECT addr FROM locks WHERE amount != '0'")]
+
+
+def main(database=DATABASE, start_block=0):
+    with open(DEPLOYMENTS_JSON) as fp:
+        deployments = json.load(fp)
+    voting_escrow = VotingEscrow.at(deployments["VotingEscrow"])
+    indexer = VotingEscrowIndexer(database, voting_escrow, start_block)
+    indexer.sync()
+    print(f"{len(indexer.holders())} holders indexed up to block {indexer.last_block}")
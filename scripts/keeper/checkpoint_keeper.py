@@ -0,0 +1,165 @@
+"""
+Checkpoint keeper
+=================
+Keeps `VotingEscrow`, every `GasEscrow` and `GuildController` checkpointed so
+that user transactions only pay for at most `MAX_PENDING_WEEKS` weeks of
+history catch-up in their `_checkpoint` / `_get_*` loops.
+
+The keeper reads the last checkpointed time of each contract:
+
+* `VotingEscrow` / `GasEscrow`: `point_history(epoch()).ts`
+* `GuildController`: `time_total`, `time_sum` per type and `time_weight` per
+  guild (these hold the next week to fill)
+
+and sends `checkpoint()` / `checkpoint_guilds(addrs)` where too many weeks are
+pending. `checkpoint_guilds` fills the data common for all guilds once and
+then up to `GUILD_BATCH_SIZE` guilds; the batches are sent without waiting
+for each confirmation.
+
+Usage:
+    brownie run keeper/checkpoint_keeper dry_run --network mainnet-fork
+    brownie run keeper/checkpoint_keeper --network mainnet
+    brownie run keeper/checkpoint_keeper run_forever --network mainnet
+"""
+
+import json
+import time
+
+from brownie import GasEscrow, GuildController, VotingEscrow, accounts, chain, network
+
+DEPLOYMENTS_JSON = "deployments.json"
+# account id used with `accounts.load` on live networks
+KEEPER_ACCOUNT = "keeper"
+
+WEEK = 7 * 86400
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+# checkpoint as soon as this many weeks are waiting to be filled
+MAX_PENDING_WEEKS = 1
+# size of the `GuildController.checkpoint_guilds` address array
+GUILD_BATCH_SIZE = 50
+POLL_INTERVAL = 3600
+
+
+def get_keeper():
+    if network.show_active() == "development" or network.show_active().endswith("-fork"):
+        return accounts[0]
+    return accounts.load(KEEPER_ACCOUNT)
+
+
+def get_contracts():
+    with open(DEPLOYMENTS_JSON) as fp:
+        deployments = json.load(fp)
+    voting_escrow = VotingEscrow.at(deployments["VotingEscrow"])
+    guild_controller = GuildController.at(deployments["GuildController"])
+    gas_escrows = []
+    for type_id in range(guild_controller.n_guild_types()):
+        addr = guild_controller.gas_type_escrow(type_id)
+        if addr != ZERO_ADDRESS:
+            gas_escrows.append(GasEscrow.at(addr))
+    return voting_escrow, gas_escrows, guild_controller
+
+
+def weeks_since(last_ts, now):
+    """Number of week boundaries a `_checkpoint` at `now` has to fill since `last_ts`"""
+    return now // WEEK - last_ts // WEEK
+
+
+def weeks_until(next_ts, now):
+    """Number of weeks a `_get_*` loop at `now` has to fill from the scheduled time `next_ts`"""
+    if next_ts == 0 or next_ts > now:
+        return 0
+    return (now - next_ts) // WEEK + 1
+
+
+def pending_checkpoints(voting_escrow, gas_escrows, guild_controller, now):
+    """
+    Find the checkpoints needed at time `now`.
+
+    Returns a list of (contract, function name, args, pending weeks) for the
+    global checkpoints and a separate list for the batched guild checkpoints.
+    """
+    calls = []
+    for escrow in [voting_escrow] + gas_escrows:
+        pending = weeks_since(escrow.point_history(escrow.epoch())["ts"], now)
+        if pending >= MAX_PENDING_WEEKS:
+            calls.append((escrow, "checkpoint", (), pending))
+
+    # `GuildController.checkpoint` fills the total and every type sum
+    pending = weeks_until(guild_controller.time_total(), now)
+    type_pending = 0
+    for type_id in range(guild_controller.n_guild_types()):
+        type_pending = max(type_pending, weeks_until(guild_controller.time_sum(type_id), now))
+
+    guilds = []
+    guilds_pending = 0
+    for i in range(guild_controller.n_guilds()):
+        guild = guild_controller.guilds(i)
+        guild_pending = weeks_until(guild_controller.time_weight(guild), now)
+        if guild_pending >= MAX_PENDING_WEEKS:
+            guilds.append(guild)
+            guilds_pending = max(guilds_pending, guild_pending)
+
+    guild_calls = []
+    for i in range(0, len(guilds), GUILD_BATCH_SIZE):
+        batch = guilds[i : i + GUILD_BATCH_SIZE]
+        batch += [ZERO_ADDRESS] * (GUILD_BATCH_SIZE - len(batch))
+        guild_calls.append((guild_controller, "checkpoint_guilds", (batch,), guilds_pending))
+
+    # `checkpoint_guilds` also fills every type and the total, so only send
+    # the global checkpoint if no guild needs one
+    pending = max(pending, type_pending)
+    if pending >= MAX_PENDING_WEEKS and not guild_calls:
+        calls.append((guild_controller, "checkpoint", (), pending))
+
+    return calls, guild_calls
+
+
+def _describe(contract, fn_name, args, pending):
+    if fn_name == "checkpoint_guilds":
+        args_str = f"{len([i for i in args[0] if i != ZERO_ADDRESS])} guilds"
+    else:
+        args_str = ", ".join(str(i) for i in args)
+    return f"{contract._name}.{fn_name}({args_str}) - {pending} week(s) pending"
+
+
+def run_once(keeper=None, dry_run=False):
+    voting_escrow, gas_escrows, guild_controller = get_contracts()
+    now = chain.time()
+    calls, guild_calls = pending_checkpoints(voting_escrow, gas_escrows, guild_controller, now)
+    if not calls and not guild_calls:
+        print("Nothing to checkpoint")
+        return
+
+    if dry_run:
+        for contract, fn_name, args, pending in calls + guild_calls:
+            gas = getattr(contract, fn_name).estimate_gas(*args, {"from": keeper}) if keeper else None
+            print(f"[dry run] {_describe(contract, fn_name, args, pending)}, estimated gas: {gas}")
+        return
+
+    for contract, fn_name, args, pending in calls:
+        print(_describe(contract, fn_name, args, pending))
+        getattr(contract, fn_name)(*args, {"from": keeper})
+
+    pending_txs = []
+    for contract, fn_name, args, pending in guild_calls:
+        print(_describe(contract, fn_name, args, pending))
+        pending_txs.append(getattr(contract, fn_name)(*args, {"from": keeper, "required_confs": 0}))
+    for tx in pending_txs:
+        tx.wait(1)
+
+
+def main():
+    run_once(get_keeper())
+
+
+def dry_run():
+    keeper = accounts[0] if len(accounts) else None
+    run_once(keeper, dry_run=True)
+
+
+def run_forever():
+    keeper = get_keeper()
+    while True:
+        run_once(keeper)
+        time.sleep(POLL_INTERVAL)
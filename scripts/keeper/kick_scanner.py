@@ -0,0 +1,249 @@
+"""
+Kick candidate scanner
+======================
+Finds the guild members `Guild.kick` would accept and ranks them by how much
+working supply each kick takes back.
+
+Members are taken from the guild roster indexer
+(`scripts/indexer/guild_roster_indexer.py`), which is synced first. For every
+member the scanner reads `working_balances` and `integrate_checkpoint_of`
+from its guild, the `VotingEscrow` balance, and the `GasEscrow` balance and
+last checkpoint time. The reads for all guilds go out together as JSON-RPC
+batches of `BATCH_SIZE` calls with at most `CONCURRENCY` batches in flight.
+The `kick` conditions and the working balance a kick leaves (the
+`Guild._update_liquidity_limit` formula) are then evaluated for all members
+at once on integer arrays.
+
+The ranked candidates are written to CSV. `kick` sends every candidate whose
+kick lowers the working supply to `Guild.kick_many`, `N_BATCH` addresses per
+call. Any address which can no longer be kicked when the transaction runs is
+skipped by `kick_many`.
+
+Usage:
+    brownie run keeper/kick_scanner --network mainnet
+    brownie run keeper/kick_scanner kick --network mainnet
+"""
+
+import csv
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from brownie import GasEscrow, Guild, GuildController, VotingEscrow, web3
+
+from scripts.indexer.guild_roster_indexer import DATABASE, DEPLOYMENTS_JSON, GuildRosterIndexer
+from scripts.keeper.checkpoint_keeper import get_keeper
+from scripts.snapshot.voting_power_snapshot import BATCH_SIZE, CONCURRENCY, BatchCaller
+
+OUTPUT_CSV = "kick_candidates.csv"
+
+WEEK = 7 * 86400
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+# `Guild` constants
+TOKENLESS_PRODUCTION = 40
+BOOST_WARMUP = 2 * WEEK
+# size of the `Guild.kick_many` address array
+N_BATCH = 50
+
+FIELDS = ["guild", "address", "reason", "working_balance", "new_working_balance", "reduction"]
+
+
+def _read(caller, calls):
+    """Execute (target, calldata) pairs in batches and return the results in order"""
+    batches = [calls[i : i + BATCH_SIZE] for i in range(0, len(calls), BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+        futures = [
+            executor.submit(caller.call, [data for _, data in batch], [to for to, _ in batch]) for batch in batches
+        ]
+        return [value for future in futures for value in future.result()]
+
+
+def _read_table(caller, calls, n_columns):
+    """Same as `_read` with the results as an integer array of `n_columns` columns"""
+    return np.array(_read(caller, calls), dtype=object).reshape(-1, n_columns)
+
+
+def _address(value):
+    return web3.toChecksumAddress(f"0x{value:040x}")
+
+
+def guild_weights(caller, guild_controller, guilds, timestamp):
+    """
+    Weight of each guild as `GuildController.get_guild_weight` returns it
+    after the checkpoint `kick` makes at `timestamp`. Weeks the controller has
+    not filled yet are projected the same way as `_get_weight`.
+    """
+    gc_contract = web3.eth.contract(abi=guild_controller.abi)
+    to = guild_controller.address
+    times = _read(caller, [(to, gc_contract.encodeABI(fn_name="time_weight", args=[guild])) for guild in guilds])
+
+    calls = []
+    n_changes = []
+    for guild, t in zip(guilds, times):
+        calls.append((to, gc_contract.encodeABI(fn_name="points_weight", args=[guild, t])))
+        n_weeks = (timestamp - t) // WEEK + 1 if 0 < t <= timestamp else 0
+        calls += [
+            (to, gc_contract.encodeABI(fn_name="changes_weight", args=[guild, t + k * WEEK]))
+            for k in range(1, n_weeks + 1)
+        ]
+        n_changes.append(n_weeks)
+    values = iter(_read(caller, calls))
+
+    weights = []
+    for n_weeks in n_changes:
+        # `points_weight` returns the (bias, slope) struct as one 64 byte word
+        bias, slope = divmod(next(values), 2 ** 256)
+        for _ in range(n_weeks):
+            d_bias = slope * WEEK
+            d_slope = next(values)
+            if bias > d_bias:
+                bias -= d_bias
+                slope -= d_slope
+            else:
+                bias = 0
+                slope = 0
+        weights.append(bias)
+    return weights
+
+
+def scan(voting_escrow, guild_controller, indexer, timestamp):
+    """
+    Find the kick candidates of every indexed guild at `timestamp`, the time
+    of the latest block.
+
+    Returns a list of dicts with the `FIELDS` keys, largest working supply
+    reduction first.
+    """
+    guild_contract = web3.eth.contract(abi=Guild.abi)
+    gas_contract = web3.eth.contract(abi=GasEscrow.abi)
+    ve_contract = web3.eth.contract(abi=voting_escrow.abi)
+    caller = BatchCaller(voting_escrow.address)
+
+    guilds = indexer.guilds()
+    calls = []
+    for guild in guilds:
+        calls += [
+            (guild, guild_contract.encodeABI(fn_name="gas_escrow")),
+            (guild, guild_contract.encodeABI(fn_name="period_timestamp", args=[0])),
+        ]
+    guild_values = _read_table(caller, calls, 2)
+    gas_escrows = [_address(value) for value in guild_values[:, 0]]
+    weights = np.array(guild_weights(caller, guild_controller, guilds, timestamp), dtype=object)
+
+    unique_escrows = sorted(set(gas_escrows))
+    gas_totals = _read(caller, [(escrow, gas_contract.encodeABI(fn_name="totalSupply")) for escrow in unique_escrows])
+    gas_totals = dict(zip(unique_escrows, gas_totals))
+
+    members = []
+    guild_index = []
+    calls = []
+    for i, guild in enumerate(guilds):
+        for addr, _ in indexer.roster(guild):
+            members.append((guild, addr))
+            guild_index.append(i)
+            calls += [
+                (guild, guild_contract.encodeABI(fn_name="working_balances", args=[addr])),
+                (guild, guild_contract.encodeABI(fn_name="integrate_checkpoint_of", args=[addr])),
+                (voting_escrow.address, ve_contract.encodeABI(fn_name="balanceOf", args=[addr])),
+                (gas_escrows[i], gas_contract.encodeABI(fn_name="balanceOf", args=[addr])),
+                (gas_escrows[i], gas_contract.encodeABI(fn_name="user_point_epoch", args=[addr])),
+            ]
+    if not members:
+        return []
+    member_values = _read_table(caller, calls, 5)
+    calls = [
+        (gas_escrows[i], gas_contract.encodeABI(fn_name="user_point_history__ts", args=[addr, epoch]))
+        for (_, addr), i, epoch in zip(members, guild_index, member_values[:, 4])
+    ]
+    t_gas = np.array(_read(caller, calls), dtype=object)
+
+    guild_index = np.array(guild_index)
+    working, t_last, balance, gas_balance = (member_values[:, k] for k in range(4))
+    period_start = guild_values[guild_index, 1]
+    guild_weight = weights[guild_index]
+    gas_total = np.array([gas_totals[gas_escrows[i]] for i in guild_index], dtype=object)
+
+    # `Guild.kick` conditions
+    allowed = ((balance == 0) | (gas_balance == 0) | (t_gas > t_last)).astype(bool)
+    needed = (working > balance * 2 * TOKENLESS_PRODUCTION // 100).astype(bool)
+
+    # working balance after the kick, as `Guild._update_liquidity_limit`
+    limit = balance * TOKENLESS_PRODUCTION // 100
+    boosted = ((guild_weight > 0) & (timestamp > period_start + BOOST_WARMUP) & (gas_balance > 0)).astype(bool)
+    gas_total = np.where(gas_total > 0, gas_total, 1)
+    limit += np.where(boosted, guild_weight * gas_balance // gas_total * (100 - TOKENLESS_PRODUCTION) // 100, 0)
+    limit = np.where(limit < balance, limit, balance)
+
+    candidates = []
+    for k in np.flatnonzero(allowed & needed):
+        if balance[k] == 0:
+            reason = "lock expired"
+        elif gas_balance[k] == 0:
+            reason = "no gas"
+        else:
+            reason = "gas changed"
+        guild, addr = members[k]
+        candidates.append(
+            {
+                "guild": guild,
+                "address": addr,
+                "reason": reason,
+                "working_balance": working[k],
+                "new_working_balance": limit[k],
+                "reduction": working[k] - limit[k],
+            }
+        )
+    return sorted(candidates, key=lambda row: row["reduction"], reverse=True)
+
+
+def kick_batches(candidates):
+    """
+    Group the candidates whose kick lowers the working supply by guild into
+    `Guild.kick_many` arguments. Returns a list of (guild, addresses).
+    """
+    by_guild = {}
+    for row in candidates:
+        if row["reduction"] > 0:
+            by_guild.setdefault(row["guild"], []).append(row["address"])
+
+    batches = []
+    for guild, addrs in by_guild.items():
+        for i in range(0, len(addrs), N_BATCH):
+            batch = addrs[i : i + N_BATCH]
+            batches.append((guild, batch + [ZERO_ADDRESS] * (N_BATCH - len(batch))))
+    return batches
+
+
+def write_csv(candidates, output):
+    with open(output, "w", newline="") as fp:
+        writer = csv.DictWriter(fp, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(candidates)
+
+
+def _scan_deployment(database):
+    with open(DEPLOYMENTS_JSON) as fp:
+        deployments = json.load(fp)
+    voting_escrow = VotingEscrow.at(deployments["VotingEscrow"])
+    guild_controller = GuildController.at(deployments["GuildController"])
+    indexer = GuildRosterIndexer(database, guild_controller)
+    indexer.sync()
+    timestamp = web3.eth.get_block("latest").timestamp
+    return scan(voting_escrow, guild_controller, indexer, timestamp)
+
+
+def main(output=OUTPUT_CSV, database=DATABASE):
+    candidates = _scan_deployment(database)
+    write_csv(candidates, output)
+    total = sum(row["reduction"] for row in candidates if row["reduction"] > 0)
+    print(f"{len(candidates)} kick candidates written to {output}, working supply reduction: {total}")
+    for row in candidates[:10]:
+        print(f"{row['guild']} {row['address']} {row['reason']:<12} {row['reduction']}")
+
+
+def kick(database=DATABASE):
+    keeper = get_keeper()
+    for guild, batch in kick_batches(_scan_deployment(database)):
+        n_addrs = len([addr for addr in batch if addr != ZERO_ADDRESS])
+        print(f"Guild {guild}: kick_many({n_addrs} addresses)")
+        Guild.at(guild).kick_many(batch, {"from": keeper})
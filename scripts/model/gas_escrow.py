@@ -0,0 +1,71 @@
+"""
+GasEscrow model
+===============
+Off-chain mirror of the `GasEscrow` burn arithmetic.
+
+`GasEscrow` shares the point, slope and checkpoint logic of `VotingEscrow`,
+so the model reuses `VotingEscrowModel` and only replaces the user actions:
+burns always run for 4 years rounded down to whole weeks and the burned
+tokens are never returned.
+"""
+
+from .voting_escrow import EMPTY_LOCK, MAXTIME, WEEK, LockedBalance, Revert, VotingEscrowModel
+
+BurnedBalance = LockedBalance
+
+
+class GasEscrowModel(VotingEscrowModel):
+    """
+    In-memory copy of the `GasEscrow` storage. `locked` holds the
+    `burned` balances.
+    """
+
+    @classmethod
+    def from_contract(cls, gas_escrow, users=()):
+        return super().from_contract(_BurnedAsLocked(gas_escrow), users)
+
+    def create_gas(self, addr, value, timestamp, block_number):
+        """Mirror of `GasEscrow.create_gas`"""
+        end_time = (timestamp + MAXTIME) // WEEK * WEEK
+        burned = self.locked.get(addr, EMPTY_LOCK)
+        if value <= 0:
+            raise Revert()
+        if burned.amount != 0:
+            raise Revert("old gas burn not finished")
+        if end_time <= timestamp:
+            raise Revert("Can only burn until time in the future")
+        self._deposit_for(addr, value, end_time, burned, timestamp, block_number)
+
+    def increase_amount(self, addr, value, timestamp, block_number):
+        """Mirror of `GasEscrow.increase_amount`"""
+        burned = self.locked.get(addr, EMPTY_LOCK)
+        if value <= 0:
+            raise Revert()
+        if burned.amount <= 0:
+            raise Revert("No existing burn found")
+        if burned.end <= timestamp:
+            raise Revert("Cannot add to expired burn")
+        self._deposit_for(addr, value, 0, burned, timestamp, block_number)
+
+    def clear_gas(self, addr, timestamp, block_number):
+        """Mirror of `GasEscrow.clear_gas`, returns the cleared amount"""
+        burned = self.locked.get(addr, EMPTY_LOCK)
+        if timestamp < burned.end:
+            raise Revert("The burn didn't expire")
+        self.locked[addr] = EMPTY_LOCK
+        self.supply -= burned.amount
+        self.checkpoint(addr, burned, EMPTY_LOCK, timestamp, block_number)
+        return burned.amount
+
+
+class _BurnedAsLocked:
+    """Exposes `GasEscrow.burned` as `locked` for `VotingEscrowModel.from_contract`"""
+
+    def __init__(self, gas_escrow):
+        self._gas_escrow = gas_escrow
+
+    def locked(self, addr):
+        return self._gas_escrow.burned(addr)
+
+    def __getattr__(self, name):
+        return getattr(self._gas_escrow, name)
@@ -0,0 +1,199 @@
+"""
+GuildController model
+=====================
+Off-chain mirror of the `GuildController` weight schedule.
+
+The contract keeps every guild weight, every per-type sum of guild weights
+and the type-weighted total as a bias and slope at the last filled week, plus
+the slope changes scheduled for the weeks after it. The `_get_*` functions
+walk them forward one week at a time. `project` runs the same walk for all
+guilds and types at once - one array step per week instead of one loop per
+guild - and derives `guild_relative_weight` for each of the coming weeks.
+
+The projection assumes no further votes, joins, leaves or weight changes;
+type weights stay at their last scheduled value.
+
+As in `voting_escrow.py`, arithmetic is done on numpy arrays of `object` dtype
+so values stay exact Python integers.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+WEEK = 7 * 86400
+MULTIPLIER = 10 ** 18
+# slope changes are scheduled at most this many weeks ahead (lock end)
+MAX_LOCK_WEEKS = 209
+
+Point = namedtuple("Point", ["bias", "slope"])
+Forecast = namedtuple(
+    "Forecast", ["times", "guilds", "guild_weight", "type_sum", "type_weight", "total", "relative_weight"]
+)
+
+
+def _plain_call_many(fn, args_list):
+    return [fn(*args) for args in args_list]
+
+
+def _read_changes(call_many, getter, key, t, t_end):
+    """Read the non-zero slope changes scheduled after `t` up to `t_end`."""
+    if t == 0:
+        return {}
+    # nothing is scheduled beyond the longest lock
+    times = list(range(t + WEEK, min(t_end, t + MAX_LOCK_WEEKS * WEEK) + 1, WEEK))
+    args_list = [(ts,) if key is None else (key, ts) for ts in times]
+    return {ts: d_slope for ts, d_slope in zip(times, call_many(getter, args_list)) if d_slope}
+
+
+def decay(bias, slope, start, changes, times, saturate=False):
+    """
+    Walk one bias and slope per row forward through the week boundaries in
+    `times`, mirroring the `_get_*` loops: at every boundary after the row's
+    `start`, the bias drops by `slope * WEEK` and the slope by the change
+    scheduled for that week, and both are cleared once the bias is used up.
+
+    `changes` has one row per bias and one column per time. With `saturate`
+    the slope stops at zero instead of going below it, as `_get_total` does
+    for the total. Returns the bias of every row at every time.
+    """
+    bias = np.array(bias, dtype=object)
+    slope = np.array(slope, dtype=object)
+    start = np.asarray(start, dtype=np.int64)
+    result = np.empty((len(bias), len(times)), dtype=object)
+    for k, t in enumerate(times):
+        step = start < t
+        d_bias = slope * WEEK
+        alive = bias > d_bias
+        bias = np.where(step, np.where(alive, bias - d_bias, 0), bias)
+        if saturate:
+            next_slope = np.maximum(slope, changes[:, k]) - changes[:, k]
+        else:
+            next_slope = slope - changes[:, k]
+        slope = np.where(step, np.where(alive, next_slope, 0), slope)
+        result[:, k] = bias
+    return result
+
+
+class GuildControllerModel:
+    """
+    In-memory copy of the `GuildController` storage that schedules the
+    guild, type and total weights.
+    """
+
+    def __init__(self):
+        self.guilds = []
+        self.guild_type = {}
+        # guild -> (last scheduled time, Point at that time)
+        self.points_weight = {}
+        self.changes_weight = {}
+        # type_id -> (last scheduled time, Point at that time)
+        self.points_sum = {}
+        self.changes_sum = {}
+        # type_id -> type weight at the last scheduled time
+        self.type_weight = {}
+        # (last scheduled time, Point at that time)
+        self.points_total = (0, Point(0, 0))
+        self.changes_total = {}
+        # types whose sums are added to the total week by week
+        self.untracked_types = []
+
+    @classmethod
+    def from_contract(cls, guild_controller, t_end, call_many=_plain_call_many):
+        """
+        Load the state needed to project weights up to `t_end` from a
+        deployed `GuildController`.
+
+        `call_many(fn, args_list)` reads one getter for many arguments; it
+        is used for the weekly slope changes, which make up almost all of the
+        reads, so callers can batch them (see `scripts/forecast`).
+        """
+        model = cls()
+        n_types = guild_controller.n_guild_types()
+        model.guilds = [guild_controller.guilds(i) for i in range(guild_controller.n_guilds())]
+        for addr in model.guilds:
+            model.guild_type[addr] = guild_controller.guild_types(addr)
+            t = guild_controller.time_weight(addr)
+            model.points_weight[addr] = (t, Point(*guild_controller.points_weight(addr, t)))
+            model.changes_weight[addr] = _read_changes(call_many, guild_controller.changes_weight, addr, t, t_end)
+
+        for type_id in range(n_types):
+            t = guild_controller.time_sum(type_id)
+            model.points_sum[type_id] = (t, Point(*guild_controller.points_sum(type_id, t)))
+            model.changes_sum[type_id] = _read_changes(call_many, guild_controller.changes_sum, type_id, t, t_end)
+            model.type_weight[type_id] = guild_controller.points_type_weight(
+                type_id, guild_controller.time_type_weight(type_id)
+            )
+
+        t = guild_controller.time_total()
+        model.points_total = (t, Point(guild_controller.points_total(t), guild_controller.slope_total(t)))
+        model.changes_total = _read_changes(call_many, guild_controller.changes_total, None, t, t_end)
+        model.untracked_types = [
+            guild_controller.untracked_types(j) for j in range(guild_controller.n_untracked_types())
+        ]
+        return model
+
+    @staticmethod
+    def _project(points, changes, times, saturate=False):
+        """Project the biases of several `points_*` entries over `times`."""
+        start = [t for t, _ in points]
+        bias = [point.bias if t > 0 else 0 for t, point in points]
+        slope = [point.slope if t > 0 else 0 for t, point in points]
+        changes = np.array([[c.get(t, 0) for t in times] for c in changes], dtype=object).reshape(
+            len(points), len(times)
+        )
+        return decay(bias, slope, start, changes, times, saturate)
+
+    def project(self, t_from, weeks):
+        """
+        Forecast the weights for `weeks` week starts from `t_from`.
+
+        `t_from` must not be before the last scheduled time of any guild,
+        type or the total, i.e. the week after the last checkpoint of each.
+        """
+        scheduled = [t for t, _ in self.points_weight.values()] + [t for t, _ in self.points_sum.values()]
+        scheduled = [t for t in scheduled + [self.points_total[0]] if t > 0]
+        t_from = t_from // WEEK * WEEK
+        if t_from < max(scheduled):
+            raise ValueError("t_from is before the last scheduled time")
+        # walk from the oldest scheduled time so that stale entries catch up
+        first = min(scheduled)
+        walk = list(range(first, t_from + weeks * WEEK, WEEK))
+        columns = slice(len(walk) - weeks, len(walk))
+
+        guild_weight = self._project(
+            [self.points_weight[addr] for addr in self.guilds],
+            [self.changes_weight[addr] for addr in self.guilds],
+            walk,
+        )[:, columns]
+        type_ids = sorted(self.points_sum)
+        type_sum = self._project(
+            [self.points_sum[i] for i in type_ids], [self.changes_sum[i] for i in type_ids], walk
+        )
+        type_weight = np.array([self.type_weight[i] for i in type_ids], dtype=object)
+
+        # untracked types are taken out of the total and added back from
+        # their sums, as in `_get_total`
+        t_total, point = self.points_total
+        untracked = [type_ids.index(i) for i in self.untracked_types]
+        if t_total > 0:
+            k = walk.index(t_total)
+            bias = point.bias - sum(type_weight[i] * type_sum[i, k] for i in untracked)
+            point = Point(bias, point.slope)
+        total = self._project([(t_total, point)], [self.changes_total], walk, saturate=True)[0]
+        for i in untracked:
+            total = total + type_weight[i] * type_sum[i]
+        total = total[columns]
+        type_sum = type_sum[:, columns]
+
+        guild_type_weight = np.array(
+            [self.type_weight[self.guild_type[addr]] for addr in self.guilds], dtype=object
+        )[:, None]
+        # same rounding as `_guild_relative_weight`
+        relative_weight = np.where(
+            total > 0,
+            MULTIPLIER * guild_type_weight * guild_weight // np.where(total > 0, total, 1),
+            0,
+        )
+        times = np.array(walk[columns], dtype=np.int64)
+        return Forecast(times, list(self.guilds), guild_weight, type_sum, type_weight, total, relative_weight)
@@ -0,0 +1,128 @@
+"""
+RewardVestingEscrow model
+=========================
+Off-chain mirror of the `RewardVestingEscrow` vesting and claim arithmetic.
+"""
+
+from collections import namedtuple
+
+PERIOD = 2419200  # 86400 * 7 * 4 (28 days)
+VESTING_PERIOD = PERIOD * 6  # 168 days
+VESTING_RATIO = 70
+# `_claimable_tokens` looks at most at this many vesting epochs
+MAX_EPOCHS = 254
+
+VestingInfo = namedtuple("VestingInfo", ["amount", "start", "end", "slope", "claimed"])
+
+EMPTY_VESTING = VestingInfo(0, 0, 0, 0, 0)
+
+
+def uint256(value):
+    """Underflow check matching vyper's uint256 arithmetic, which reverts."""
+    if value < 0:
+        raise OverflowError(f"uint256 underflow: {value}")
+    return value
+
+
+class RewardVestingEscrowModel:
+    """In-memory copy of the `RewardVestingEscrow` storage."""
+
+    def __init__(self, vesting_ratio=VESTING_RATIO):
+        # percentage of each minted amount which is vested; the contract
+        # always uses `VESTING_RATIO`, other values are for simulations
+        self.vesting_ratio = vesting_ratio
+        self.balance_of = {}
+        self.total_claimed = {}
+        self.user_vesting_epoch = {}
+        self.user_vesting_history = {}
+
+    @classmethod
+    def from_contract(cls, reward_vesting, users=()):
+        model = cls()
+        for addr in users:
+            user_epoch = reward_vesting.user_vesting_epoch(addr)
+            model.balance_of[addr] = reward_vesting.balanceOf(addr)
+            model.total_claimed[addr] = reward_vesting.total_claimed(addr)
+            model.user_vesting_epoch[addr] = user_epoch
+            model.user_vesting_history[addr] = [
+                VestingInfo(*reward_vesting.user_vesting_history(addr, i)) for i in range(user_epoch + 1)
+            ]
+        return model
+
+    def _vesting_info(self, addr, epoch):
+        history = self.user_vesting_history.get(addr)
+        if history is None or epoch >= len(history):
+            return EMPTY_VESTING
+        return history[epoch]
+
+    def _set_vesting_info(self, addr, epoch, info):
+        history = self.user_vesting_history.setdefault(addr, [EMPTY_VESTING])
+        while len(history) <= epoch:
+            history.append(EMPTY_VESTING)
+        history[epoch] = info
+
+    def vesting(self, recipient, amount, timestamp):
+        """Mirror of `RewardVestingEscrow.vesting`, returns the vested amount"""
+        vested_amount = amount * self.vesting_ratio // 100
+        self.balance_of[recipient] = self.balance_of.get(recipient, 0) + vested_amount
+        start_time = (timestamp // PERIOD + 1) * PERIOD
+        user_epoch = self.user_vesting_epoch.get(recipient, 0)
+
+        if user_epoch > 0:
+            info = self._vesting_info(recipient, user_epoch)
+            if info.start == start_time:
+                amount = info.amount + vested_amount
+                info = info._replace(amount=amount, slope=amount // VESTING_PERIOD)
+            else:
+                user_epoch += 1
+                info = VestingInfo(
+                    vested_amount, start_time, start_time + VESTING_PERIOD, vested_amount // VESTING_PERIOD, 0
+                )
+        else:
+            user_epoch = 1
+            info = VestingInfo(
+                vested_amount, start_time, start_time + VESTING_PERIOD, vested_amount // VESTING_PERIOD, 0
+            )
+
+        self.user_vesting_epoch[recipient] = user_epoch
+        self._set_vesting_info(recipient, user_epoch, info)
+        return vested_amount
+
+    def claimable_tokens(self, addr, timestamp, update=False):
+        """
+        Mirror of `RewardVestingEscrow._claimable_tokens`. With `update` the
+        claimed amounts are written back, but only once the whole loop has
+        succeeded, as a reverting call would not change anything either.
+        """
+        claimable = 0
+        updates = []
+        epoch = self.user_vesting_epoch.get(addr, 0)
+        if epoch == 0:
+            return 0
+        for _ in range(MAX_EPOCHS):
+            info = self._vesting_info(addr, epoch)
+            if info.amount == 0:
+                break
+            if info.start < timestamp:
+                amt = info.amount
+                if info.end > timestamp:
+                    amt = uint256(info.slope * (timestamp - info.start) - info.claimed)
+                info = info._replace(amount=uint256(info.amount - amt), claimed=info.claimed + amt)
+                claimable += amt
+                updates.append((epoch, info))
+            epoch -= 1
+            if epoch == 0:
+                break
+        if update:
+            for epoch, info in updates:
+                self._set_vesting_info(addr, epoch, info)
+        return claimable
+
+    def claim(self, addr, timestamp):
+        """Mirror of `RewardVestingEscrow.claim`, returns the claimed amount"""
+        claimable = self.claimable_tokens(addr, timestamp)
+        balance = uint256(self.balance_of.get(addr, 0) - claimable)
+        self.claimable_tokens(addr, timestamp, update=True)
+        self.balance_of[addr] = balance
+        self.total_claimed[addr] = self.total_claimed.get(addr, 0) + claimable
+        return claimable
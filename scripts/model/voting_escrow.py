@@ -0,0 +1,366 @@
+"""
+VotingEscrow model
+==================
+Off-chain mirror of the `VotingEscrow` checkpoint and balance arithmetic.
+
+Given the `point_history`, `user_point_history` and `slope_changes` state of a
+deployed contract, `balance_of` and `total_supply` answer "voting power of N
+users at T timestamps" as one array computation instead of N * T calls.
+
+The lock actions (`create_lock`, `increase_amount`, ...) apply the same
+state changes as the contract, raising `Revert` where it would revert, so
+the model can also be driven forward on its own (see `scripts/fuzz`).
+
+All arithmetic is done on numpy arrays of `object` dtype so values stay exact
+Python integers - balances are scaled by 1e18 and do not fit in int64.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+WEEK = 7 * 86400
+MAXTIME = 4 * 365 * 86400
+MINTIME = 365 * 86400
+MULTIPLIER = 10 ** 18
+# `_checkpoint` and `supply_at` give up after this many weeks
+MAX_WEEKS = 255
+
+INT128_MIN = -(2 ** 127)
+INT128_MAX = 2 ** 127 - 1
+
+Point = namedtuple("Point", ["bias", "slope", "ts", "blk"])
+LockedBalance = namedtuple("LockedBalance", ["amount", "end"])
+
+EMPTY_POINT = Point(0, 0, 0, 0)
+EMPTY_LOCK = LockedBalance(0, 0)
+
+
+class Revert(Exception):
+    """Raised by model actions where the contract reverts."""
+
+
+def int128(value):
+    """Range check matching vyper's int128 arithmetic, which reverts on overflow."""
+    if not INT128_MIN <= value <= INT128_MAX:
+        raise OverflowError(f"int128 overflow: {value}")
+    return value
+
+
+def vdiv(a, b):
+    """Integer division truncating towards zero, like vyper's `/` on signed ints."""
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+class VotingEscrowModel:
+    """
+    In-memory copy of the `VotingEscrow` storage used for voting power
+    calculations.
+    """
+
+    def __init__(self, ts=0, blk=0):
+        self.epoch = 0
+        self.point_history = [Point(0, 0, ts, blk)]
+        self.user_point_epoch = {}
+        self.user_point_history = {}
+        self.slope_changes = {}
+        self.locked = {}
+        self.supply = 0
+
+    @classmethod
+    def from_contract(cls, voting_escrow, users=()):
+        """
+        Load state from a deployed `VotingEscrow`.
+
+        Only the weekly `slope_changes` which can still affect `users` or the
+        global supply are read, i.e. from the first recorded week until the
+        longest possible lock end.
+        """
+        model = cls()
+        model.epoch = voting_escrow.epoch()
+        model.supply = voting_escrow.supply()
+        model.point_history = [
+            Point(*voting_escrow.point_history(i)) for i in range(model.epoch + 1)
+        ]
+        for addr in users:
+            model.locked[addr] = LockedBalance(*voting_escrow.locked(addr))
+            user_epoch = voting_escrow.user_point_epoch(addr)
+            model.user_point_epoch[addr] = user_epoch
+            model.user_point_history[addr] = [
+                Point(*voting_escrow.user_point_history(addr, i)) for i in range(user_epoch + 1)
+            ]
+
+        t = model.point_history[0].ts // WEEK * WEEK
+        t_end = (model.point_history[-1].ts + MAXTIME) // WEEK * WEEK
+        while t <= t_end:
+            d_slope = voting_escrow.slope_changes(t)
+            if d_slope:
+                model.slope_changes[t] = d_slope
+            t += WEEK
+        return model
+
+    def _user_point(self, addr, user_epoch):
+        history = self.user_point_history.get(addr)
+        if history is None or user_epoch >= len(history):
+            return EMPTY_POINT
+        return history[user_epoch]
+
+    def checkpoint(self, addr, old_locked, new_locked, timestamp, block_number):
+        """
+        Mirror of `VotingEscrow._checkpoint`.
+
+        `addr` may be `None` for a global-only checkpoint.
+        """
+        u_old = EMPTY_POINT
+        u_new = EMPTY_POINT
+        old_dslope = 0
+        new_dslope = 0
+        _epoch = self.epoch
+
+        if addr is not None:
+            if old_locked.end > timestamp and old_locked.amount > 0:
+                slope = vdiv(old_locked.amount, MAXTIME)
+                u_old = Point(int128(slope * (old_locked.end - timestamp)), slope, 0, 0)
+            if new_locked.end > timestamp and new_locked.amount > 0:
+                slope = vdiv(new_locked.amount, MAXTIME)
+                u_new = Point(int128(slope * (new_locked.end - timestamp)), slope, 0, 0)
+
+            old_dslope = self.slope_changes.get(old_locked.end, 0)
+            if new_locked.end != 0:
+                if new_locked.end == old_locked.end:
+                    new_dslope = old_dslope
+                else:
+                    new_dslope = self.slope_changes.get(new_locked.end, 0)
+
+        last_point = Point(0, 0, timestamp, block_number)
+        if _epoch > 0:
+            last_point = self.point_history[_epoch]
+        bias, slope, last_checkpoint, blk = last_point
+        initial_ts, initial_blk = last_point.ts, last_point.blk
+        block_slope = 0
+        if timestamp > last_point.ts:
+            block_slope = MULTIPLIER * (block_number - last_point.blk) // (timestamp - last_point.ts)
+
+        t_i = last_checkpoint // WEEK * WEEK
+        for _ in range(MAX_WEEKS):
+            t_i += WEEK
+            d_slope = 0
+            if t_i > timestamp:
+                t_i = timestamp
+            else:
+                d_slope = self.slope_changes.get(t_i, 0)
+            bias = int128(bias - slope * (t_i - last_checkpoint))
+            slope = int128(slope + d_slope)
+            bias = max(bias, 0)
+            slope = max(slope, 0)
+            last_checkpoint = t_i
+            blk = initial_blk + block_slope * (t_i - initial_ts) // MULTIPLIER
+            _epoch += 1
+            if t_i == timestamp:
+                blk = block_number
+                break
+            self._set_point(_epoch, Point(bias, slope, t_i, blk))
+
+        self.epoch = _epoch
+
+        if addr is not None:
+            slope = max(int128(slope + u_new.slope - u_old.slope), 0)
+            bias = max(int128(bias + u_new.bias - u_old.bias), 0)
+
+        self._set_point(_epoch, Point(bias, slope, last_checkpoint, blk))
+
+        if addr is not None:
+            if old_locked.end > timestamp:
+                old_dslope = int128(old_dslope + u_old.slope)
+                if new_locked.end == old_locked.end:
+                    old_dslope = int128(old_dslope - u_new.slope)
+                self.slope_changes[old_locked.end] = old_dslope
+
+            if new_locked.end > timestamp and new_locked.end > old_locked.end:
+                new_dslope = int128(new_dslope - u_new.slope)
+                self.slope_changes[new_locked.end] = new_dslope
+
+            user_epoch = self.user_point_epoch.get(addr, 0) + 1
+            self.user_point_epoch[addr] = user_epoch
+            history = self.user_point_history.setdefault(addr, [EMPTY_POINT])
+            del history[user_epoch:]
+            history.append(Point(u_new.bias, u_new.slope, timestamp, block_number))
+
+    def _deposit_for(self, addr, value, unlock_time, locked, timestamp, block_number):
+        new_locked = LockedBalance(int128(locked.amount + value), unlock_time or locked.end)
+        self.checkpoint(addr, locked, new_locked, timestamp, block_number)
+        self.supply += value
+        self.locked[addr] = new_locked
+
+    def deposit_for(self, addr, value, timestamp, block_number):
+        """Mirror of `VotingEscrow.deposit_for`"""
+        locked = self.locked.get(addr, EMPTY_LOCK)
+        if value <= 0:
+            raise Revert()
+        if locked.amount <= 0:
+            raise Revert("No existing lock found")
+        if locked.end <= timestamp:
+            raise Revert("Cannot add to expired lock. Withdraw")
+        self._deposit_for(addr, value, 0, locked, timestamp, block_number)
+
+    def create_lock(self, addr, value, unlock_time, timestamp, block_number):
+        """Mirror of `VotingEscrow.create_lock` and `create_lock_for`"""
+        unlock_time = unlock_time // WEEK * WEEK
+        locked = self.locked.get(addr, EMPTY_LOCK)
+        if value <= 0:
+            raise Revert()
+        if locked.amount != 0:
+            raise Revert("Withdraw old tokens first")
+        if unlock_time <= timestamp:
+            raise Revert("Can only lock until time in the future")
+        if unlock_time + WEEK < timestamp + MINTIME:
+            raise Revert("Voting lock must be 1 year min")
+        if unlock_time > timestamp + MAXTIME:
+            raise Revert("Voting lock can be 4 years max")
+        self._deposit_for(addr, value, unlock_time, locked, timestamp, block_number)
+
+    def increase_amount(self, addr, value, timestamp, block_number):
+        """Mirror of `VotingEscrow.increase_amount`"""
+        locked = self.locked.get(addr, EMPTY_LOCK)
+        if value <= 0:
+            raise Revert()
+        if locked.amount <= 0:
+            raise Revert("No existing lock found")
+        if locked.end <= timestamp:
+            raise Revert("Cannot add to expired lock. Withdraw")
+        self._deposit_for(addr, value, 0, locked, timestamp, block_number)
+
+    def increase_unlock_time(self, addr, unlock_time, timestamp, block_number):
+        """Mirror of `VotingEscrow.increase_unlock_time`"""
+        locked = self.locked.get(addr, EMPTY_LOCK)
+        unlock_time = unlock_time // WEEK * WEEK
+        if locked.end <= timestamp:
+            raise Revert("Lock expired")
+        if locked.amount <= 0:
+            raise Revert("Nothing is locked")
+        if unlock_time <= locked.end:
+            raise Revert("Can only increase lock duration")
+        if unlock_time > timestamp + MAXTIME:
+            raise Revert("Voting lock can be 4 years max")
+        self._deposit_for(addr, 0, unlock_time, locked, timestamp, block_number)
+
+    def withdraw(self, addr, timestamp, block_number):
+        """Mirror of `VotingEscrow.withdraw`, returns the withdrawn amount"""
+        locked = self.locked.get(addr, EMPTY_LOCK)
+        if timestamp < locked.end:
+            raise Revert("The lock didn't expire")
+        self.locked[addr] = EMPTY_LOCK
+        self.supply -= locked.amount
+        self.checkpoint(addr, locked, EMPTY_LOCK, timestamp, block_number)
+        return locked.amount
+
+    def _set_point(self, epoch, point):
+        if epoch < len(self.point_history):
+            self.point_history[epoch] = point
+        else:
+            self.point_history.append(point)
+
+    def balance_of(self, users, timestamps):
+        """
+        Mirror of `VotingEscrow.balanceOf` for every user at every timestamp.
+
+        Returns an array of shape (len(users), len(timestamps)).
+        """
+        last = [self._user_point(addr, self.user_point_epoch.get(addr, 0)) for addr in users]
+        bias = np.array([p.bias for p in last], dtype=object)[:, None]
+        slope = np.array([p.slope for p in last], dtype=object)[:, None]
+        ts = np.array([p.ts for p in last], dtype=object)[:, None]
+        has_point = np.array(
+            [self.user_point_epoch.get(addr, 0) > 0 for addr in users], dtype=bool
+        )[:, None]
+        t = np.asarray(timestamps, dtype=object)[None, :]
+
+        dt = t - ts
+        if np.any((dt < 0) & has_point):
+            raise ValueError("timestamp is before the last user checkpoint")
+        result = np.maximum(bias - slope * dt, 0)
+        return np.where(has_point, result, 0)
+
+    def balance_at(self, addr, timestamp):
+        """Mirror of `VotingEscrow.balanceOf` for a single user and timestamp, without numpy."""
+        user_epoch = self.user_point_epoch.get(addr, 0)
+        if user_epoch == 0:
+            return 0
+        point = self.user_point_history[addr][user_epoch]
+        return max(point.bias - point.slope * (timestamp - point.ts), 0)
+
+    def get_last_user_slope(self, addr):
+        """Mirror of `VotingEscrow.get_last_user_slope`"""
+        return self._user_point(addr, self.user_point_epoch.get(addr, 0)).slope
+
+    def total_supply_at(self, timestamp):
+        """Mirror of `VotingEscrow.totalSupply` for a single timestamp, without numpy."""
+        bias, slope, ts, _ = self.point_history[self.epoch]
+        t_i = ts // WEEK * WEEK
+        for _ in range(MAX_WEEKS):
+            t_i += WEEK
+            d_slope = 0
+            if t_i > timestamp:
+                t_i = timestamp
+            else:
+                d_slope = self.slope_changes.get(t_i, 0)
+            bias -= slope * (t_i - ts)
+            if t_i == timestamp:
+                break
+            slope += d_slope
+            ts = t_i
+        return max(bias, 0)
+
+    def _weekly_points(self, point, t_max):
+        """
+        Walk forward from `point` the same way as `supply_at`, recording the
+        bias and slope at `point.ts` and at every following week boundary
+        before `t_max`. Intermediate values are not clamped, matching the
+        contract.
+        """
+        times = [point.ts]
+        biases = [point.bias]
+        slopes = [point.slope]
+        bias, slope, ts = point.bias, point.slope, point.ts
+        t_i = ts // WEEK * WEEK
+        for _ in range(MAX_WEEKS - 1):
+            t_i += WEEK
+            if t_i >= t_max:
+                break
+            bias = int128(bias - slope * (t_i - ts))
+            slope = int128(slope + self.slope_changes.get(t_i, 0))
+            ts = t_i
+            times.append(ts)
+            biases.append(bias)
+            slopes.append(slope)
+        return (
+            np.array(times, dtype=np.int64),
+            np.array(biases, dtype=object),
+            np.array(slopes, dtype=object),
+        )
+
+    def supply_at(self, point, timestamps):
+        """
+        Mirror of `VotingEscrow.supply_at` for many timestamps at once.
+
+        The week walk is done once up to the latest timestamp; each query then
+        only needs a lookup of the preceding boundary and one extrapolation.
+        """
+        t = np.asarray(timestamps, dtype=np.int64)
+        if t.size == 0:
+            return np.array([], dtype=object)
+        if np.any(t < point.ts):
+            raise ValueError("timestamp is before the starting point")
+        # The contract stops walking after MAX_WEEKS boundaries
+        t = np.minimum(t, point.ts // WEEK * WEEK + MAX_WEEKS * WEEK)
+        times, biases, slopes = self._weekly_points(point, int(t.max()))
+        # A timestamp exactly on a week boundary is reached with the slope
+        # from before that week's change, hence the strict comparison
+        idx = np.maximum(np.searchsorted(times, t, side="left") - 1, 0)
+        dt = (t - times[idx]).astype(object)
+        return np.maximum(biases[idx] - slopes[idx] * dt, 0)
+
+    def total_supply(self, timestamps):
+        """Mirror of `VotingEscrow.totalSupply` for many timestamps at once."""
+        return self.supply_at(self.point_history[self.epoch], timestamps)
@@ -0,0 +1,83 @@
+"""
+ERC20VRH model
+==============
+Off-chain mirror of the `ERC20VRH` emission schedule: the mining epochs,
+the rate reduction and the minting cap.
+
+Only balances created by `mint` are tracked.
+"""
+
+from .voting_escrow import Revert
+
+DAY = 86400
+YEAR = 365 * DAY
+INITIAL_SUPPLY = 727_200_000 * 10 ** 18
+INITIAL_RATE = 121_587_840 * 10 ** 18 // YEAR
+RATE_REDUCTION_TIME = YEAR
+RATE_REDUCTION_COEFFICIENT = 1189207115002721024  # 2 ** (1/4) * 1e18
+RATE_DENOMINATOR = 10 ** 18
+INFLATION_DELAY = DAY
+
+
+class VRHTokenModel:
+    """In-memory copy of the `ERC20VRH` emission storage."""
+
+    def __init__(self, timestamp=0):
+        """Model a token deployed at `timestamp`"""
+        self.rate = 0
+        self.mining_epoch = -1
+        self.start_epoch_time = timestamp + INFLATION_DELAY - RATE_REDUCTION_TIME
+        self.start_epoch_supply = INITIAL_SUPPLY
+        self.total_supply = INITIAL_SUPPLY
+        self.balance_of = {}
+
+    @classmethod
+    def from_contract(cls, token):
+        """
+        Load the emission state from a deployed `ERC20VRH`.
+
+        `start_epoch_supply` is not public; it only depends on the number of
+        epochs so far and is rebuilt by replaying the rate reductions.
+        """
+        model = cls()
+        mining_epoch = token.mining_epoch()
+        model.start_epoch_time = token.start_epoch_time() - (mining_epoch + 1) * RATE_REDUCTION_TIME
+        for _ in range(mining_epoch + 1):
+            model._update_mining_parameters()
+        model.total_supply = token.totalSupply()
+        return model
+
+    def _update_mining_parameters(self):
+        self.start_epoch_time += RATE_REDUCTION_TIME
+        self.mining_epoch += 1
+        if self.rate == 0:
+            self.rate = INITIAL_RATE
+        else:
+            self.start_epoch_supply += self.rate * RATE_REDUCTION_TIME
+            self.rate = self.rate * RATE_DENOMINATOR // RATE_REDUCTION_COEFFICIENT
+
+    def update_mining_parameters(self, timestamp):
+        """Mirror of `ERC20VRH.update_mining_parameters`"""
+        if timestamp < self.start_epoch_time + RATE_REDUCTION_TIME:
+            raise Revert()
+        self._update_mining_parameters()
+
+    def future_epoch_time_write(self, timestamp):
+        """Mirror of `ERC20VRH.future_epoch_time_write`"""
+        if timestamp >= self.start_epoch_time + RATE_REDUCTION_TIME:
+            self._update_mining_parameters()
+        return self.start_epoch_time + RATE_REDUCTION_TIME
+
+    def available_supply(self, timestamp):
+        """Mirror of `ERC20VRH.available_supply`"""
+        return self.start_epoch_supply + (timestamp - self.start_epoch_time) * self.rate
+
+    def mint(self, addr, value, timestamp):
+        """Mirror of `ERC20VRH.mint`"""
+        if timestamp >= self.start_epoch_time + RATE_REDUCTION_TIME:
+            self._update_mining_parameters()
+        total_supply = self.total_supply + value
+        if total_supply > self.available_supply(timestamp):
+            raise Revert("exceeds allowable mint amount")
+        self.total_supply = total_supply
+        self.balance_of[addr] = self.balance_of.get(addr, 0) + value
@@ -0,0 +1,683 @@
+"""
+Guild economy simulator
+=======================
+In-process mirror of the whole reward path: `ERC20VRH` emission,
+`VotingEscrow` and `GasEscrow` balances, `GuildController` weights, `Guild`
+integrals, `Minter` and `RewardVestingEscrow`.
+
+Every action applies the same integer arithmetic as the contracts, in the
+same order, and raises `Revert` where they would revert. With the default
+`Params` a simulation therefore ends in exactly the state a chain would (see
+`replay_on_chain` in `economy_sweep.py`); other `Params` change constants of
+the contracts to explore alternatives.
+
+State is kept compact: users, guild types and guilds are integer ids, every
+per-user value of a guild is one list indexed by user id, and the weekly
+`points_*` / `changes_*` mappings of `GuildController` are lists indexed by
+the number of weeks since `start`, sized for the simulated horizon plus the
+longest lock. Escrow and vesting state reuses the models in `scripts/model`.
+"""
+
+from bisect import bisect_right
+from collections import namedtuple
+
+from scripts.model.gas_escrow import GasEscrowModel
+from scripts.model.reward_vesting import RewardVestingEscrowModel
+from scripts.model.voting_escrow import EMPTY_LOCK, Revert, VotingEscrowModel
+from scripts.model.vrh_token import VRHTokenModel
+
+DAY = 86400
+WEEK = 7 * DAY
+MULTIPLIER = 10 ** 18
+# slope changes are scheduled at most this many weeks ahead (lock end)
+MAX_LOCK_WEEKS = 209
+WEIGHT_VOTE_DELAY = 10 * DAY
+REQUIRED_CRITERIA = 100000 * MULTIPLIER
+# iteration caps of the contract loops
+MAX_FILL_WEEKS = 500
+MAX_CHECKPOINT_TYPES = 100
+
+# `ZERO_ADDRESS` as a user or guild id. Per-user lists have one extra slot at
+# the end for it, which collects the owner bonus of guilds without an owner.
+ZERO = -1
+
+Params = namedtuple(
+    "Params", ["tokenless_production", "max_commission_rate", "vesting_ratio", "boost_warmup"]
+)
+
+# the constants of the deployed contracts
+DEFAULT_PARAMS = Params(tokenless_production=40, max_commission_rate=20, vesting_ratio=70, boost_warmup=2 * WEEK)
+
+
+def _next_week(timestamp):
+    return (timestamp + WEEK) // WEEK * WEEK
+
+
+class Economy:
+    """
+    Simulated deployment of the guild reward contracts.
+
+    All contracts are deployed at `start` and actions may be applied for
+    `weeks` weeks after it. Users are the ids `0 .. n_users - 1`; types and
+    guilds get their ids in creation order from `add_type` and
+    `create_guild`.
+    """
+
+    def __init__(self, start, weeks, n_users, params=DEFAULT_PARAMS, block_number=0):
+        self.params = params
+        self.n_users = n_users
+        self.week0 = start // WEEK
+        self.n_weeks = weeks + MAX_LOCK_WEEKS + 2
+
+        self.token = VRHTokenModel(start)
+        self.voting_escrow = VotingEscrowModel(start, block_number)
+        self.reward_vesting = RewardVestingEscrowModel(params.vesting_ratio)
+
+        # GuildController, type-weighted total
+        self.time_total = start // WEEK * WEEK
+        self.points_total = self._weekly()
+        self.slope_total = self._weekly()
+        self.changes_total = self._weekly()
+
+        # GuildController, per type
+        self.gas_escrows = []  # `None` if the type was added without a weight
+        self.time_sum = []
+        self.points_sum = []
+        self.slope_sum = []
+        self.changes_sum = []
+        self.time_type_weight = []
+        # time and weight of every change, epoch 0 is empty
+        self.type_weight_times = []
+        self.type_weights = []
+
+        # GuildController, per guild
+        self.guild_type = []
+        self.time_weight = []
+        self.points_weight = []
+        self.slope_weight = []
+        self.changes_weight = []
+        self.vote_slope = []
+        self.vote_end = []
+        self.last_user_join = []
+
+        # GuildController, per user
+        self.guild_of = [ZERO] * n_users
+        self.guild_owned = [ZERO] * n_users
+
+        # Guild
+        self.owner = []
+        self.period = []
+        self.period_time = []
+        self.created = []  # `period_timestamp[0]`
+        self.integrate_inv_supply = []
+        self.inflation_rate = []
+        self.future_epoch_time = []
+        self.is_paused = []
+        self.last_change_rate = []
+        self.commission_times = []
+        self.commission_rates = []
+        self.working_supply = []
+        self.working_balances = []
+        self.integrate_inv_supply_of = []
+        self.integrate_checkpoint_of = []
+        self.integrate_fraction = []
+        self.total_owner_bonus = []
+
+        # Minter
+        self.minted = []
+
+    @classmethod
+    def from_contracts(cls, token, voting_escrow, guild_controller, n_users, weeks, params=DEFAULT_PARAMS):
+        """
+        Start from freshly deployed contracts, before any lock is created or
+        guild type is added.
+        """
+        if voting_escrow.epoch() != 0 or guild_controller.n_guild_types() != 0:
+            raise ValueError("contracts are already in use")
+        economy = cls(guild_controller.time_total(), weeks, n_users, params)
+        economy.token = VRHTokenModel.from_contract(token)
+        _, _, ts, blk = voting_escrow.point_history(0)
+        economy.voting_escrow = VotingEscrowModel(ts, blk)
+        return economy
+
+    def _weekly(self):
+        return [0] * self.n_weeks
+
+    def _users(self, value=0):
+        return [value] * (self.n_users + 1)
+
+    def _week(self, timestamp):
+        """Index of the week containing `timestamp` in the weekly lists"""
+        return timestamp // WEEK - self.week0
+
+    # ERC20VRH
+
+    def update_mining_parameters(self, timestamp):
+        self.token.update_mining_parameters(timestamp)
+
+    # VotingEscrow and GasEscrow
+
+    def create_lock(self, user, value, unlock_time, timestamp, block_number):
+        self.voting_escrow.create_lock(user, value, unlock_time, timestamp, block_number)
+
+    def increase_amount(self, user, value, timestamp, block_number):
+        self.voting_escrow.increase_amount(user, value, timestamp, block_number)
+
+    def increase_unlock_time(self, user, unlock_time, timestamp, block_number):
+        self.voting_escrow.increase_unlock_time(user, unlock_time, timestamp, block_number)
+
+    def withdraw(self, user, timestamp, block_number):
+        return self.voting_escrow.withdraw(user, timestamp, block_number)
+
+    def create_gas(self, type_id, user, value, timestamp, block_number):
+        self.gas_escrows[type_id].create_gas(user, value, timestamp, block_number)
+
+    def increase_gas(self, type_id, user, value, timestamp, block_number):
+        self.gas_escrows[type_id].increase_amount(user, value, timestamp, block_number)
+
+    def clear_gas(self, type_id, user, timestamp, block_number):
+        return self.gas_escrows[type_id].clear_gas(user, timestamp, block_number)
+
+    def checkpoint_voting_escrow(self, timestamp, block_number):
+        """Mirror of `VotingEscrow.checkpoint`"""
+        self.voting_escrow.checkpoint(None, EMPTY_LOCK, EMPTY_LOCK, timestamp, block_number)
+
+    def checkpoint_gas_escrow(self, type_id, timestamp, block_number):
+        """Mirror of `GasEscrow.checkpoint` of the escrow of `type_id`"""
+        self.gas_escrows[type_id].checkpoint(None, EMPTY_LOCK, EMPTY_LOCK, timestamp, block_number)
+
+    # GuildController
+
+    def _type_weight_at(self, type_id, timestamp):
+        return self.type_weights[type_id][bisect_right(self.type_weight_times[type_id], timestamp) - 1]
+
+    def _get_sum(self, type_id, timestamp):
+        t = self.time_sum[type_id]
+        if t == 0:
+            return 0
+        points, slopes, changes = self.points_sum[type_id], self.slope_sum[type_id], self.changes_sum[type_id]
+        i = self._week(t)
+        bias, slope = points[i], slopes[i]
+        for _ in range(MAX_FILL_WEEKS):
+            if t > timestamp:
+                break
+            t += WEEK
+            i += 1
+            d_bias = slope * WEEK
+            if bias > d_bias:
+                bias -= d_bias
+                slope -= changes[i]
+            else:
+                bias = 0
+                slope = 0
+            points[i] = bias
+            slopes[i] = slope
+            if t > timestamp:
+                self.time_sum[type_id] = t
+        return bias
+
+    def _get_total(self, timestamp):
+        t = self.time_total
+        i = self._week(t)
+        bias = self.points_total[i]
+        if t > timestamp:
+            return bias
+        slope = self.slope_total[i]
+        for _ in range(MAX_FILL_WEEKS):
+            if t > timestamp:
+                break
+            t += WEEK
+            i += 1
+            d_bias = slope * WEEK
+            if bias > d_bias:
+                bias -= d_bias
+                slope -= self.changes_total[i]
+            else:
+                bias = 0
+                slope = 0
+            self.points_total[i] = bias
+            self.slope_total[i] = slope
+            if t > timestamp:
+                self.time_total = t
+        return bias
+
+    def _get_weight(self, guild, timestamp):
+        t = self.time_weight[guild]
+        if t == 0:
+            return 0
+        points, slopes, changes = self.points_weight[guild], self.slope_weight[guild], self.changes_weight[guild]
+        i = self._week(t)
+        bias, slope = points[i], slopes[i]
+        for _ in range(MAX_FILL_WEEKS):
+            if t > timestamp:
+                break
+            t += WEEK
+            i += 1
+            d_bias = slope * WEEK
+            if bias > d_bias:
+                bias -= d_bias
+                slope -= changes[i]
+            else:
+                bias = 0
+                slope = 0
+            points[i] = bias
+            slopes[i] = slope
+            if t > timestamp:
+                self.time_weight[guild] = t
+        return bias
+
+    def checkpoint(self, timestamp):
+        """Mirror of `GuildController.checkpoint`"""
+        for type_id in range(min(len(self.time_sum), MAX_CHECKPOINT_TYPES)):
+            self._get_sum(type_id, timestamp)
+        self._get_total(timestamp)
+
+    def checkpoint_guild(self, guild, timestamp):
+        """Mirror of `GuildController.checkpoint_guild`"""
+        self._get_weight(guild, timestamp)
+        self._get_total(timestamp)
+
+    def guild_relative_weight(self, guild, timestamp):
+        """Mirror of `GuildController.guild_relative_weight`"""
+        i = self._week(timestamp)
+        total = self.points_total[i]
+        if total == 0:
+            return 0
+        t = timestamp // WEEK * WEEK
+        return MULTIPLIER * self._type_weight_at(self.guild_type[guild], t) * self.points_weight[guild][i] // total
+
+    def get_guild_weight(self, guild):
+        """Mirror of `GuildController.get_guild_weight`"""
+        return self.points_weight[guild][self._week(self.time_weight[guild])]
+
+    def get_total_weight(self):
+        """Mirror of `GuildController.get_total_weight`"""
+        return self.points_total[self._week(self.time_total)]
+
+    def _change_type_weight(self, type_id, weight, timestamp):
+        old_weight = self.type_weights[type_id][-1]
+        old_sum = self._get_sum(type_id, timestamp)
+        total_weight = self._get_total(timestamp)
+        next_time = _next_week(timestamp)
+        n = self._week(next_time)
+
+        total_weight = total_weight + old_sum * weight - old_sum * old_weight
+        self.points_total[n] = total_weight
+        if self.time_sum[type_id] > 0 and weight != old_weight:
+            old_slope = self.slope_sum[type_id][n]
+            self.slope_total[n] = self.slope_total[n] + old_slope * weight - old_slope * old_weight
+            changes = self.changes_sum[type_id]
+            for i in range(n + 1, n + 1 + MAX_LOCK_WEEKS):
+                d_slope = changes[i]
+                if d_slope > 0:
+                    self.changes_total[i] = self.changes_total[i] + d_slope * weight - d_slope * old_weight
+        # several changes in one week replace each other
+        if self.time_type_weight[type_id] != next_time:
+            self.type_weight_times[type_id].append(next_time)
+            self.type_weights[type_id].append(weight)
+        else:
+            self.type_weights[type_id][-1] = weight
+        self.time_total = next_time
+        self.time_type_weight[type_id] = next_time
+
+    def add_type(self, weight, timestamp, block_number):
+        """Mirror of `GuildController.add_type`, returns the type id"""
+        type_id = len(self.time_sum)
+        self.time_sum.append(0)
+        self.points_sum.append(self._weekly())
+        self.slope_sum.append(self._weekly())
+        self.changes_sum.append(self._weekly())
+        self.time_type_weight.append(0)
+        self.type_weight_times.append([0])
+        self.type_weights.append([0])
+        # the contract only registers the gas escrow of a type added with a weight
+        self.gas_escrows.append(None)
+        if weight != 0:
+            self._change_type_weight(type_id, weight, timestamp)
+            self.gas_escrows[type_id] = GasEscrowModel(timestamp, block_number)
+        return type_id
+
+    def change_type_weight(self, type_id, weight, timestamp):
+        """Mirror of `GuildController.change_type_weight`"""
+        self._change_type_weight(type_id, weight, timestamp)
+
+    def _check_vote(self, user, timestamp):
+        if self.voting_escrow.locked.get(user, EMPTY_LOCK).end <= _next_week(timestamp):
+            raise Revert("Your token lock expires too soon")
+
+    def _vote_for_guild(self, user, guild, vote, timestamp):
+        self._check_vote(user, timestamp)
+        slope = self.voting_escrow.get_last_user_slope(user)
+        lock_end = self.voting_escrow.locked.get(user, EMPTY_LOCK).end
+        next_time = _next_week(timestamp)
+        n = self._week(next_time)
+        type_id = self.guild_type[guild]
+
+        old_slope = self.vote_slope[guild][user]
+        old_end = self.vote_end[guild][user]
+        old_bias = old_slope * (old_end - next_time) if old_end > next_time else 0
+        new_slope = slope if vote else 0
+        new_bias = new_slope * (lock_end - next_time)
+
+        old_weight_bias = self._get_weight(guild, timestamp)
+        old_weight_slope = self.slope_weight[guild][n]
+        old_sum_bias = self._get_sum(type_id, timestamp)
+        old_sum_slope = self.slope_sum[type_id][n]
+        type_weight = self.type_weights[type_id][-1]
+        old_total_bias = self._get_total(timestamp)
+        old_total_slope = self.slope_total[n]
+
+        new_sum_bias = max(old_sum_bias + new_bias, old_bias) - old_bias
+        self.points_weight[guild][n] = max(old_weight_bias + new_bias, old_bias) - old_bias
+        if old_end > next_time:
+            self.slope_weight[guild][n] = max(old_weight_slope + new_slope, old_slope) - old_slope
+            new_sum_slope = max(old_sum_slope + new_slope, old_slope) - old_slope
+        else:
+            self.slope_weight[guild][n] += new_slope
+            new_sum_slope = old_sum_slope + new_slope
+        self.points_sum[type_id][n] = new_sum_bias
+        self.slope_sum[type_id][n] = new_sum_slope
+
+        self.points_total[n] = (
+            max(old_total_bias + new_sum_bias * type_weight, old_sum_bias * type_weight) - old_sum_bias * type_weight
+        )
+        self.slope_total[n] = (
+            max(old_total_slope + new_sum_slope * type_weight, old_sum_slope * type_weight)
+            - old_sum_slope * type_weight
+        )
+
+        if old_end > timestamp:
+            i = self._week(old_end)
+            self.changes_weight[guild][i] -= old_slope
+            self.changes_sum[type_id][i] -= old_slope
+            self.changes_total[i] -= old_slope * type_weight
+        i = self._week(lock_end)
+        self.changes_weight[guild][i] += new_slope
+        self.changes_sum[type_id][i] += new_slope
+        self.changes_total[i] += new_slope * type_weight
+
+        self.vote_slope[guild][user] = new_slope
+        self.vote_end[guild][user] = lock_end
+
+    def create_guild(self, owner, type_id, commission_rate, timestamp):
+        """Mirror of `GuildController.create_guild`, returns the guild id"""
+        if not 0 <= type_id < len(self.time_sum):
+            raise Revert("Guild type not supported")
+        if self.guild_of[owner] != ZERO:
+            raise Revert("Already in a guild")
+        if self.guild_owned[owner] != ZERO:
+            raise Revert("Only can create one guild")
+        if self.gas_escrows[type_id] is None:
+            raise Revert("Guild type is not supported")
+        if self.voting_escrow.balance_at(owner, timestamp) < REQUIRED_CRITERIA:
+            raise Revert("Does not meet requirement to create guild")
+        if not 0 <= commission_rate <= self.params.max_commission_rate:
+            raise Revert("Rate has to be minimally 0% and maximum 20%")
+
+        guild = len(self.owner)
+        next_time = _next_week(timestamp)
+        # Guild.initialize
+        self.owner.append(owner)
+        self.period.append(0)
+        self.period_time.append(timestamp)
+        self.created.append(timestamp)
+        self.integrate_inv_supply.append(0)
+        self.commission_times.append([0, next_time])
+        self.commission_rates.append([0, commission_rate])
+        self.last_change_rate.append(next_time)
+        self.inflation_rate.append(self.token.rate)
+        self.future_epoch_time.append(self.token.future_epoch_time_write(timestamp))
+        self.is_paused.append(False)
+        self.working_supply.append(0)
+        self.working_balances.append(self._users())
+        self.integrate_inv_supply_of.append(self._users())
+        self.integrate_checkpoint_of.append(self._users())
+        self.integrate_fraction.append(self._users())
+        self.total_owner_bonus.append(self._users())
+        self.minted.append(self._users())
+
+        if self.time_sum[type_id] == 0:
+            self.time_sum[type_id] = next_time
+        self.guild_type.append(type_id)
+        self.time_weight.append(next_time)
+        self.points_weight.append(self._weekly())
+        self.slope_weight.append(self._weekly())
+        self.changes_weight.append(self._weekly())
+        self.vote_slope.append(self._users())
+        self.vote_end.append(self._users())
+        self.last_user_join.append(self._users())
+
+        self.guild_owned[owner] = guild
+        self.guild_of[owner] = guild
+        self.last_user_join[guild][owner] = timestamp
+        return guild
+
+    def transfer_guild_ownership(self, old_owner, new_owner, timestamp):
+        """Mirror of `GuildController.transfer_guild_ownership`, `new_owner` may be `ZERO`"""
+        if old_owner == new_owner:
+            raise Revert()
+        guild = self.guild_owned[old_owner]
+        if guild == ZERO:
+            raise Revert("Not an owner")
+        if new_owner != ZERO:
+            if self.guild_owned[new_owner] != ZERO:
+                raise Revert("New owner cannot be an owner of another guild")
+            if self.guild_of[new_owner] != guild:
+                raise Revert("New owner is not in the same guild")
+            if self.voting_escrow.balance_at(new_owner, timestamp) < REQUIRED_CRITERIA:
+                raise Revert("New owner does not meet requirement to take over guild")
+
+        # Guild.transfer_ownership
+        self._checkpoint(guild, old_owner, timestamp)
+        self.owner[guild] = new_owner
+
+        self.guild_owned[old_owner] = ZERO
+        if new_owner != ZERO:
+            self.guild_owned[new_owner] = guild
+
+    def toggle_pause(self, guild):
+        """Mirror of `GuildController.toggle_pause`"""
+        self.is_paused[guild] = not self.is_paused[guild]
+
+    # Guild
+
+    def commission_rate(self, guild, timestamp):
+        """Mirror of `Guild.commission_rate`"""
+        return self.commission_rates[guild][bisect_right(self.commission_times[guild], timestamp) - 1]
+
+    def _checkpoint(self, guild, user, timestamp):
+        period_time = self.period_time[guild]
+        integrate_inv_supply = self.integrate_inv_supply[guild]
+        owner_bonus = 0
+
+        rate = self.inflation_rate[guild]
+        new_rate = rate
+        prev_future_epoch = self.future_epoch_time[guild]
+        if prev_future_epoch >= period_time:
+            self.future_epoch_time[guild] = self.token.future_epoch_time_write(timestamp)
+            new_rate = self.token.rate
+            self.inflation_rate[guild] = new_rate
+
+        self.checkpoint_guild(guild, timestamp)
+
+        working_balance = self.working_balances[guild][user]
+        working_supply = self.working_supply[guild]
+
+        if self.is_paused[guild]:
+            rate = 0
+
+        if timestamp > period_time:
+            prev_week_time = period_time
+            week_time = min((period_time + WEEK) // WEEK * WEEK, timestamp)
+            for _ in range(MAX_FILL_WEEKS):
+                dt = week_time - prev_week_time
+                week_start = prev_week_time // WEEK * WEEK
+                w = self.guild_relative_weight(guild, week_start)
+                commission_rate = self.commission_rate(guild, week_start)
+
+                if working_supply > 0:
+                    if prev_week_time <= prev_future_epoch < week_time:
+                        # the rate of the old epoch until it ends, then the new one
+                        integrate_inv_supply += (
+                            rate * w * (prev_future_epoch - prev_week_time)
+                            // working_supply
+                            * (100 - commission_rate)
+                            // 100
+                        )
+                        owner_bonus += rate * w * (prev_future_epoch - prev_week_time) * commission_rate // 100
+                        rate = new_rate
+                        integrate_inv_supply += (
+                            rate * w * (week_time - prev_future_epoch)
+                            // working_supply
+                            * (100 - commission_rate)
+                            // 100
+                        )
+                        owner_bonus += rate * w * (week_time - prev_future_epoch) * commission_rate // 100
+                    else:
+                        integrate_inv_supply += rate * w * dt // working_supply * (100 - commission_rate) // 100
+                        owner_bonus += rate * w * dt * commission_rate // 100
+
+                if week_time == timestamp:
+                    break
+                prev_week_time = week_time
+                week_time = min(week_time + WEEK, timestamp)
+
+        self.period[guild] += 1
+        self.period_time[guild] = timestamp
+        self.integrate_inv_supply[guild] = integrate_inv_supply
+
+        if owner_bonus > 0:
+            owner = self.owner[guild]
+            self.integrate_fraction[guild][owner] += owner_bonus // MULTIPLIER
+            self.total_owner_bonus[guild][owner] += owner_bonus // MULTIPLIER
+
+        self.integrate_fraction[guild][user] += (
+            working_balance * (integrate_inv_supply - self.integrate_inv_supply_of[guild][user]) // MULTIPLIER
+        )
+        self.integrate_inv_supply_of[guild][user] = integrate_inv_supply
+        self.integrate_checkpoint_of[guild][user] = timestamp
+
+    def _update_liquidity_limit(self, guild, user, bu, S, timestamp):
+        gas_escrow = self.gas_escrows[self.guild_type[guild]]
+        wi = gas_escrow.balance_at(user, timestamp)
+        W = gas_escrow.total_supply_at(timestamp)
+        tokenless = self.params.tokenless_production
+
+        lim = bu * tokenless // 100
+        if S > 0 and timestamp > self.created[guild] + self.params.boost_warmup and wi > 0:
+            lim += S * wi // W * (100 - tokenless) // 100
+
+        lim = min(bu, lim)
+        old_bal = self.working_balances[guild][user]
+        self.working_balances[guild][user] = lim
+        self.working_supply[guild] = self.working_supply[guild] + lim - old_bal
+
+    def set_commission_rate(self, guild, increase, timestamp):
+        """Mirror of `Guild.set_commission_rate`, sent by the guild owner"""
+        if timestamp < self.last_change_rate[guild]:
+            raise Revert("Can only change commission rate once every week")
+        commission_rate = self.commission_rates[guild][-1] + (1 if increase else -1)
+        if commission_rate > self.params.max_commission_rate:
+            raise Revert("Maximum is 20")
+        if commission_rate < 0:
+            raise Revert()
+        next_time = _next_week(timestamp)
+        self.commission_times[guild].append(next_time)
+        self.commission_rates[guild].append(commission_rate)
+        self.last_change_rate[guild] = next_time
+
+    def user_checkpoint(self, guild, user, timestamp):
+        """Mirror of `Guild.user_checkpoint`"""
+        if self.guild_of[user] != guild:
+            raise Revert("Not in guild")
+        voting_power = self.voting_escrow.balance_at(user, timestamp)
+        if voting_power != 0:
+            self._vote_for_guild(user, guild, True, timestamp)
+        self._checkpoint(guild, user, timestamp)
+        self._update_liquidity_limit(guild, user, voting_power, self.get_guild_weight(guild), timestamp)
+
+    def update_working_balance(self, guild, user, timestamp):
+        """Mirror of `Guild.update_working_balance`"""
+        if self.guild_of[user] != guild:
+            raise Revert("Not in guild")
+        self._checkpoint(guild, user, timestamp)
+        voting_power = self.voting_escrow.balance_at(user, timestamp)
+        self._update_liquidity_limit(guild, user, voting_power, self.get_guild_weight(guild), timestamp)
+
+    def kick(self, guild, user, timestamp):
+        """Mirror of `Guild.kick`"""
+        gas_escrow = self.gas_escrows[self.guild_type[guild]]
+        t_last = self.integrate_checkpoint_of[guild][user]
+        t_gas = gas_escrow._user_point(user, gas_escrow.user_point_epoch.get(user, 0)).ts
+        balance = self.voting_escrow.balance_at(user, timestamp)
+        gas_balance = gas_escrow.balance_at(user, timestamp)
+
+        if not (balance == 0 or gas_balance == 0 or t_gas > t_last):
+            raise Revert("kick not allowed")
+        if self.working_balances[guild][user] <= balance * 2 * self.params.tokenless_production // 100:
+            raise Revert("kick not needed")
+
+        self._checkpoint(guild, user, timestamp)
+        self._update_liquidity_limit(guild, user, balance, self.get_guild_weight(guild), timestamp)
+
+    def join_guild(self, guild, user, timestamp):
+        """Mirror of `Guild.join_guild`"""
+        # GuildController.add_member
+        if self.guild_of[user] != ZERO:
+            raise Revert("Already in a guild")
+        if self.voting_escrow.balance_at(user, timestamp) == 0:
+            raise Revert("Insufficient votes")
+        self._vote_for_guild(user, guild, True, timestamp)
+        self.last_user_join[guild][user] = timestamp
+        self.guild_of[user] = guild
+
+        self._checkpoint(guild, user, timestamp)
+        voting_power = self.voting_escrow.balance_at(user, timestamp)
+        self._update_liquidity_limit(guild, user, voting_power, self.get_guild_weight(guild), timestamp)
+
+    def leave_guild(self, guild, user, timestamp):
+        """Mirror of `Guild.leave_guild`"""
+        # GuildController.remove_member
+        if self.guild_of[user] != guild:
+            raise Revert("Cannot access other guilds")
+        if self.guild_owned[user] != ZERO:
+            raise Revert("Owner cannot leave guild")
+        if timestamp < self.last_user_join[guild][user] + WEIGHT_VOTE_DELAY:
+            raise Revert("Leave guild too soon")
+        balance = self.voting_escrow.balance_at(user, timestamp)
+        if balance != 0:
+            self._check_vote(user, timestamp)
+
+        self._mint_for(guild, user, True, timestamp)
+        if balance != 0:
+            self._vote_for_guild(user, guild, False, timestamp)
+        self.guild_of[user] = ZERO
+
+        self._update_liquidity_limit(guild, user, 0, self.get_guild_weight(guild), timestamp)
+
+    # Minter
+
+    def _mint_for(self, guild, user, leave_guild, timestamp):
+        # checked first as the claim below is not rolled back here
+        if guild != ZERO and not leave_guild and self.voting_escrow.balance_at(user, timestamp) != 0:
+            self._check_vote(user, timestamp)
+
+        to_mint = self.reward_vesting.claim(user, timestamp)
+        if guild != ZERO:
+            if leave_guild:
+                self.update_working_balance(guild, user, timestamp)
+            else:
+                self.user_checkpoint(guild, user, timestamp)
+            total_mint = self.integrate_fraction[guild][user]
+            mintable = total_mint - self.minted[guild][user]
+            if mintable > 0:
+                vested = self.reward_vesting.vesting(user, mintable, timestamp)
+                to_mint += mintable - vested
+                self.minted[guild][user] = total_mint
+
+        if to_mint > 0:
+            self.token.mint(user, to_mint, timestamp)
+
+    def mint(self, user, timestamp):
+        """Mirror of `Minter.mint`"""
+        self._mint_for(self.guild_of[user], user, False, timestamp)
@@ -0,0 +1,536 @@
+"""
+Guild economy parameter sweep
+=============================
+Runs simulated years of guild activity on `scripts/simulation/economy.py`
+for every combination of type weights, `TOKENLESS_PRODUCTION`, commission
+cap and vesting ratio in a grid, spread over a process pool, and reports
+where the emission ends up.
+
+A scenario is fully described by a `Scenario` and its seed: after a fixed
+setup (types, locks, guilds), random users act every week - join, leave,
+mint, burn gas, kick, change commissions - chosen from the simulated state,
+and a keeper checkpoints the escrows and the controller at every week
+start. With the default `Params` the same scenario can be replayed against
+deployed contracts with `replay_on_chain`, which compares both after every
+step.
+
+Usage:
+    brownie run simulation/economy_sweep --network development
+    brownie run simulation/economy_sweep main 2000 156 --network development
+    brownie run simulation/economy_sweep replay 7 --network development
+"""
+
+import itertools
+import json
+import multiprocessing
+import os
+import random
+from collections import namedtuple
+
+from scripts.model.voting_escrow import EMPTY_LOCK, Revert
+from scripts.model.vrh_token import INITIAL_SUPPLY
+
+from .economy import DEFAULT_PARAMS, ZERO, Economy
+
+REPORT_JSON = "reports/economy_sweep.json"
+
+HOUR = 3600
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+MAXTIME = 4 * YEAR
+MULTIPLIER = 10 ** 18
+
+# offline scenarios start on an arbitrary week boundary
+START_TS = 2600 * WEEK
+START_BLOCK = 1
+BLOCK_TIME = 13
+
+# owners lock enough for `REQUIRED_CRITERIA` (100000 VRH) for 4 years
+OWNER_LOCK = (110000 * MULTIPLIER, 300000 * MULTIPLIER)
+MEMBER_LOCK = (100 * MULTIPLIER, 100000 * MULTIPLIER)
+GAS_AMOUNT = (MULTIPLIER, 10 ** 6 * MULTIPLIER)
+
+# (action, relative weight) for a member of a guild
+MEMBER_ACTIONS = [
+    ("mint", 6),
+    ("user_checkpoint", 2),
+    ("burn_gas", 3),
+    ("increase_amount", 1),
+    ("increase_unlock_time", 1),
+    ("leave_guild", 1),
+    ("kick", 1),
+]
+# chance per action that the admin changes a type weight instead
+TYPE_WEIGHT_CHANGE = 0.005
+
+# replayed actions are kept this far from a week boundary, where a second
+# changes the outcome
+BOUNDARY_MARGIN = 60
+
+Scenario = namedtuple(
+    "Scenario", ["seed", "n_users", "n_guilds", "type_weights", "weeks", "actions_per_week", "params"]
+)
+Action = namedtuple("Action", ["dt", "name", "user", "target", "value"])
+Failure = namedtuple("Failure", ["seed", "step", "action", "message"])
+
+# grid of `main`
+TYPE_WEIGHTS = [(MULTIPLIER,) * 3, (MULTIPLIER, 2 * MULTIPLIER, 4 * MULTIPLIER)]
+TOKENLESS_PRODUCTION = [20, 40, 60]
+MAX_COMMISSION_RATE = [10, 20]
+VESTING_RATIO = [50, 70]
+
+
+def grid(seeds, n_users, n_guilds, weeks, actions_per_week, type_weights=TYPE_WEIGHTS):
+    """Scenarios for every combination of the parameter lists and seeds"""
+    combinations = itertools.product(type_weights, TOKENLESS_PRODUCTION, MAX_COMMISSION_RATE, VESTING_RATIO, seeds)
+    return [
+        Scenario(
+            seed,
+            n_users,
+            n_guilds,
+            weights,
+            weeks,
+            actions_per_week,
+            DEFAULT_PARAMS._replace(tokenless_production=tp, max_commission_rate=cap, vesting_ratio=ratio),
+        )
+        for weights, tp, cap, ratio, seed in combinations
+    ]
+
+
+def _log_uniform(rng, low, high):
+    return int(low * (high / low) ** rng.random())
+
+
+def _lock_duration(rng):
+    # clear of the 1 year minimum, which is checked against week-rounded times
+    return rng.randrange(YEAR + WEEK, MAXTIME)
+
+
+def _setup_actions(scenario, rng):
+    yield Action(DAY + 1, "update_mining_parameters", ZERO, ZERO, 0)
+    for type_id, weight in enumerate(scenario.type_weights):
+        yield Action(1, "add_type", ZERO, type_id, weight)
+    for user in range(scenario.n_users):
+        if user < scenario.n_guilds:
+            yield Action(1, "create_lock", user, MAXTIME, _log_uniform(rng, *OWNER_LOCK))
+        else:
+            yield Action(1, "create_lock", user, _lock_duration(rng), _log_uniform(rng, *MEMBER_LOCK))
+    for owner in range(scenario.n_guilds):
+        commission_rate = rng.randint(0, scenario.params.max_commission_rate)
+        yield Action(1, "create_guild", owner, owner % len(scenario.type_weights), commission_rate)
+    for owner in range(scenario.n_guilds):
+        yield Action(1, "user_checkpoint", owner, owner, 0)
+
+
+def _random_action(rng, economy, scenario, dt, now):
+    user = rng.randrange(scenario.n_users)
+    n_types = len(scenario.type_weights)
+    if rng.random() < TYPE_WEIGHT_CHANGE:
+        weight = scenario.type_weights[rng.randrange(n_types)] * rng.choice([1, 2]) // rng.choice([1, 2])
+        return Action(dt, "change_type_weight", ZERO, rng.randrange(n_types), weight)
+
+    locked = economy.voting_escrow.locked.get(user, EMPTY_LOCK)
+    guild = economy.guild_of[user]
+    if locked.amount == 0:
+        return Action(dt, "create_lock", user, _lock_duration(rng), _log_uniform(rng, *MEMBER_LOCK))
+    if locked.end <= now and guild == ZERO:
+        return Action(dt, "withdraw", user, ZERO, 0)
+    if guild == ZERO:
+        return Action(dt, "join_guild", user, rng.randrange(len(economy.owner)), 0)
+
+    (name,) = rng.choices([(i,) for i, _ in MEMBER_ACTIONS], weights=[i for _, i in MEMBER_ACTIONS])[0]
+    if economy.guild_owned[user] == guild and rng.random() < 0.2:
+        return Action(dt, "set_commission_rate", user, guild, rng.random() < 0.5)
+    if name == "burn_gas":
+        value = _log_uniform(rng, *GAS_AMOUNT)
+        gas_escrow = economy.gas_escrows[economy.guild_type[guild]]
+        if gas_escrow.locked.get(user, EMPTY_LOCK).amount == 0:
+            return Action(dt, "create_gas", user, economy.guild_type[guild], value)
+        return Action(dt, "increase_gas", user, economy.guild_type[guild], value)
+    if name == "increase_amount":
+        return Action(dt, name, user, ZERO, _log_uniform(rng, *MEMBER_LOCK))
+    if name == "increase_unlock_time":
+        return Action(dt, name, user, _lock_duration(rng), 0)
+    if name == "kick":
+        return Action(dt, name, user, rng.randrange(scenario.n_users), guild)
+    return Action(dt, name, user, guild, 0)
+
+
+def scenario_actions(scenario, economy):
+    """
+    Yield the actions of `scenario`. Later actions are chosen from the state
+    of `economy`, so each one has to be applied before the next is drawn.
+    """
+    rng = random.Random(f"economy-{scenario.seed}")
+    yield from _setup_actions(scenario, rng)
+    now = START_TS
+    step = WEEK // scenario.actions_per_week
+    for _ in range(scenario.weeks):
+        # the keeper runs first thing in the week
+        dt = (now // WEEK + 1) * WEEK - now + rng.randrange(HOUR)
+        now += dt
+        yield Action(dt, "checkpoint_voting_escrow", ZERO, ZERO, 0)
+        for type_id in range(len(scenario.type_weights)):
+            yield Action(1, "checkpoint_gas_escrow", ZERO, type_id, 0)
+        yield Action(1, "checkpoint", ZERO, ZERO, 0)
+        for _ in range(scenario.actions_per_week - 1):
+            dt = rng.randrange(1, step)
+            now += dt
+            yield _random_action(rng, economy, scenario, dt, now)
+
+
+def apply(economy, action, now, timestamp, block_number):
+    """
+    Apply `action` to `economy`. Lock times are relative to `now`, the time
+    the action was sent at.
+    """
+    name, user, target, value = action.name, action.user, action.target, action.value
+    if name == "update_mining_parameters":
+        economy.update_mining_parameters(timestamp)
+    elif name == "add_type":
+        economy.add_type(value, timestamp, block_number)
+    elif name == "change_type_weight":
+        economy.change_type_weight(target, value, timestamp)
+    elif name == "create_lock":
+        economy.create_lock(user, value, now + target, timestamp, block_number)
+    elif name == "increase_amount":
+        economy.increase_amount(user, value, timestamp, block_number)
+    elif name == "increase_unlock_time":
+        economy.increase_unlock_time(user, now + target, timestamp, block_number)
+    elif name == "withdraw":
+        economy.withdraw(user, timestamp, block_number)
+    elif name == "create_gas":
+        economy.create_gas(target, user, value, timestamp, block_number)
+    elif name == "increase_gas":
+        economy.increase_gas(target, user, value, timestamp, block_number)
+    elif name == "checkpoint_voting_escrow":
+        economy.checkpoint_voting_escrow(timestamp, block_number)
+    elif name == "checkpoint_gas_escrow":
+        economy.checkpoint_gas_escrow(target, timestamp, block_number)
+    elif name == "checkpoint":
+        economy.checkpoint(timestamp)
+    elif name == "create_guild":
+        economy.create_guild(user, target, value, timestamp)
+    elif name == "set_commission_rate":
+        if economy.guild_owned[user] != target:
+            raise Revert("Only guild owner can change commission rate")
+        economy.set_commission_rate(target, value, timestamp)
+    elif name == "join_guild":
+        economy.join_guild(target, user, timestamp)
+    elif name == "leave_guild":
+        economy.leave_guild(target, user, timestamp)
+    elif name == "user_checkpoint":
+        economy.user_checkpoint(target, user, timestamp)
+    elif name == "kick":
+        economy.kick(value, target, timestamp)
+    elif name == "mint":
+        economy.mint(user, timestamp)
+    else:
+        raise ValueError(name)
+
+
+def summarize(economy, timestamp):
+    """Where the emission went by `timestamp`"""
+    n_types = len(economy.time_sum)
+    integrated = [0] * n_types
+    for guild, type_id in enumerate(economy.guild_type):
+        integrated[type_id] += sum(economy.integrate_fraction[guild])
+    vesting = sum(economy.reward_vesting.balance_of.values())
+    minted = economy.token.total_supply - INITIAL_SUPPLY
+    working_supply = sum(economy.working_supply)
+    voting_power = sum(
+        economy.voting_escrow.balance_at(user, timestamp)
+        for user in range(economy.n_users)
+        if economy.guild_of[user] != ZERO
+    )
+    return {
+        "available": economy.token.available_supply(timestamp) - INITIAL_SUPPLY,
+        "integrated": sum(integrated),
+        "integrated_per_type": integrated,
+        "owner_bonus": sum(sum(i) for i in economy.total_owner_bonus),
+        "minted": minted,
+        "vesting": vesting,
+        "members": sum(1 for i in economy.guild_of if i != ZERO),
+        # working balances relative to the member voting power, 1e18 = no boost
+        "boost": working_supply * MULTIPLIER // voting_power if voting_power else 0,
+    }
+
+
+def run_scenario(scenario):
+    """
+    Run `scenario` on a fresh simulated deployment.
+
+    Returns the scenario with its `summarize` result and the number of
+    reverted actions.
+    """
+    economy = Economy(START_TS, scenario.weeks + 2, scenario.n_users, scenario.params, START_BLOCK)
+    timestamp, block_number = START_TS, START_BLOCK
+    reverts = 0
+    for action in scenario_actions(scenario, economy):
+        timestamp += action.dt
+        block_number += 1 + action.dt // BLOCK_TIME
+        try:
+            apply(economy, action, timestamp, timestamp, block_number)
+        except Revert:
+            reverts += 1
+    # everyone still in a guild collects their rewards
+    for user in range(scenario.n_users):
+        if economy.guild_of[user] != ZERO:
+            timestamp += 1
+            try:
+                economy.mint(user, timestamp)
+            except Revert:
+                reverts += 1
+    return scenario, summarize(economy, timestamp), reverts
+
+
+def run_sweep(scenarios, processes=None):
+    """
+    Run every scenario, spread over `processes` worker processes (default:
+    one per CPU). Results are returned in the order of `scenarios`.
+    """
+    if processes == 1:
+        return list(map(run_scenario, scenarios))
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(run_scenario, scenarios, chunksize=1)
+
+
+def deploy(admin, users, n_types):
+    """Deploy a fresh system, with `users` funded with VRH and one gas token per type"""
+    from brownie import (
+        ERC20VRH,
+        ERC20Gas,
+        GasEscrow,
+        Guild,
+        GuildController,
+        Minter,
+        RewardVestingEscrow,
+        VotingEscrow,
+    )
+
+    token = ERC20VRH.deploy("Vote Escrowed Token", "VRH", 18, {"from": admin})
+    voting_escrow = VotingEscrow.deploy(token, "Voting-escrowed VRH", "veVRH", "veVRH_0.99", {"from": admin})
+    guild_controller = GuildController.deploy(
+        token, voting_escrow, Guild.deploy({"from": admin}), GasEscrow.deploy({"from": admin}), {"from": admin}
+    )
+    reward_vesting = RewardVestingEscrow.deploy({"from": admin})
+    minter = Minter.deploy(token, guild_controller, reward_vesting, {"from": admin})
+    token.set_minter(minter, {"from": admin})
+    guild_controller.set_minter(minter, {"from": admin})
+    reward_vesting.set_minter(minter, {"from": admin})
+
+    gas_tokens = [ERC20Gas.deploy(f"Gas Token {i}", f"GAS{i}", 18, {"from": admin}) for i in range(n_types)]
+    for acct in users:
+        token.transfer(acct, 10 ** 24, {"from": admin})
+        token.approve(voting_escrow, 2 ** 256 - 1, {"from": acct})
+        for gas_token in gas_tokens:
+            gas_token.transfer(acct, 10 ** 25, {"from": admin})
+    return {
+        "token": token,
+        "voting_escrow": voting_escrow,
+        "guild_controller": guild_controller,
+        "reward_vesting": reward_vesting,
+        "minter": minter,
+        "gas_tokens": gas_tokens,
+        "guilds": [],
+    }
+
+
+def _send(contracts, action, users, admin, now):
+    """Send `action` to the contracts and return the transaction"""
+    from brownie import GasEscrow, Guild
+
+    name, target, value = action.name, action.target, action.value
+    sender = users[action.user] if action.user != ZERO else admin
+    token, voting_escrow = contracts["token"], contracts["voting_escrow"]
+    guild_controller, guilds = contracts["guild_controller"], contracts["guilds"]
+    tx = {"from": sender}
+
+    if name == "update_mining_parameters":
+        return token.update_mining_parameters(tx)
+    if name == "add_type":
+        return guild_controller.add_type(f"Type {target}", f"TYPE{target}", contracts["gas_tokens"][target], value, tx)
+    if name == "change_type_weight":
+        return guild_controller.change_type_weight(target, value, tx)
+    if name == "create_lock":
+        return voting_escrow.create_lock(value, now + target, tx)
+    if name == "increase_amount":
+        return voting_escrow.increase_amount(value, tx)
+    if name == "increase_unlock_time":
+        return voting_escrow.increase_unlock_time(now + target, tx)
+    if name == "withdraw":
+        return voting_escrow.withdraw(tx)
+    if name in ("create_gas", "increase_gas"):
+        gas_escrow = GasEscrow.at(guild_controller.gas_type_escrow(target))
+        contracts["gas_tokens"][target].approve(gas_escrow, value, {"from": sender})
+        return getattr(gas_escrow, "create_gas" if name == "create_gas" else "increase_amount")(value, tx)
+    if name == "checkpoint_voting_escrow":
+        return voting_escrow.checkpoint(tx)
+    if name == "checkpoint_gas_escrow":
+        return GasEscrow.at(guild_controller.gas_type_escrow(target)).checkpoint(tx)
+    if name == "checkpoint":
+        return guild_controller.checkpoint(tx)
+    if name == "create_guild":
+        tx = guild_controller.create_guild(sender, target, value, {"from": admin})
+        guilds.append(Guild.at(tx.return_value))
+        return tx
+    if name == "set_commission_rate":
+        return guilds[target].set_commission_rate(value, tx)
+    if name == "join_guild":
+        return guilds[target].join_guild(tx)
+    if name == "leave_guild":
+        return guilds[target].leave_guild(tx)
+    if name == "user_checkpoint":
+        return guilds[target].user_checkpoint(sender, tx)
+    if name == "kick":
+        return guilds[value].kick(users[target], tx)
+    if name == "mint":
+        return contracts["minter"].mint(tx)
+    raise ValueError(name)
+
+
+def _compare(contracts, economy, users, timestamp):
+    """Return a description of the first difference between contracts and simulation, or None"""
+    token, guild_controller = contracts["token"], contracts["guild_controller"]
+    reward_vesting, minter = contracts["reward_vesting"], contracts["minter"]
+    expected = [
+        ("totalSupply", token.totalSupply(), economy.token.total_supply),
+        ("rate", token.rate(), economy.token.rate),
+        ("get_total_weight", guild_controller.get_total_weight(), economy.get_total_weight()),
+    ]
+    for user, addr in enumerate(users):
+        vesting = economy.reward_vesting.balance_of.get(user, 0)
+        expected.append((f"RewardVestingEscrow.balanceOf({user})", reward_vesting.balanceOf(addr), vesting))
+    for n, guild in enumerate(contracts["guilds"]):
+        expected += [
+            (f"get_guild_weight({n})", guild_controller.get_guild_weight(guild), economy.get_guild_weight(n)),
+            (
+                f"guild_relative_weight({n})",
+                guild_controller.guild_relative_weight(guild, timestamp),
+                economy.guild_relative_weight(n, timestamp),
+            ),
+            (f"guild {n} working_supply", guild.working_supply(), economy.working_supply[n]),
+            (
+                f"guild {n} integrate_inv_supply",
+                guild.integrate_inv_supply(guild.period()),
+                economy.integrate_inv_supply[n],
+            ),
+        ]
+        for user, addr in enumerate(users):
+            expected += [
+                (
+                    f"guild {n} working_balances({user})",
+                    guild.working_balances(addr),
+                    economy.working_balances[n][user],
+                ),
+                (
+                    f"guild {n} integrate_fraction({user})",
+                    guild.integrate_fraction(addr),
+                    economy.integrate_fraction[n][user],
+                ),
+                (
+                    f"guild {n} total_owner_bonus({user})",
+                    guild.total_owner_bonus(addr),
+                    economy.total_owner_bonus[n][user],
+                ),
+                (f"guild {n} minted({user})", minter.minted(addr, guild), economy.minted[n][user]),
+            ]
+    for name, actual, wanted in expected:
+        if actual != wanted:
+            return f"{name}: contract {actual} != simulation {wanted}"
+    return None
+
+
+def _near_boundary(now):
+    distance = now % WEEK
+    return distance < BOUNDARY_MARGIN or distance > WEEK - BOUNDARY_MARGIN
+
+
+def replay_on_chain(scenario, contracts, users, admin):
+    """
+    Replay `scenario` on contracts from `deploy` and compare them with the
+    simulation after every step. Returns a Failure or None.
+    """
+    from brownie import chain
+    from brownie.exceptions import VirtualMachineError
+
+    if scenario.params != DEFAULT_PARAMS:
+        raise ValueError("only the default parameters can be replayed")
+    economy = Economy.from_contracts(
+        contracts["token"], contracts["voting_escrow"], contracts["guild_controller"], len(users), scenario.weeks + 2
+    )
+    for step, action in enumerate(scenario_actions(scenario, economy)):
+        chain.sleep(action.dt)
+        while _near_boundary(chain.time()):
+            chain.sleep(BOUNDARY_MARGIN)
+        now = chain.time()
+
+        try:
+            tx = _send(contracts, action, users, admin, now)
+        except VirtualMachineError as exc:
+            try:
+                apply(economy, action, now, now, chain.height + 1)
+            except Revert:
+                continue
+            return Failure(scenario.seed, step, action, f"contract reverted ({exc.revert_msg}), simulation did not")
+
+        try:
+            apply(economy, action, now, tx.timestamp, tx.block_number)
+        except Revert as exc:
+            return Failure(scenario.seed, step, action, f"simulation reverted ({exc}), contract did not")
+        message = _compare(contracts, economy, users, tx.timestamp)
+        if message:
+            return Failure(scenario.seed, step, action, message)
+    return None
+
+
+def replay(seed, n_users=6, n_guilds=2, weeks=6, actions_per_week=6):
+    """Deploy a fresh system and replay a small scenario on chain"""
+    from brownie import accounts
+
+    scenario = Scenario(
+        int(seed), int(n_users), int(n_guilds), TYPE_WEIGHTS[1][:2], int(weeks), int(actions_per_week), DEFAULT_PARAMS
+    )
+    users = list(accounts[1 : scenario.n_users + 1])
+    contracts = deploy(accounts[0], users, len(scenario.type_weights))
+    failure = replay_on_chain(scenario, contracts, users, accounts[0])
+    if failure:
+        print(f"FAIL seed={failure.seed} step={failure.step} {failure.action}: {failure.message}")
+    else:
+        print(f"seed={seed}: contracts match the simulation")
+    return failure
+
+
+def main(n_users=500, weeks=104, n_guilds=10, actions_per_week=None, seeds=2, processes=None, report_json=REPORT_JSON):
+    n_users, weeks, n_guilds, seeds = int(n_users), int(weeks), int(n_guilds), int(seeds)
+    # on average every user acts about once a week
+    actions_per_week = int(actions_per_week) if actions_per_week else n_users
+    processes = int(processes) if processes else None
+    scenarios = grid(range(seeds), n_users, n_guilds, weeks, actions_per_week)
+    print(f"Running {len(scenarios)} scenarios of {n_users} users over {weeks} weeks")
+
+    records = []
+    for scenario, summary, reverts in run_sweep(scenarios, processes):
+        params = scenario.params
+        records.append(
+            {
+                "seed": scenario.seed,
+                "type_weights": [str(i) for i in scenario.type_weights],
+                **params._asdict(),
+                "reverts": reverts,
+                **{k: [str(i) for i in v] if isinstance(v, list) else str(v) for k, v in summary.items()},
+            }
+        )
+        print(
+            f"weights={[i // MULTIPLIER for i in scenario.type_weights]} tokenless={params.tokenless_production} "
+            f"cap={params.max_commission_rate} vesting={params.vesting_ratio} seed={scenario.seed}: "
+            f"integrated {summary['integrated'] / summary['available']:.2%} of emission, "
+            f"owner bonus {summary['owner_bonus'] / max(summary['integrated'], 1):.2%}, "
+            f"boost {summary['boost'] / MULTIPLIER:.3f}"
+        )
+
+    os.makedirs(os.path.dirname(report_json) or ".", exist_ok=True)
+    with open(report_json, "w") as fp:
+        json.dump({"start": START_TS, "weeks": weeks, "n_users": n_users, "results": records}, fp, indent=2)
+    print(f"Report saved to {report_json}")
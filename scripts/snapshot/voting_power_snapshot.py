@@ -0,0 +1,204 @@
+"""
+Voting power snapshot
+=====================
+Exports `VotingEscrow.balanceOfAt(addr, block)` of every holder and
+`totalSupplyAt(block)` for a snapshot block, e.g. for an Aragon vote or an
+airdrop.
+
+Holders and their user epochs are taken from the lock indexer
+(`scripts/indexer/voting_escrow_indexer.py`), which is synced up to the
+snapshot block first. Addresses whose last checkpoint before the block has no
+voting power are written as zero without a call. The remaining balances are
+read with `balanceOfAtHint`, passing the known epochs so the contract skips
+both binary searches, in JSON-RPC batches of `BATCH_SIZE` calls with at most
+`CONCURRENCY` batches in flight.
+
+Rows are streamed to CSV, or to Parquet when the output name ends in
+`.parquet` (requires `pyarrow`). A JSON summary with the total supply is
+written next to the output.
+
+Usage:
+    brownie run snapshot/voting_power_snapshot main 15000000 --network mainnet
+    brownie run snapshot/voting_power_snapshot main 15000000 snapshot.parquet --network mainnet
+"""
+
+import csv
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from brownie import VotingEscrow, web3
+
+from scripts.indexer.voting_escrow_indexer import DATABASE, DEPLOYMENTS_JSON, VotingEscrowIndexer
+
+BATCH_SIZE = 100
+CONCURRENCY = 8
+MAX_RETRIES = 3
+RETRY_DELAY = 2
+
+
+def find_block_epoch(voting_escrow, block):
+    """Same binary search as `VotingEscrow.find_block_epoch`, done with calls"""
+    _min = 0
+    _max = voting_escrow.epoch()
+    while _min < _max:
+        _mid = (_min + _max + 1) // 2
+        if voting_escrow.point_history(_mid)["blk"] <= block:
+            _min = _mid
+        else:
+            _max = _mid - 1
+    return _min
+
+
+def holder_epochs(indexer, block):
+    """
+    Return (addr, user_epoch, bias, slope) of the last checkpoint at or
+    before `block` for every address which ever locked.
+    """
+    return indexer.db.execute(
+        """
+        SELECT p.addr, p.epoch, p.bias, p.slope FROM user_points p
+        JOIN (
+            SELECT addr, MAX(epoch) AS epoch FROM user_points WHERE blk <= ? GROUP BY addr
+        ) last ON p.addr = last.addr AND p.epoch = last.epoch
+        ORDER BY p.addr
+        """,
+        (block,),
+    ).fetchall()
+
+
+class BatchCaller:
+    """
+    Sends `eth_call`s as JSON-RPC batch requests. Providers without an HTTP
+    endpoint fall back to one `eth_call` per request.
+    """
+
+    def __init__(self, to):
+        self.to = to
+        self.endpoint = getattr(web3.provider, "endpoint_uri", None)
+        self.session = requests.Session()
+
+    def call(self, calldata, targets=None):
+        """
+        Execute the encoded calls and return the results as integers.
+        `targets` gives the contract of each call, by default all go to `to`.
+        """
+        if targets is None:
+            targets = [self.to] * len(calldata)
+        if not self.endpoint:
+            return [int(web3.eth.call({"to": to, "data": data}).hex(), 16) for to, data in zip(targets, calldata)]
+
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": "eth_call", "params": [{"to": to, "data": data}, "latest"]}
+            for i, (to, data) in enumerate(zip(targets, calldata))
+        ]
+        for attempt in range(MAX_RETRIES):
+            try:
+                response = self.session.post(self.endpoint, json=payload, timeout=60)
+                response.raise_for_status()
+                break
+            except requests.RequestException:
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                time.sleep(RETRY_DELAY * (attempt + 1))
+
+        results = {}
+        for item in response.json():
+            if "error" in item:
+                raise ValueError(f"eth_call failed: {item['error']}")
+            results[item["id"]] = int(item["result"], 16)
+        return [results[i] for i in range(len(calldata))]
+
+
+class _Writer:
+    def __init__(self, output):
+        self.parquet = output.endswith(".parquet")
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            self._pa = pa
+            # balances do not fit in int64, so they are stored as decimal strings
+            self._schema = pa.schema([("address", pa.string()), ("balance", pa.string())])
+            self._writer = pq.ParquetWriter(output, self._schema)
+        else:
+            self._fp = open(output, "w", newline="")
+            self._writer = csv.writer(self._fp)
+            self._writer.writerow(["address", "balance"])
+
+    def write(self, rows):
+        if self.parquet:
+            columns = [[addr for addr, _ in rows], [str(balance) for _, balance in rows]]
+            self._writer.write_table(self._pa.Table.from_arrays(columns, schema=self._schema))
+        else:
+            self._writer.writerows(rows)
+
+    def close(self):
+        if self.parquet:
+            self._writer.close()
+        else:
+            self._fp.close()
+
+
+def export_snapshot(voting_escrow, indexer, block, output):
+    """
+    Write the voting power of every holder at `block` to `output` and
+    return the summary.
+    """
+    if indexer.last_block < block:
+        indexer.sync(block)
+
+    epoch = find_block_epoch(voting_escrow, block)
+    contract = web3.eth.contract(address=voting_escrow.address, abi=voting_escrow.abi)
+    caller = BatchCaller(voting_escrow.address)
+
+    zero_rows = []
+    calls = []
+    for addr, user_epoch, bias, slope in holder_epochs(indexer, block):
+        if bias == "0" and slope == "0":
+            zero_rows.append((addr, 0))
+        else:
+            calls.append((addr, contract.encodeABI(fn_name="balanceOfAtHint", args=[addr, block, user_epoch, epoch])))
+
+    writer = _Writer(output)
+    total_balance = 0
+    try:
+        if zero_rows:
+            writer.write(zero_rows)
+        batches = [calls[i : i + BATCH_SIZE] for i in range(0, len(calls), BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+            futures = [executor.submit(caller.call, [data for _, data in batch]) for batch in batches]
+            for i, (batch, future) in enumerate(zip(batches, futures)):
+                rows = [(addr, balance) for (addr, _), balance in zip(batch, future.result())]
+                total_balance += sum(balance for _, balance in rows)
+                writer.write(rows)
+                print(f"Batch {i + 1}/{len(batches)} done")
+    finally:
+        writer.close()
+
+    total_supply = caller.call([contract.encodeABI(fn_name="totalSupplyAtHint", args=[block, epoch])])[0]
+    return {
+        "block": block,
+        "epoch": epoch,
+        "holders": len(zero_rows) + len(calls),
+        "total_supply": str(total_supply),
+        "sum_of_balances": str(total_balance),
+    }
+
+
+def main(block, output=None, database=DATABASE):
+    block = int(block)
+    if output is None:
+        output = f"snapshot_{block}.csv"
+    with open(DEPLOYMENTS_JSON) as fp:
+        deployments = json.load(fp)
+    voting_escrow = VotingEscrow.at(deployments["VotingEscrow"])
+    indexer = VotingEscrowIndexer(database, voting_escrow)
+
+    summary = export_snapshot(voting_escrow, indexer, block, output)
+    summary_json = output.rsplit(".", 1)[0] + ".json"
+    with open(summary_json, "w") as fp:
+        json.dump(summary, fp, indent=2)
+    print(f"{summary['holders']} holders at block {block} written to {output}")
+    print(f"totalSupplyAt: {summary['total_supply']}, sum of balances: {summary['sum_of_balances']}")
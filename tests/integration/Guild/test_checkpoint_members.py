@@ -0,0 +1,86 @@
+import brownie
+import pytest
+
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+MAXTIME = 126144000
+N_BATCH = 50
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initial_setup(chain, accounts, token, gas_token, voting_escrow, guild_controller, minter, reward_vesting):
+    chain.sleep(DAY + 1)
+    token.update_mining_parameters()
+    token.set_minter(minter, {"from": accounts[0]})
+    guild_controller.set_minter(minter, {"from": accounts[0]})
+    reward_vesting.set_minter(minter, {"from": accounts[0]})
+
+    for i in range(1, 5):
+        amount = (100000 + i * 10000) * 10 ** 18
+        token.transfer(accounts[i], amount, {"from": accounts[0]})
+        token.approve(voting_escrow, amount, {"from": accounts[i]})
+        lock_time = MAXTIME if i == 1 else YEAR + i * 10 * WEEK
+        voting_escrow.create_lock(amount, chain.time() + lock_time, {"from": accounts[i]})
+
+    guild_controller.add_type("Gas MOH", "GASMOH", gas_token, 10 ** 18)
+    guild_controller.create_guild(accounts[1], 0, 10, {"from": accounts[0]})
+
+
+@pytest.fixture(scope="module")
+def guild(accounts, guild_controller, Guild):
+    guild = Guild.at(guild_controller.guild_owner_list(accounts[1]))
+    guild.user_checkpoint(accounts[1], {"from": accounts[1]})
+    for i in range(2, 5):
+        guild.join_guild({"from": accounts[i]})
+    yield guild
+
+
+def _batch(addrs):
+    return addrs + [ZERO_ADDRESS] * (N_BATCH - len(addrs))
+
+
+def test_checkpoint_members(chain, accounts, voting_escrow, guild):
+    members = accounts[1:5]
+    chain.sleep(10 * WEEK)
+    period = guild.period()
+    tx = guild.checkpoint_members(_batch(members + [accounts[5]]), {"from": accounts[5]})
+
+    # the guild integral is checkpointed once for the whole batch
+    assert guild.period() == period + 1
+    for addr in members:
+        assert guild.integrate_checkpoint_of(addr) == tx.timestamp
+        assert guild.integrate_inv_supply_of(addr) == guild.integrate_inv_supply(period + 1)
+        assert guild.integrate_fraction(addr) > 0
+        # no gas is burned, so working balances are the tokenless production
+        assert guild.working_balances(addr) == voting_escrow.balanceOf(addr, tx.timestamp) * 40 // 100
+    assert guild.working_supply() == sum(guild.working_balances(addr) for addr in members)
+
+    # non-members are skipped
+    assert guild.integrate_checkpoint_of(accounts[5]) == 0
+    assert guild.working_balances(accounts[5]) == 0
+
+
+def test_list_ends_at_zero_address(chain, accounts, guild):
+    chain.sleep(WEEK)
+    tx = guild.checkpoint_members(_batch([accounts[2], ZERO_ADDRESS, accounts[3]]), {"from": accounts[5]})
+
+    assert guild.integrate_checkpoint_of(accounts[2]) == tx.timestamp
+    assert guild.integrate_checkpoint_of(accounts[3]) < tx.timestamp
+
+
+def test_lock_ending_this_week(chain, accounts, voting_escrow, guild):
+    members = accounts[1:5]
+    lock_end = voting_escrow.locked__end(accounts[2])
+    chain.sleep(lock_end - chain.time() - DAY)
+    chain.mine()
+    with brownie.reverts("Your token lock expires too soon"):
+        guild.user_checkpoint(accounts[2], {"from": accounts[2]})
+
+    # the member's votes are not refreshed, the rest of the batch goes through
+    tx = guild.checkpoint_members(_batch(members), {"from": accounts[5]})
+    for addr in members:
+        assert guild.integrate_checkpoint_of(addr) == tx.timestamp
+        assert guild.working_balances(addr) == voting_escrow.balanceOf(addr, tx.timestamp) * 40 // 100
+    assert guild.working_balances(accounts[2]) > 0
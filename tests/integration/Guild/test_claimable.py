@@ -0,0 +1,70 @@
+import pytest
+
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+MAXTIME = 126144000
+N_BATCH = 50
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initial_setup(chain, accounts, token, gas_token, voting_escrow, guild_controller, minter, reward_vesting):
+    chain.sleep(DAY + 1)
+    token.update_mining_parameters()
+    token.set_minter(minter, {"from": accounts[0]})
+    guild_controller.set_minter(minter, {"from": accounts[0]})
+    reward_vesting.set_minter(minter, {"from": accounts[0]})
+
+    for i in range(1, 5):
+        amount = (100000 + i * 10000) * 10 ** 18
+        token.transfer(accounts[i], amount, {"from": accounts[0]})
+        token.approve(voting_escrow, amount, {"from": accounts[i]})
+        lock_time = MAXTIME if i == 1 else 2 * YEAR + i * 10 * WEEK
+        voting_escrow.create_lock(amount, chain.time() + lock_time, {"from": accounts[i]})
+
+    guild_controller.add_type("Gas MOH", "GASMOH", gas_token, 10 ** 18)
+    guild_controller.create_guild(accounts[1], 0, 10, {"from": accounts[0]})
+
+
+@pytest.fixture(scope="module")
+def guild(accounts, guild_controller, Guild):
+    guild = Guild.at(guild_controller.guild_owner_list(accounts[1]))
+    guild.user_checkpoint(accounts[1], {"from": accounts[1]})
+    for i in range(2, 5):
+        guild.join_guild({"from": accounts[i]})
+    yield guild
+
+
+def _check_claimable(guild, addrs):
+    many = guild.claimable_many(addrs + [ZERO_ADDRESS] * (N_BATCH - len(addrs)))
+    for i, addr in enumerate(addrs):
+        expected = guild.claimable_tokens.call(addr)
+        assert guild.claimable(addr) == expected
+        assert many[i] == expected
+    assert list(many[len(addrs):]) == [0] * (N_BATCH - len(addrs))
+
+
+def test_claimable(chain, accounts, guild):
+    chain.sleep(3 * WEEK)
+    chain.mine()
+    _check_claimable(guild, accounts[1:6])
+    assert guild.claimable(accounts[1]) > 0
+    assert guild.claimable(accounts[5]) == 0
+
+
+def test_claimable_after_mint(chain, accounts, minter, reward_vesting, guild):
+    chain.sleep(5 * WEEK)
+    minter.mint({"from": accounts[2]})
+    chain.sleep(10 * WEEK)
+    chain.mine()
+
+    assert reward_vesting.get_claimable_tokens(accounts[2]) > 0
+    _check_claimable(guild, accounts[1:5])
+
+
+def test_claimable_across_epoch_without_checkpoint(chain, accounts, guild):
+    # nobody checkpoints the guild or the controller for over a year
+    chain.sleep(60 * WEEK)
+    chain.mine()
+    _check_claimable(guild, accounts[1:5])
@@ -0,0 +1,47 @@
+import pytest
+
+DAY = 86400
+WEEK = 7 * DAY
+MAXTIME = 126144000
+N_BATCH = 50
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initial_setup(chain, accounts, token, gas_token, voting_escrow, guild_controller, minter, reward_vesting):
+    token.set_minter(minter, {"from": accounts[0]})
+    guild_controller.set_minter(minter, {"from": accounts[0]})
+    reward_vesting.set_minter(minter, {"from": accounts[0]})
+
+    for i in range(1, 3):
+        amount = (100000 + i * 10000) * 10 ** 18
+        token.transfer(accounts[i], amount, {"from": accounts[0]})
+        token.approve(voting_escrow, amount, {"from": accounts[i]})
+        voting_escrow.create_lock(amount, chain.time() + MAXTIME, {"from": accounts[i]})
+
+    # the guild is created before the first mining epoch starts
+    guild_controller.add_type("Gas MOH", "GASMOH", gas_token, 10 ** 18)
+    guild_controller.create_guild(accounts[1], 0, 10, {"from": accounts[0]})
+
+
+@pytest.fixture(scope="module")
+def guild(accounts, guild_controller, token, Guild):
+    guild = Guild.at(guild_controller.guild_owner_list(accounts[1]))
+    guild.user_checkpoint(accounts[1], {"from": accounts[1]})
+    guild.join_guild({"from": accounts[2]})
+    assert token.rate() == 0
+    yield guild
+
+
+def test_claimable_projects_initial_rate(chain, accounts, token, guild):
+    chain.sleep(WEEK)
+    chain.mine()
+    assert token.rate() == 0
+
+    addrs = accounts[1:3]
+    many = guild.claimable_many(addrs + [ZERO_ADDRESS] * (N_BATCH - len(addrs)))
+    for i, addr in enumerate(addrs):
+        expected = guild.claimable_tokens.call(addr)
+        assert expected > 0
+        assert guild.claimable(addr) == expected
+        assert many[i] == expected
@@ -0,0 +1,48 @@
+import pytest
+
+DAY = 86400
+WEEK = 7 * DAY
+MAXTIME = 126144000
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initial_setup(chain, accounts, token, gas_token, voting_escrow, guild_controller, minter, reward_vesting):
+    chain.sleep(DAY + 1)
+    token.update_mining_parameters()
+    token.set_minter(minter, {"from": accounts[0]})
+    guild_controller.set_minter(minter, {"from": accounts[0]})
+    reward_vesting.set_minter(minter, {"from": accounts[0]})
+
+    amount = 200000 * 10 ** 18
+    token.transfer(accounts[1], amount, {"from": accounts[0]})
+    token.approve(voting_escrow, amount, {"from": accounts[1]})
+    voting_escrow.create_lock(amount, chain.time() + MAXTIME, {"from": accounts[1]})
+    guild_controller.add_type("Gas MOH", "GASMOH", gas_token, 10 ** 18)
+    guild_controller.create_guild(accounts[1], 0, 10, {"from": accounts[0]})
+
+
+@pytest.fixture(scope="module")
+def guild(accounts, guild_controller, Guild):
+    yield Guild.at(guild_controller.guild_owner_list(accounts[1]))
+
+
+def test_rate_kept_over_skipped_weeks(chain, accounts, guild):
+    start = guild.last_change_rate()
+    chain.sleep(5 * WEEK)
+    guild.set_commission_rate(True, {"from": accounts[1]})
+    next_time = guild.last_change_rate()
+
+    assert guild.commission_rate_epoch() == 2
+    assert guild.commission_rate(start - WEEK) == 0
+    for t in range(start, next_time, WEEK):
+        assert guild.commission_rate(t) == 10
+    assert guild.commission_rate(next_time) == 11
+    assert guild.commission_rate(next_time + 50 * WEEK) == 11
+
+
+def test_checkpoint_does_not_write_rates(chain, accounts, guild):
+    chain.sleep(20 * WEEK)
+    guild.user_checkpoint(accounts[1], {"from": accounts[1]})
+
+    assert guild.commission_rate_epoch() == 1
+    assert guild.commission_rate(chain.time() // WEEK * WEEK) == 10
@@ -0,0 +1,75 @@
+import brownie
+import pytest
+
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+MAXTIME = 126144000
+N_BATCH = 50
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initial_setup(chain, accounts, token, gas_token, voting_escrow, guild_controller, minter, reward_vesting):
+    chain.sleep(DAY + 1)
+    token.update_mining_parameters()
+    token.set_minter(minter, {"from": accounts[0]})
+    guild_controller.set_minter(minter, {"from": accounts[0]})
+    reward_vesting.set_minter(minter, {"from": accounts[0]})
+
+    for i in range(1, 5):
+        amount = (100000 + i * 10000) * 10 ** 18
+        token.transfer(accounts[i], amount, {"from": accounts[0]})
+        token.approve(voting_escrow, amount, {"from": accounts[i]})
+        # accounts 2 and 4 have short locks which expire during the tests
+        lock_time = YEAR + 2 * WEEK if i % 2 == 0 else MAXTIME
+        voting_escrow.create_lock(amount, chain.time() + lock_time, {"from": accounts[i]})
+
+    guild_controller.add_type("Gas MOH", "GASMOH", gas_token, 10 ** 18)
+    guild_controller.create_guild(accounts[1], 0, 10, {"from": accounts[0]})
+
+
+@pytest.fixture(scope="module")
+def guild(accounts, guild_controller, Guild):
+    guild = Guild.at(guild_controller.guild_owner_list(accounts[1]))
+    guild.user_checkpoint(accounts[1], {"from": accounts[1]})
+    for i in range(2, 5):
+        guild.join_guild({"from": accounts[i]})
+    yield guild
+
+
+def _batch(addrs):
+    return addrs + [ZERO_ADDRESS] * (N_BATCH - len(addrs))
+
+
+def test_kick_many(chain, accounts, voting_escrow, guild):
+    chain.sleep(YEAR // 2)
+    guild.user_checkpoint(accounts[1], {"from": accounts[1]})
+    chain.sleep(YEAR // 2 + 3 * WEEK)
+    chain.mine()
+    addrs = accounts[2:6]
+    working_balance = guild.working_balances(accounts[3])
+    assert voting_escrow.balanceOf(accounts[2]) == voting_escrow.balanceOf(accounts[4]) == 0
+
+    assert guild.kick_many.call(_batch(addrs)) == [True, False, True, False] + [False] * (N_BATCH - 4)
+    tx = guild.kick_many(_batch(addrs), {"from": accounts[5]})
+
+    for addr in (accounts[2], accounts[4]):
+        assert guild.working_balances(addr) == 0
+        assert guild.integrate_checkpoint_of(addr) == tx.timestamp
+        assert guild.integrate_fraction(addr) > 0
+    # accounts 3 still has enough voting power and account 5 is not a member
+    assert guild.working_balances(accounts[3]) == working_balance
+    assert guild.integrate_checkpoint_of(accounts[3]) < tx.timestamp
+    assert guild.working_supply() == guild.working_balances(accounts[1]) + working_balance
+    with brownie.reverts("dev: kick not needed"):
+        guild.kick(accounts[3], {"from": accounts[5]})
+
+
+def test_kick_many_nothing_to_kick(chain, accounts, guild):
+    chain.sleep(WEEK)
+    period = guild.period()
+    kicked = guild.kick_many(_batch(accounts[1:6]), {"from": accounts[5]}).return_value
+
+    assert not any(kicked)
+    assert guild.period() == period
@@ -0,0 +1,83 @@
+import pytest
+
+from scripts.indexer.guild_roster_indexer import GuildRosterIndexer
+from scripts.keeper.kick_scanner import kick_batches, scan
+
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+MAXTIME = 126144000
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initial_setup(chain, accounts, token, gas_token, voting_escrow, guild_controller, minter, reward_vesting):
+    chain.sleep(DAY + 1)
+    token.update_mining_parameters()
+    token.set_minter(minter, {"from": accounts[0]})
+    guild_controller.set_minter(minter, {"from": accounts[0]})
+    reward_vesting.set_minter(minter, {"from": accounts[0]})
+
+    for i in range(1, 7):
+        amount = (100000 + i * 10000) * 10 ** 18
+        token.transfer(accounts[i], amount, {"from": accounts[0]})
+        token.approve(voting_escrow, amount, {"from": accounts[i]})
+        # accounts 2, 4 and 6 have short locks which expire during the tests
+        lock_time = YEAR + 2 * WEEK if i % 2 == 0 else MAXTIME
+        voting_escrow.create_lock(amount, chain.time() + lock_time, {"from": accounts[i]})
+
+    guild_controller.add_type("Gas MOH", "GASMOH", gas_token, 10 ** 18)
+    guild_controller.create_guild(accounts[1], 0, 10, {"from": accounts[0]})
+    guild_controller.create_guild(accounts[5], 0, 10, {"from": accounts[0]})
+
+
+@pytest.fixture(scope="module")
+def guilds(accounts, guild_controller, Guild):
+    guilds = [Guild.at(guild_controller.guild_owner_list(accounts[i])) for i in (1, 5)]
+    for i in (1, 5):
+        guilds[i // 5].user_checkpoint(accounts[i], {"from": accounts[i]})
+    for i in (2, 3, 4):
+        guilds[0].join_guild({"from": accounts[i]})
+    guilds[1].join_guild({"from": accounts[6]})
+    yield guilds
+
+
+def test_scan_finds_expired_locks(chain, accounts, voting_escrow, guild_controller, guilds, tmp_path):
+    chain.sleep(YEAR // 2)
+    guilds[0].user_checkpoint(accounts[1], {"from": accounts[1]})
+    chain.sleep(YEAR // 2 + 3 * WEEK)
+    chain.mine()
+    indexer = GuildRosterIndexer(tmp_path / "roster.sqlite", guild_controller)
+    indexer.sync(chain.height)
+
+    candidates = scan(voting_escrow, guild_controller, indexer, chain[-1].timestamp)
+
+    by_address = {guild.address: guild for guild in guilds}
+    expected = {
+        (guilds[0].address, accounts[2].address),
+        (guilds[0].address, accounts[4].address),
+        (guilds[1].address, accounts[6].address),
+    }
+    assert {(row["guild"], row["address"]) for row in candidates} == expected
+    reductions = [row["reduction"] for row in candidates]
+    assert reductions == sorted(reductions, reverse=True)
+    for row in candidates:
+        assert row["reason"] == "lock expired"
+        assert row["working_balance"] == by_address[row["guild"]].working_balances(row["address"])
+        assert row["new_working_balance"] == 0
+        assert row["reduction"] == row["working_balance"]
+
+    supplies = {guild.address: guild.working_supply() for guild in guilds}
+    for guild, batch in kick_batches(candidates):
+        by_address[guild].kick_many(batch, {"from": accounts[7]})
+    for guild in guilds:
+        reduction = sum(row["reduction"] for row in candidates if row["guild"] == guild)
+        assert guild.working_supply() == supplies[guild.address] - reduction
+
+
+def test_scan_nothing_to_kick(chain, voting_escrow, guild_controller, guilds, tmp_path):
+    chain.sleep(WEEK)
+    chain.mine()
+    indexer = GuildRosterIndexer(tmp_path / "roster.sqlite", guild_controller)
+    indexer.sync(chain.height)
+
+    assert scan(voting_escrow, guild_controller, indexer, chain[-1].timestamp) == []
@@ -0,0 +1,97 @@
+import pytest
+
+DAY = 86400
+WEEK = 7 * DAY
+MAXTIME = 126144000
+N_WEEKS = 53
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initial_setup(chain, accounts, token, gas_token, voting_escrow, guild_controller, minter, reward_vesting):
+    chain.sleep(DAY + 1)
+    token.update_mining_parameters()
+    token.set_minter(minter, {"from": accounts[0]})
+    guild_controller.set_minter(minter, {"from": accounts[0]})
+    reward_vesting.set_minter(minter, {"from": accounts[0]})
+
+    for i in range(1, 5):
+        amount = (100000 + i * 10000) * 10 ** 18
+        token.transfer(accounts[i], amount, {"from": accounts[0]})
+        token.approve(voting_escrow, amount, {"from": accounts[i]})
+        voting_escrow.create_lock(amount, chain.time() + MAXTIME, {"from": accounts[i]})
+
+    guild_controller.add_type("Gas MOH", "GASMOH", gas_token, 10 ** 18)
+    guild_controller.create_guild(accounts[1], 0, 10, {"from": accounts[0]})
+
+
+@pytest.fixture(scope="module")
+def guild(accounts, guild_controller, Guild):
+    guild = Guild.at(guild_controller.guild_owner_list(accounts[1]))
+    guild.user_checkpoint(accounts[1], {"from": accounts[1]})
+    yield guild
+
+
+def test_weekly_history(chain, accounts, guild):
+    start = guild.period_timestamp(0)
+    # working supply in effect at each week boundary
+    supplies = {}
+    # joins are spread out so that some checkpoints cross several weeks
+    for i, weeks in zip(range(2, 5), (1, 3, 2)):
+        supply = guild.working_supply()
+        t = chain.time()
+        chain.sleep(weeks * WEEK)
+        guild.join_guild({"from": accounts[i]})
+        for week in range(t // WEEK + 1, chain.time() // WEEK + 1):
+            supplies[week * WEEK] = supply
+
+    history = guild.get_working_supply_range(start, N_WEEKS)
+    t = start // WEEK * WEEK
+    last_week = chain.time() // WEEK * WEEK
+    n_weeks = (last_week - t) // WEEK + 1
+    assert [row["working_supply"] for row in history[:n_weeks]] == [supplies.get(t + k * WEEK, 0) for k in range(n_weeks)]
+    assert [row["integrate_inv_supply"] for row in history[:n_weeks]] == [
+        guild.integrate_inv_supply_week(t + k * WEEK) for k in range(n_weeks)
+    ]
+    assert list(history[n_weeks:]) == [(0, 0)] * (N_WEEKS - n_weeks)
+
+    # each boundary integral lies between the integrals of the periods around it
+    for k in range(guild.period()):
+        t0 = guild.period_timestamp(k)
+        t1 = guild.period_timestamp(k + 1)
+        for week in range(t0 // WEEK + 1, t1 // WEEK + 1):
+            integral = guild.integrate_inv_supply_week(week * WEEK)
+            assert guild.integrate_inv_supply(k) <= integral <= guild.integrate_inv_supply(k + 1)
+    assert guild.integrate_inv_supply_week(last_week) > 0
+
+
+def test_integrals_unchanged(chain, accounts, guild):
+    chain.sleep(2 * WEEK)
+    guild.join_guild({"from": accounts[2]})
+    chain.sleep(3 * WEEK + DAY)
+    chain.mine()
+
+    # recording the week boundaries does not change what the checkpoint integrates
+    for acct in accounts[1:3]:
+        assert guild.claimable_tokens.call(acct) == guild.claimable(acct)
+
+    guild.user_checkpoint(accounts[2], {"from": accounts[2]})
+    period = guild.period()
+    t = guild.period_timestamp(period) // WEEK * WEEK
+    assert guild.integrate_inv_supply_week(t) < guild.integrate_inv_supply(period)
+
+
+def test_dormant_checkpoint_batches_weights(chain, accounts, guild, guild_controller):
+    # recording the weeks keeps the weights fetched `N_WEEKS` at a time
+    chain.sleep(100 * WEEK)
+    period_time = guild.period_timestamp(guild.period())
+    tx = guild.user_checkpoint(accounts[1], {"from": accounts[1]})
+
+    n_weeks = tx.timestamp // WEEK - period_time // WEEK + 1
+    calls = [
+        call
+        for call in tx.subcalls
+        if call["to"] == guild_controller and call.get("function", "").startswith("guild_relative_weight_range")
+    ]
+    assert len(calls) == -(-n_weeks // N_WEEKS) == 2
+    t = period_time // WEEK * WEEK
+    assert all(guild.integrate_inv_supply_week(t + k * WEEK) > 0 for k in range(2, n_weeks))
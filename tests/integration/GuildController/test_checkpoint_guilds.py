@@ -0,0 +1,73 @@
+import pytest
+from brownie import ZERO_ADDRESS
+from brownie_tokens import ERC20
+
+DAY = 86400
+WEEK = 7 * DAY
+MAXTIME = 126144000
+N_BATCH = 50
+N_GUILDS = 4
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initial_setup(chain, accounts, token, voting_escrow, guild_controller, minter, reward_vesting):
+    chain.sleep(DAY + 1)
+    token.update_mining_parameters()
+    token.set_minter(minter, {"from": accounts[0]})
+    guild_controller.set_minter(minter, {"from": accounts[0]})
+    reward_vesting.set_minter(minter, {"from": accounts[0]})
+
+    for i in range(2):
+        gas_token = ERC20(f"Coin {i}", f"MOH{i}", 18)
+        guild_controller.add_type(f"GAS Coin {i}", f"GASMOH{i}", gas_token, (i + 1) * 10 ** 18)
+
+    for i in range(1, N_GUILDS + 1):
+        amount = (100000 + i * 10000) * 10 ** 18
+        token.transfer(accounts[i], amount, {"from": accounts[0]})
+        token.approve(voting_escrow, amount, {"from": accounts[i]})
+        voting_escrow.create_lock(amount, chain.time() + MAXTIME, {"from": accounts[i]})
+        guild_controller.create_guild(accounts[i], i % 2, i, {"from": accounts[0]})
+    chain.sleep(3 * WEEK)
+
+
+def _batch(addrs):
+    return list(addrs) + [ZERO_ADDRESS] * (N_BATCH - len(addrs))
+
+
+def _state(guild_controller, guilds):
+    next_time = (guild_controller.time_total() // WEEK) * WEEK
+    return (
+        guild_controller.time_total(),
+        guild_controller.points_total(next_time),
+        [guild_controller.time_sum(i) for i in range(2)],
+        [guild_controller.time_weight(guild) for guild in guilds],
+        [guild_controller.points_weight(guild, next_time) for guild in guilds],
+    )
+
+
+def test_checkpoint_guilds_matches_individual(chain, accounts, guild_controller):
+    guilds = [guild_controller.guilds(i) for i in range(N_GUILDS)]
+
+    chain.snapshot()
+    for guild in guilds:
+        guild_controller.checkpoint_guild(guild, {"from": accounts[0]})
+    guild_controller.checkpoint({"from": accounts[0]})
+    expected = _state(guild_controller, guilds)
+    chain.revert()
+
+    guild_controller.checkpoint_guilds(_batch(guilds), {"from": accounts[0]})
+    assert _state(guild_controller, guilds) == expected
+
+
+def test_checkpoint_guilds_stops_at_zero_address(chain, accounts, guild_controller):
+    guilds = [guild_controller.guilds(i) for i in range(N_GUILDS)]
+    time_weight = guild_controller.time_weight(guilds[-1])
+
+    guild_controller.checkpoint_guilds(_batch(guilds[:2] + [ZERO_ADDRESS] + guilds[2:]), {"from": accounts[0]})
+
+    assert guild_controller.time_weight(guilds[0]) > time_weight
+    assert guild_controller.time_weight(guilds[1]) > time_weight
+    assert guild_controller.time_weight(guilds[2]) == time_weight
+    assert guild_controller.time_weight(guilds[3]) == time_weight
+    for i in range(2):
+        assert guild_controller.time_sum(i) == guild_controller.time_total()
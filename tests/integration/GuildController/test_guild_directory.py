@@ -0,0 +1,64 @@
+import pytest
+from brownie import ZERO_ADDRESS
+from brownie_tokens import ERC20
+
+DAY = 86400
+WEEK = 7 * DAY
+MAXTIME = 126144000
+N_GUILDS = 4
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initial_setup(chain, accounts, token, voting_escrow, guild_controller, minter, reward_vesting):
+    chain.sleep(DAY + 1)
+    token.update_mining_parameters()
+    token.set_minter(minter, {"from": accounts[0]})
+    guild_controller.set_minter(minter, {"from": accounts[0]})
+    reward_vesting.set_minter(minter, {"from": accounts[0]})
+
+    for i in range(2):
+        gas_token = ERC20(f"Coin {i}", f"MOH{i}", 18)
+        guild_controller.add_type(f"GAS Coin {i}", f"GASMOH{i}", gas_token, 10 ** 18)
+
+    for i in range(1, N_GUILDS + 1):
+        amount = (100000 + i * 10000) * 10 ** 18
+        token.transfer(accounts[i], amount, {"from": accounts[0]})
+        token.approve(voting_escrow, amount, {"from": accounts[i]})
+        voting_escrow.create_lock(amount, chain.time() + MAXTIME, {"from": accounts[i]})
+        guild_controller.create_guild(accounts[i], i % 2, i, {"from": accounts[0]})
+    chain.sleep(WEEK)
+    guild_controller.checkpoint({"from": accounts[0]})
+
+
+def test_get_guilds(accounts, guild_controller, Guild):
+    page = guild_controller.get_guilds(0, N_GUILDS)
+
+    for i, info in enumerate(page[:N_GUILDS]):
+        guild = Guild.at(guild_controller.guilds(i))
+        assert info["addr"] == guild
+        assert info["guild_type"] == guild_controller.guild_types(guild)
+        assert info["owner"] == accounts[i + 1]
+        assert info["weight"] == guild_controller.get_guild_weight(guild)
+        assert info["relative_weight"] == guild_controller.guild_relative_weight(guild)
+        assert info["commission_rate"] == i + 1
+        assert info["is_paused"] is False
+    assert page[N_GUILDS]["addr"] == ZERO_ADDRESS
+
+
+def test_get_guilds_pagination(guild_controller):
+    assert [i["addr"] for i in guild_controller.get_guilds(1, 2)[:3]] == [
+        guild_controller.guilds(1),
+        guild_controller.guilds(2),
+        ZERO_ADDRESS,
+    ]
+    assert guild_controller.get_guilds(N_GUILDS, 10)[0]["addr"] == ZERO_ADDRESS
+
+
+def test_get_guilds_reflects_changes(accounts, guild_controller, Guild):
+    guild = Guild.at(guild_controller.guilds(0))
+    guild.set_commission_rate(True, {"from": accounts[1]})
+    guild_controller.toggle_pause(guild, {"from": accounts[0]})
+
+    info = guild_controller.get_guilds(0, 1)[0]
+    assert info["commission_rate"] == 2
+    assert info["is_paused"] is True
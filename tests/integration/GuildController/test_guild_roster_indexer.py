@@ -0,0 +1,84 @@
+import pytest
+from brownie import ZERO_ADDRESS
+from brownie_tokens import ERC20
+
+from scripts.indexer.guild_roster_indexer import GuildRosterIndexer
+
+DAY = 86400
+WEEK = 7 * DAY
+MAXTIME = 126144000
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initial_setup(chain, accounts, token, voting_escrow, guild_controller, minter, reward_vesting):
+    chain.sleep(DAY + 1)
+    token.update_mining_parameters()
+    token.set_minter(minter, {"from": accounts[0]})
+    guild_controller.set_minter(minter, {"from": accounts[0]})
+    reward_vesting.set_minter(minter, {"from": accounts[0]})
+
+    gas_token = ERC20("Coin", "MOH", 18)
+    guild_controller.add_type("GAS Coin", "GASMOH", gas_token, 10 ** 18)
+    for i in range(1, 7):
+        amount = 200000 * 10 ** 18
+        token.transfer(accounts[i], amount, {"from": accounts[0]})
+        token.approve(voting_escrow, amount, {"from": accounts[i]})
+        voting_escrow.create_lock(amount, chain.time() + MAXTIME, {"from": accounts[i]})
+
+
+@pytest.fixture(scope="module")
+def guilds(accounts, guild_controller, Guild):
+    guilds = []
+    for i in range(1, 3):
+        guild_controller.create_guild(accounts[i], 0, 10, {"from": accounts[0]})
+        guilds.append(Guild.at(guild_controller.guild_owner_list(accounts[i])))
+    yield guilds
+
+
+def _assert_matches(indexer, guild_controller, guilds, users):
+    for guild in guilds:
+        members = [acct for acct in users if guild_controller.global_member_list(acct) == guild]
+        roster = indexer.roster(guild)
+        assert sorted(addr for addr, _ in roster) == sorted(members)
+        assert [joined for addr, joined in roster] == [guild_controller.last_user_join(addr, guild) for addr, _ in roster]
+        assert indexer.member_count(guild) == len(members)
+        assert indexer.owner(guild) == guild.owner()
+    for acct in users:
+        assert indexer.guild_of(acct) == guild_controller.global_member_list(acct)
+
+
+def test_roster_matches_contract(chain, accounts, guild_controller, guilds, tmp_path):
+    for i in range(3, 7):
+        guilds[i % 2].join_guild({"from": accounts[i]})
+
+    indexer = GuildRosterIndexer(tmp_path / "roster.sqlite", guild_controller)
+    indexer.sync(chain.height)
+
+    _assert_matches(indexer, guild_controller, guilds, accounts[1:7])
+    assert indexer.guilds() == guilds
+    assert indexer.churn(guilds[0]) == (3, 0)
+
+
+def test_roster_resumes(chain, accounts, guild_controller, guilds, tmp_path):
+    db_path = tmp_path / "roster.sqlite"
+    for i in range(3, 7):
+        guilds[i % 2].join_guild({"from": accounts[i]})
+    GuildRosterIndexer(db_path, guild_controller).sync(chain.height)
+    first_sync = chain.height
+
+    chain.sleep(2 * WEEK)
+    guilds[0].leave_guild({"from": accounts[4]})
+    guild_controller.transfer_guild_ownership(accounts[6], {"from": accounts[1]})
+    guilds[1].join_guild({"from": accounts[4]})
+
+    indexer = GuildRosterIndexer(db_path, guild_controller)
+    assert indexer.last_block == first_sync
+    indexer.sync(chain.height)
+
+    _assert_matches(indexer, guild_controller, guilds, accounts[1:7])
+    assert indexer.owner(guilds[0]) == accounts[6]
+    assert indexer.churn(guilds[0]) == (3, 1)
+    assert indexer.churn(guilds[1]) == (4, 0)
+    assert indexer.churn(guilds[0], chain.time()) == (0, 1)
+    assert indexer.churn(guilds[1], chain.time()) == (1, 0)
+    assert indexer.guild_of(accounts[9]) == ZERO_ADDRESS
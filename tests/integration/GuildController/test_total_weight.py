@@ -0,0 +1,128 @@
+import random
+
+import pytest
+from brownie_tokens import ERC20
+
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+MAXTIME = 126144000
+N_TYPES = 3
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initial_setup(chain, accounts, token, voting_escrow, guild_controller, minter, reward_vesting):
+    random.seed(7)
+    chain.sleep(DAY + 1)
+    token.update_mining_parameters()
+    token.set_minter(minter, {"from": accounts[0]})
+    guild_controller.set_minter(minter, {"from": accounts[0]})
+    reward_vesting.set_minter(minter, {"from": accounts[0]})
+
+    for i in range(1, 10):
+        amount = random.randint(110000, 300000) * 10 ** 18
+        token.transfer(accounts[i], amount, {"from": accounts[0]})
+        token.approve(voting_escrow, amount, {"from": accounts[i]})
+        lock_time = MAXTIME if i <= N_TYPES else YEAR + random.randint(0, 3 * YEAR)
+        voting_escrow.create_lock(amount, chain.time() + lock_time, {"from": accounts[i]})
+
+    for i in range(N_TYPES):
+        gas_token = ERC20(f"Coin {i}", f"MOH{i}", 18)
+        guild_controller.add_type(f"GAS Coin {i}", f"GASMOH{i}", gas_token, (i + 1) * 10 ** 18)
+
+
+@pytest.fixture(scope="module")
+def guilds(accounts, guild_controller, Guild):
+    guilds = []
+    for i in range(N_TYPES):
+        guild_controller.create_guild(accounts[i + 1], i, 10, {"from": accounts[0]})
+        guilds.append(Guild.at(guild_controller.guild_owner_list(accounts[i + 1])))
+    yield guilds
+
+
+def _weighted_sum(guild_controller, t):
+    return sum(
+        guild_controller.points_type_weight(i, t) * guild_controller.points_sum(i, t)["bias"] for i in range(N_TYPES)
+    )
+
+
+def test_total_follows_votes(chain, accounts, guild_controller, guilds):
+    for i in range(4, 10):
+        guilds[i % N_TYPES].join_guild({"from": accounts[i]})
+        chain.sleep(2 * DAY)
+
+    for _ in range(10):
+        chain.sleep(3 * WEEK)
+        guild_controller.checkpoint({"from": accounts[0]})
+        t = guild_controller.time_total()
+        assert guild_controller.get_total_weight() == _weighted_sum(guild_controller, t)
+        assert guild_controller.points_total(t - WEEK) == _weighted_sum(guild_controller, t - WEEK)
+
+
+def test_total_follows_leave_and_type_weight(chain, accounts, guild_controller, guilds):
+    for i in range(4, 10):
+        guilds[i % N_TYPES].join_guild({"from": accounts[i]})
+    chain.sleep(2 * WEEK)
+
+    guilds[1].leave_guild({"from": accounts[4]})
+    guild_controller.change_type_weight(0, 5 * 10 ** 18, {"from": accounts[0]})
+    guild_controller.change_type_weight(2, 10 ** 17, {"from": accounts[0]})
+
+    for _ in range(60):
+        chain.sleep(2 * WEEK)
+        guild_controller.checkpoint({"from": accounts[0]})
+        t = guild_controller.time_total()
+        assert guild_controller.get_total_weight() == _weighted_sum(guild_controller, t)
+
+
+def test_relative_weights_sum_to_one(chain, accounts, guild_controller, guilds):
+    for i in range(4, 10):
+        guilds[i % N_TYPES].join_guild({"from": accounts[i]})
+    guild_controller.change_type_weight(1, 3 * 10 ** 18, {"from": accounts[0]})
+    chain.sleep(5 * WEEK)
+
+    for guild in guilds:
+        guild_controller.checkpoint_guild(guild, {"from": accounts[0]})
+    t = chain.time() // WEEK * WEEK
+    total = sum(guild_controller.guild_relative_weight(guild, t) for guild in guilds)
+    assert 10 ** 18 - N_TYPES <= total <= 10 ** 18
+
+
+def test_total_follows_guild_weight_change(chain, accounts, guild_controller, guilds):
+    for i in range(4, 10):
+        guilds[i % N_TYPES].join_guild({"from": accounts[i]})
+    chain.sleep(2 * WEEK)
+
+    guild_controller.change_guild_weight(guilds[0], 2 * guild_controller.get_guild_weight(guilds[0]), {"from": accounts[0]})
+    # the sum of type 1 drops to zero while the slope changes of its votes are still due
+    guild_controller.change_guild_weight(guilds[1], 0, {"from": accounts[0]})
+    t = guild_controller.time_total()
+    assert guild_controller.points_total(t) == _weighted_sum(guild_controller, t)
+
+    for _ in range(60):
+        chain.sleep(2 * WEEK)
+        guild_controller.checkpoint({"from": accounts[0]})
+        t = guild_controller.time_total()
+        assert guild_controller.get_total_weight() == _weighted_sum(guild_controller, t)
+
+
+def test_lowered_guild_weight_keeps_relative_weights(chain, accounts, guild_controller, guilds):
+    for i in range(4, 10):
+        guilds[i % 2].join_guild({"from": accounts[i]})
+    chain.sleep(2 * WEEK)
+
+    # type 0 decays to zero long before the slope changes of its votes are due
+    guild_controller.change_guild_weight(guilds[0], guild_controller.get_guild_weight(guilds[0]) // 50, {"from": accounts[0]})
+    start = guild_controller.time_total()
+    ranges = [guild_controller.guild_relative_weight_range(guild, start, 53) for guild in guilds]
+
+    for k in range(53):
+        chain.sleep(WEEK)
+        for guild in guilds:
+            guild_controller.checkpoint_guild(guild, {"from": accounts[0]})
+        t = guild_controller.time_total()
+        assert guild_controller.get_total_weight() == _weighted_sum(guild_controller, t)
+        t = start + k * WEEK
+        weights = [guild_controller.guild_relative_weight(guild, t) for guild in guilds]
+        assert weights == [row[k] for row in ranges]
+        assert sum(weights) <= 10 ** 18
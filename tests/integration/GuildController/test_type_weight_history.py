@@ -0,0 +1,47 @@
+import pytest
+from brownie_tokens import ERC20
+
+DAY = 86400
+WEEK = 7 * DAY
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initial_setup(guild_controller):
+    gas_token = ERC20("Coin", "MOH", 18)
+    guild_controller.add_type("GAS Coin", "GASMOH", gas_token, 10 ** 18)
+
+
+def test_weight_between_changes(chain, accounts, guild_controller):
+    times = [guild_controller.time_type_weight(0)]
+    for weight in [2, 3, 5]:
+        chain.sleep(3 * WEEK)
+        guild_controller.change_type_weight(0, weight * 10 ** 18, {"from": accounts[0]})
+        times.append(guild_controller.time_type_weight(0))
+
+    assert guild_controller.type_weight_epoch(0) == 4
+    assert guild_controller.points_type_weight(0, times[0] - WEEK) == 0
+    for weight, t in zip([1, 2, 3, 5], times):
+        assert guild_controller.points_type_weight(0, t) == weight * 10 ** 18
+        assert guild_controller.points_type_weight(0, t + WEEK) == weight * 10 ** 18
+    assert guild_controller.points_type_weight(0, times[-1] + 100 * WEEK) == 5 * 10 ** 18
+    assert guild_controller.get_type_weight(0) == 5 * 10 ** 18
+
+
+def test_changes_in_same_week(chain, accounts, guild_controller):
+    chain.sleep(2 * WEEK)
+    guild_controller.change_type_weight(0, 2 * 10 ** 18, {"from": accounts[0]})
+    guild_controller.change_type_weight(0, 4 * 10 ** 18, {"from": accounts[0]})
+
+    t = guild_controller.time_type_weight(0)
+    assert guild_controller.type_weight_epoch(0) == 2
+    assert guild_controller.type_weight_history(0, 2) == (t, 4 * 10 ** 18)
+    assert guild_controller.points_type_weight(0, t - WEEK) == 10 ** 18
+
+
+def test_no_weekly_writes(chain, accounts, guild_controller):
+    chain.sleep(10 * WEEK)
+    tx = guild_controller.checkpoint({"from": accounts[0]})
+
+    assert guild_controller.type_weight_epoch(0) == 1
+    assert guild_controller.points_type_weight(0, chain.time() // WEEK * WEEK) == 10 ** 18
+    assert "NewTypeWeight" not in tx.events
@@ -0,0 +1,94 @@
+import pytest
+from brownie import ZERO_ADDRESS
+from brownie_tokens import ERC20
+
+from scripts.forecast.guild_weight_forecast import forecast
+from scripts.model.guild_controller import GuildControllerModel
+
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+MAXTIME = 126144000
+N_BATCH = 50
+N_TYPES = 3
+WEEKS = 70
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initial_setup(chain, accounts, token, voting_escrow, guild_controller, minter, reward_vesting):
+    chain.sleep(DAY + 1)
+    token.update_mining_parameters()
+    token.set_minter(minter, {"from": accounts[0]})
+    guild_controller.set_minter(minter, {"from": accounts[0]})
+    reward_vesting.set_minter(minter, {"from": accounts[0]})
+
+    for i in range(1, 10):
+        amount = (100000 + i * 10000) * 10 ** 18
+        token.transfer(accounts[i], amount, {"from": accounts[0]})
+        token.approve(voting_escrow, amount, {"from": accounts[i]})
+        # member locks end within the forecast so their slope changes are covered
+        lock_time = MAXTIME if i <= N_TYPES else YEAR + i * WEEK
+        voting_escrow.create_lock(amount, chain.time() + lock_time, {"from": accounts[i]})
+
+    for i in range(N_TYPES):
+        gas_token = ERC20(f"Coin {i}", f"MOH{i}", 18)
+        guild_controller.add_type(f"GAS Coin {i}", f"GASMOH{i}", gas_token, (i + 1) * 10 ** 18)
+
+
+@pytest.fixture(scope="module")
+def guilds(accounts, guild_controller, Guild):
+    guilds = []
+    for i in range(N_TYPES):
+        guild_controller.create_guild(accounts[i + 1], i, 10, {"from": accounts[0]})
+        guilds.append(Guild.at(guild_controller.guild_owner_list(accounts[i + 1])))
+    for i in range(4, 10):
+        guilds[i % N_TYPES].join_guild({"from": accounts[i]})
+    yield guilds
+
+
+def _batch(guilds):
+    return list(guilds) + [ZERO_ADDRESS] * (N_BATCH - len(guilds))
+
+
+def _plain(fn, args_list):
+    return [fn(*args) for args in args_list]
+
+
+def test_projection_matches_checkpoints(chain, accounts, guild_controller, guilds):
+    guild_controller.change_type_weight(1, 3 * 10 ** 18, {"from": accounts[0]})
+    # leave the controller without a checkpoint so the projection has to catch up
+    chain.sleep(3 * WEEK)
+    t_from = chain.time() // WEEK * WEEK + WEEK
+    model = GuildControllerModel.from_contract(guild_controller, t_from + (WEEKS - 1) * WEEK)
+    result = model.project(t_from, WEEKS)
+
+    for _ in range(WEEKS // 10 + 1):
+        chain.sleep(10 * WEEK)
+        guild_controller.checkpoint_guilds(_batch(guilds), {"from": accounts[0]})
+
+    for k, t in enumerate(result.times):
+        assert guild_controller.points_total(t) == result.total[k]
+        for i in range(N_TYPES):
+            assert guild_controller.points_sum(i, t)["bias"] == result.type_sum[i][k]
+        for n, guild in enumerate(guilds):
+            assert guild_controller.points_weight(guild, t)["bias"] == result.guild_weight[n][k]
+            assert guild_controller.guild_relative_weight(guild, t) == result.relative_weight[n][k]
+
+
+def test_projection_before_last_checkpoint(chain, guild_controller, guilds):
+    model = GuildControllerModel.from_contract(guild_controller, chain.time() + WEEK)
+
+    with pytest.raises(ValueError):
+        model.project(chain.time() // WEEK * WEEK - WEEK, 2)
+
+
+def test_forecast_is_cached_per_week(chain, accounts, guild_controller, guilds, tmp_path):
+    result = forecast(guild_controller, 4, tmp_path, call_many=_plain)
+    guilds[1].leave_guild({"from": accounts[4]})
+
+    assert forecast(guild_controller, 2, tmp_path, call_many=_plain)["times"] == result["times"][:2]
+    assert forecast(guild_controller, 4, tmp_path, call_many=_plain) == result
+    assert forecast(guild_controller, 4, tmp_path, refresh=True, call_many=_plain) != result
+
+    chain.sleep(WEEK)
+    assert forecast(guild_controller, 4, tmp_path, call_many=_plain)["times"][0] == result["times"][1]
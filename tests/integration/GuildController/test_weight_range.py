@@ -0,0 +1,100 @@
+import pytest
+from brownie_tokens import ERC20
+
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+MAXTIME = 126144000
+N_TYPES = 2
+N_WEEKS = 53
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initial_setup(chain, accounts, token, voting_escrow, guild_controller, minter, reward_vesting, Guild):
+    chain.sleep(DAY + 1)
+    token.update_mining_parameters()
+    token.set_minter(minter, {"from": accounts[0]})
+    guild_controller.set_minter(minter, {"from": accounts[0]})
+    reward_vesting.set_minter(minter, {"from": accounts[0]})
+
+    for i in range(1, 7):
+        amount = (100000 + i * 10000) * 10 ** 18
+        token.transfer(accounts[i], amount, {"from": accounts[0]})
+        token.approve(voting_escrow, amount, {"from": accounts[i]})
+        lock_time = MAXTIME if i <= N_TYPES else YEAR + i * WEEK
+        voting_escrow.create_lock(amount, chain.time() + lock_time, {"from": accounts[i]})
+
+    for i in range(N_TYPES):
+        gas_token = ERC20(f"Coin {i}", f"MOH{i}", 18)
+        guild_controller.add_type(f"GAS Coin {i}", f"GASMOH{i}", gas_token, (i + 1) * 10 ** 18)
+        guild_controller.create_guild(accounts[i + 1], i, 10, {"from": accounts[0]})
+
+    for i in range(N_TYPES + 1, 7):
+        guild = Guild.at(guild_controller.guild_owner_list(accounts[i % N_TYPES + 1]))
+        guild.join_guild({"from": accounts[i]})
+
+    for i in range(10):
+        chain.sleep(WEEK)
+        if i == 4:
+            guild_controller.change_type_weight(0, 3 * 10 ** 18, {"from": accounts[0]})
+        guild_controller.checkpoint_guild(guild_controller.guilds(i % N_TYPES), {"from": accounts[0]})
+
+
+def test_guild_weight_range(chain, guild_controller):
+    start = chain.time() - 12 * WEEK
+    for i in range(N_TYPES):
+        guild = guild_controller.guilds(i)
+        weights = guild_controller.get_guild_weight_range(guild, start, 14)
+        t = start // WEEK * WEEK
+        assert list(weights[:14]) == [guild_controller.points_weight(guild, t + k * WEEK)["bias"] for k in range(14)]
+        assert list(weights[14:]) == [0] * (N_WEEKS - 14)
+        assert any(weights)
+
+
+def test_type_ranges(chain, guild_controller):
+    start = chain.time() - 12 * WEEK
+    t = start // WEEK * WEEK
+    for i in range(N_TYPES):
+        sums = guild_controller.get_weights_sum_per_type_range(i, start, 14)
+        type_weights = guild_controller.get_type_weight_range(i, start, 14)
+        assert list(sums[:14]) == [guild_controller.points_sum(i, t + k * WEEK)["bias"] for k in range(14)]
+        assert list(type_weights[:14]) == [guild_controller.points_type_weight(i, t + k * WEEK) for k in range(14)]
+    assert len(set(guild_controller.get_type_weight_range(0, start, 14)[:14])) > 1
+
+
+def test_total_weight_range(chain, guild_controller):
+    start = chain.time() - 12 * WEEK
+    t = start // WEEK * WEEK
+    totals = guild_controller.get_total_weight_range(start, N_WEEKS)
+    assert list(totals) == [guild_controller.points_total(t + k * WEEK) for k in range(N_WEEKS)]
+    assert totals[12] == guild_controller.points_total(chain.time() // WEEK * WEEK) > 0
+
+
+def test_relative_weight_range(chain, guild_controller):
+    start = chain.time() - 12 * WEEK
+    t = start // WEEK * WEEK
+    for i in range(N_TYPES):
+        guild = guild_controller.guilds(i)
+        weights = guild_controller.guild_relative_weight_range(guild, start, 14)
+        assert list(weights[:14]) == [guild_controller.guild_relative_weight(guild, t + k * WEEK) for k in range(14)]
+        assert list(weights[14:]) == [0] * (N_WEEKS - 14)
+        assert weights[12] > 0
+
+
+def test_relative_weight_range_projects_unfilled_weeks(chain, accounts, guild_controller):
+    guild = guild_controller.guilds(0)
+    chain.sleep(5 * WEEK)
+    chain.mine()
+    start = chain.time() - 8 * WEEK
+    projected = guild_controller.guild_relative_weight_range(guild, start, 10)
+    assert guild_controller.points_total(chain.time() // WEEK * WEEK) == 0
+
+    guild_controller.checkpoint_guild(guild, {"from": accounts[0]})
+    assert guild_controller.guild_relative_weight_range(guild, start, 10) == projected
+    assert projected[8] == guild_controller.guild_relative_weight(guild, chain.time()) > 0
+
+
+def test_range_length(chain, guild_controller):
+    guild = guild_controller.guilds(0)
+    assert list(guild_controller.get_guild_weight_range(guild, chain.time(), 0)) == [0] * N_WEEKS
+    assert len(guild_controller.get_guild_weight_range(guild, chain.time(), 1000)) == N_WEEKS
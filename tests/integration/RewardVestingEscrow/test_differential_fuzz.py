@@ -0,0 +1,22 @@
+import pytest
+
+from scripts.fuzz.escrow_fuzzer import N_USERS, replay_on_chain, run_offline
+
+OFFLINE_SEQUENCES = 500
+REPLAYED_SEEDS = [0, 1, 2]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(accounts, reward_vesting):
+    reward_vesting.set_minter(accounts[0], {"from": accounts[0]})
+
+
+def test_model_invariants():
+    failures, _ = run_offline("reward_vesting", range(OFFLINE_SEQUENCES), processes=1)
+    assert failures == []
+
+
+@pytest.mark.parametrize("seed", REPLAYED_SEEDS)
+def test_replay_reward_vesting(accounts, reward_vesting, seed):
+    users = list(accounts[1 : N_USERS + 1])
+    assert replay_on_chain("reward_vesting", reward_vesting, seed, users, accounts[0]) is None
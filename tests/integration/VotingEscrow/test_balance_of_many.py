@@ -0,0 +1,50 @@
+import pytest
+
+H = 3600
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+N_BATCH = 100
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(chain, accounts, token, voting_escrow):
+    amount = 1000 * 10 ** 18
+    for i, acct in enumerate(accounts[:4]):
+        if i > 0:
+            token.transfer(acct, amount, {"from": accounts[0]})
+        token.approve(voting_escrow, amount, {"from": acct})
+        voting_escrow.create_lock(amount, chain.time() + YEAR + (i + 1) * WEEK, {"from": acct})
+        chain.sleep(H)
+    chain.mine()
+
+
+def _pad(addrs):
+    return list(addrs) + [ZERO_ADDRESS] * (N_BATCH - len(addrs))
+
+
+def test_matches_balance_of(accounts, voting_escrow):
+    addrs = accounts[:6]
+    balances = voting_escrow.balanceOfMany(_pad(addrs))
+
+    for i, acct in enumerate(addrs):
+        assert balances[i] == voting_escrow.balanceOf(acct)
+    assert balances[0] > 0
+    assert balances[5] == 0
+
+
+def test_matches_balance_of_at_timestamp(chain, accounts, voting_escrow):
+    t = chain.time() + 10 * WEEK
+    balances = voting_escrow.balanceOfMany(_pad(accounts[:4]), t)
+
+    for i, acct in enumerate(accounts[:4]):
+        assert balances[i] == voting_escrow.balanceOf(acct, t)
+
+
+def test_stops_at_zero_address(accounts, voting_escrow):
+    addrs = [accounts[0], ZERO_ADDRESS, accounts[1]]
+    balances = voting_escrow.balanceOfMany(_pad(addrs))
+
+    assert balances[0] == voting_escrow.balanceOf(accounts[0])
+    assert balances[2] == 0
@@ -0,0 +1,70 @@
+import brownie
+import pytest
+
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+N_BATCH = 100
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def _pad(values, fill):
+    return list(values) + [fill] * (N_BATCH - len(values))
+
+
+@pytest.fixture(scope="module")
+def recipients(accounts):
+    yield [accounts.add().address for _ in range(5)]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(accounts, token, voting_escrow):
+    token.approve(voting_escrow, 10 ** 30, {"from": accounts[0]})
+
+
+def test_create_lock_for_many(chain, accounts, token, voting_escrow, recipients):
+    values = [10 ** 21 * (i + 1) for i in range(len(recipients))]
+    unlock_times = [chain.time() + YEAR + i * 10 * WEEK for i in range(len(recipients))]
+    balance_before = token.balanceOf(accounts[0])
+
+    tx = voting_escrow.create_lock_for_many(
+        _pad(recipients, ZERO_ADDRESS), _pad(values, 0), _pad(unlock_times, 0), {"from": accounts[0]}
+    )
+
+    assert token.balanceOf(accounts[0]) == balance_before - sum(values)
+    assert voting_escrow.supply() == sum(values)
+    assert len(tx.events["Deposit"]) == len(recipients)
+    total = 0
+    for addr, value, unlock_time in zip(recipients, values, unlock_times):
+        assert voting_escrow.locked(addr) == (value, unlock_time // WEEK * WEEK)
+        assert voting_escrow.user_point_epoch(addr) == 1
+        total += voting_escrow.balanceOf(addr)
+    assert voting_escrow.totalSupply() == total
+
+
+def test_deposit_for_many(chain, accounts, voting_escrow, recipients):
+    unlock_time = chain.time() + 2 * YEAR
+    voting_escrow.create_lock_for_many(
+        _pad(recipients, ZERO_ADDRESS), _pad([10 ** 21] * 5, 0), _pad([unlock_time] * 5, 0), {"from": accounts[0]}
+    )
+    chain.sleep(WEEK)
+
+    voting_escrow.deposit_for_many(_pad(recipients[:3], ZERO_ADDRESS), _pad([10 ** 20] * 3, 0), {"from": accounts[0]})
+
+    for i, addr in enumerate(recipients):
+        expected = 10 ** 21 + (10 ** 20 if i < 3 else 0)
+        assert voting_escrow.locked(addr)["amount"] == expected
+    assert voting_escrow.totalSupply() == sum(voting_escrow.balanceOf(addr) for addr in recipients)
+
+
+def test_duplicate_recipient_reverts(chain, accounts, voting_escrow, recipients):
+    addrs = [recipients[0], recipients[0]]
+    with brownie.reverts("Withdraw old tokens first"):
+        voting_escrow.create_lock_for_many(
+            _pad(addrs, ZERO_ADDRESS), _pad([10 ** 21] * 2, 0), _pad([chain.time() + YEAR] * 2, 0), {"from": accounts[0]}
+        )
+
+
+def test_deposit_for_many_without_lock_reverts(accounts, voting_escrow, recipients):
+    with brownie.reverts("No existing lock found"):
+        voting_escrow.deposit_for_many(_pad(recipients[:1], ZERO_ADDRESS), _pad([10 ** 20], 0), {"from": accounts[0]})
@@ -0,0 +1,42 @@
+import pytest
+
+from scripts.fuzz.escrow_fuzzer import N_USERS, replay_on_chain, run_offline
+
+OFFLINE_SEQUENCES = 200
+REPLAYED_SEEDS = [0, 1, 2]
+
+
+@pytest.fixture(scope="module")
+def users(accounts):
+    yield list(accounts[1 : N_USERS + 1])
+
+
+@pytest.fixture(scope="module")
+def gas_escrow(GasEscrow, accounts, guild_controller, gas_token):
+    guild_controller.add_type("Gas MOH", "GASMOH", gas_token, 10 ** 18, {"from": accounts[0]})
+    yield GasEscrow.at(guild_controller.gas_type_escrow(0))
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(accounts, token, voting_escrow, gas_token, gas_escrow, users):
+    for escrow_token, escrow in [(token, voting_escrow), (gas_token, gas_escrow)]:
+        for acct in users:
+            escrow_token.transfer(acct, 10 ** 26, {"from": accounts[0]})
+            escrow_token.approve(escrow, 2 ** 256 - 1, {"from": acct})
+        escrow_token.approve(escrow, 2 ** 256 - 1, {"from": accounts[0]})
+
+
+@pytest.mark.parametrize("kind", ["voting_escrow", "gas_escrow"])
+def test_model_invariants(kind):
+    failures, _ = run_offline(kind, range(OFFLINE_SEQUENCES), processes=1)
+    assert failures == []
+
+
+@pytest.mark.parametrize("seed", REPLAYED_SEEDS)
+def test_replay_voting_escrow(accounts, voting_escrow, users, seed):
+    assert replay_on_chain("voting_escrow", voting_escrow, seed, users, accounts[0]) is None
+
+
+@pytest.mark.parametrize("seed", REPLAYED_SEEDS)
+def test_replay_gas_escrow(accounts, gas_escrow, users, seed):
+    assert replay_on_chain("gas_escrow", gas_escrow, seed, users, accounts[0]) is None
@@ -0,0 +1,56 @@
+import pytest
+
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(chain, accounts, token, voting_escrow):
+    token.transfer(accounts[1], 10 ** 24, {"from": accounts[0]})
+    for acct in accounts[:2]:
+        token.approve(voting_escrow, 10 ** 24, {"from": acct})
+    voting_escrow.create_lock(10 ** 21, chain.time() + YEAR, {"from": accounts[0]})
+    for i in range(6):
+        chain.sleep(3 * DAY)
+        if i == 1:
+            voting_escrow.create_lock(10 ** 21, chain.time() + 2 * YEAR, {"from": accounts[1]})
+        else:
+            voting_escrow.increase_amount(10 ** 20, {"from": accounts[i % 2]})
+        chain.mine()
+
+
+def _last_at(blocks, block_number):
+    # index of the last checkpoint at or before `block_number`
+    return max([0] + [i for i, blk in enumerate(blocks) if blk <= block_number])
+
+
+def test_correct_hints(chain, accounts, voting_escrow):
+    epoch = voting_escrow.epoch()
+    global_blocks = [voting_escrow.point_history(i)["blk"] for i in range(epoch + 1)]
+    start = global_blocks[0]
+
+    for block_number in range(start, chain.height, 2):
+        hint = _last_at(global_blocks, block_number)
+        assert voting_escrow.totalSupplyAtHint(block_number, hint) == voting_escrow.totalSupplyAt(block_number)
+        for acct in accounts[:2]:
+            user_blocks = [
+                voting_escrow.user_point_history(acct, i)["blk"]
+                for i in range(voting_escrow.user_point_epoch(acct) + 1)
+            ]
+            user_hint = _last_at(user_blocks, block_number)
+            assert voting_escrow.balanceOfAtHint(acct, block_number, user_hint, hint) == voting_escrow.balanceOfAt(
+                acct, block_number
+            )
+
+
+@pytest.mark.parametrize("user_hint,hint", [(0, 0), (1, 2), (3, 1), (100, 100)])
+def test_wrong_hints_fall_back(chain, accounts, voting_escrow, user_hint, hint):
+    start = voting_escrow.point_history(0)["blk"]
+
+    for block_number in range(start, chain.height, 3):
+        assert voting_escrow.totalSupplyAtHint(block_number, hint) == voting_escrow.totalSupplyAt(block_number)
+        for acct in accounts[:2]:
+            assert voting_escrow.balanceOfAtHint(acct, block_number, user_hint, hint) == voting_escrow.balanceOfAt(
+                acct, block_number
+            )
@@ -0,0 +1,51 @@
+import pytest
+
+from scripts.indexer.voting_escrow_indexer import VotingEscrowIndexer
+
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(chain, accounts, token, voting_escrow):
+    for i, acct in enumerate(accounts[:3]):
+        if i > 0:
+            token.transfer(acct, 10 ** 24, {"from": accounts[0]})
+        token.approve(voting_escrow, 10 ** 24, {"from": acct})
+        voting_escrow.create_lock(10 ** 21 * (i + 1), chain.time() + YEAR + i * 20 * WEEK, {"from": acct})
+        chain.sleep(DAY)
+
+
+def _assert_matches(indexer, voting_escrow, users):
+    for acct in users:
+        user_epoch = voting_escrow.user_point_epoch(acct)
+        assert indexer.locked(acct) == tuple(voting_escrow.locked(acct)) + (user_epoch,)
+        for epoch in range(1, user_epoch + 1):
+            assert indexer.user_point(acct, epoch) == tuple(voting_escrow.user_point_history(acct, epoch))
+
+
+def test_indexer_matches_contract(chain, accounts, voting_escrow, tmp_path):
+    indexer = VotingEscrowIndexer(tmp_path / "ve.sqlite", voting_escrow)
+    indexer.sync(chain.height)
+
+    _assert_matches(indexer, voting_escrow, accounts[:3])
+    assert len(indexer.holders()) == 3
+
+
+def test_indexer_resumes(chain, accounts, voting_escrow, tmp_path):
+    db_path = tmp_path / "ve.sqlite"
+    VotingEscrowIndexer(db_path, voting_escrow).sync(chain.height)
+    first_sync = chain.height
+
+    voting_escrow.increase_amount(10 ** 20, {"from": accounts[1]})
+    chain.sleep(2 * YEAR)
+    voting_escrow.withdraw({"from": accounts[0]})
+
+    indexer = VotingEscrowIndexer(db_path, voting_escrow)
+    assert indexer.last_block == first_sync
+    indexer.sync(chain.height)
+
+    _assert_matches(indexer, voting_escrow, accounts[:3])
+    assert accounts[0] not in indexer.holders()
+    assert indexer.balance_of(accounts[1], chain.time()) == voting_escrow.balanceOf(accounts[1], chain.time())
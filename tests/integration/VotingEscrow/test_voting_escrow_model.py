@@ -0,0 +1,52 @@
+from random import randrange, seed
+
+import pytest
+
+from scripts.model.voting_escrow import VotingEscrowModel
+
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(chain, accounts, token, voting_escrow):
+    seed(42)
+    for i, acct in enumerate(accounts[:5]):
+        if i > 0:
+            token.transfer(acct, 10 ** 24, {"from": accounts[0]})
+        token.approve(voting_escrow, 10 ** 24, {"from": acct})
+        chain.sleep(randrange(1, 5 * DAY))
+        voting_escrow.create_lock(
+            randrange(10 ** 18, 10 ** 23), chain.time() + YEAR + randrange(3 * YEAR), {"from": acct}
+        )
+    chain.sleep(3 * WEEK)
+    voting_escrow.increase_amount(10 ** 21, {"from": accounts[2]})
+    chain.sleep(20 * WEEK)
+    voting_escrow.checkpoint({"from": accounts[0]})
+    chain.mine()
+
+
+def test_balance_of_matches_contract(chain, accounts, voting_escrow):
+    users = accounts[:6]
+    model = VotingEscrowModel.from_contract(voting_escrow, users)
+    now = chain[-1].timestamp
+    timestamps = [now + i * 5 * DAY + 17 for i in range(40)]
+
+    balances = model.balance_of(users, timestamps)
+
+    for j, t in enumerate(timestamps):
+        for i, acct in enumerate(users):
+            assert balances[i, j] == voting_escrow.balanceOf(acct, t)
+
+
+def test_total_supply_matches_contract(chain, voting_escrow):
+    model = VotingEscrowModel.from_contract(voting_escrow)
+    now = chain[-1].timestamp
+    timestamps = [now + i * 5 * DAY + 17 for i in range(40)]
+    timestamps += [(now // WEEK + i) * WEEK for i in range(1, 40)]
+
+    supplies = model.total_supply(timestamps)
+
+    for t, supply in zip(timestamps, supplies):
+        assert supply == voting_escrow.totalSupply(t)
@@ -0,0 +1,54 @@
+import csv
+
+import pytest
+
+from scripts.indexer.voting_escrow_indexer import VotingEscrowIndexer
+from scripts.snapshot.voting_power_snapshot import export_snapshot
+
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(chain, accounts, token, voting_escrow):
+    for i, acct in enumerate(accounts[:5]):
+        if i > 0:
+            token.transfer(acct, 10 ** 24, {"from": accounts[0]})
+        token.approve(voting_escrow, 10 ** 24, {"from": acct})
+        voting_escrow.create_lock(10 ** 21 * (i + 1), chain.time() + YEAR + i * 10 * WEEK, {"from": acct})
+        chain.sleep(DAY)
+    chain.sleep(YEAR + WEEK)
+    voting_escrow.withdraw({"from": accounts[0]})
+    voting_escrow.increase_amount(10 ** 20, {"from": accounts[4]})
+    chain.mine()
+
+
+def _read_csv(path):
+    with open(path) as fp:
+        return {addr: int(balance) for addr, balance in list(csv.reader(fp))[1:]}
+
+
+@pytest.mark.parametrize("blocks_ago", [1, 4, 8])
+def test_snapshot_matches_balance_of_at(chain, accounts, voting_escrow, tmp_path, blocks_ago):
+    block = chain.height - blocks_ago
+    indexer = VotingEscrowIndexer(tmp_path / "ve.sqlite", voting_escrow)
+    output = tmp_path / "snapshot.csv"
+
+    summary = export_snapshot(voting_escrow, indexer, block, str(output))
+    balances = _read_csv(output)
+
+    assert summary["holders"] == len(balances)
+    for addr, balance in balances.items():
+        assert balance == voting_escrow.balanceOfAt(addr, block)
+    assert int(summary["total_supply"]) == voting_escrow.totalSupplyAt(block)
+    assert int(summary["sum_of_balances"]) == sum(balances.values())
+
+
+def test_snapshot_skips_withdrawn(chain, accounts, voting_escrow, tmp_path):
+    indexer = VotingEscrowIndexer(tmp_path / "ve.sqlite", voting_escrow)
+    output = tmp_path / "snapshot.csv"
+
+    export_snapshot(voting_escrow, indexer, chain.height, str(output))
+
+    assert _read_csv(output)[accounts[0].address] == 0
@@ -0,0 +1,50 @@
+import pytest
+
+H = 3600
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(accounts, token, voting_escrow):
+    for acct in accounts[1:4]:
+        token.transfer(acct, 10 ** 24, {"from": accounts[0]})
+    for acct in accounts[:4]:
+        token.approve(voting_escrow, 10 ** 24, {"from": acct})
+
+
+def test_past_total_supply(chain, accounts, voting_escrow):
+    history = []
+    for i, acct in enumerate(accounts[:4]):
+        voting_escrow.create_lock(10 ** 21 * (i + 1), chain.time() + YEAR + i * 30 * WEEK, {"from": acct})
+        t = chain[-1].timestamp
+        history.append((t, voting_escrow.totalSupply(t)))
+        chain.sleep(3 * DAY + i * H)
+
+    voting_escrow.increase_amount(10 ** 21, {"from": accounts[1]})
+    t = chain[-1].timestamp
+    history.append((t, voting_escrow.totalSupply(t)))
+
+    chain.sleep(20 * WEEK)
+    voting_escrow.checkpoint({"from": accounts[0]})
+
+    for t, supply in history:
+        assert voting_escrow.totalSupply(t) == supply
+
+
+def test_weekly_supply(chain, accounts, voting_escrow):
+    voting_escrow.create_lock(10 ** 21, chain.time() + 2 * YEAR, {"from": accounts[0]})
+    chain.sleep(10 * WEEK)
+    voting_escrow.checkpoint({"from": accounts[0]})
+
+    week = (chain[-1].timestamp // WEEK - 3) * WEEK
+    epoch = voting_escrow.week_epoch(week)
+    assert epoch > 0
+    assert voting_escrow.point_history(epoch)["ts"] == week
+    assert voting_escrow.weekly_supply(week + DAY) == voting_escrow.point_history(epoch)["bias"]
+    assert voting_escrow.weekly_supply(week) == voting_escrow.totalSupply(week)
+
+
+def test_before_deployment(voting_escrow):
+    assert voting_escrow.totalSupply(1) == 0